@@ -0,0 +1 @@
+"""Suite de benchmarks del POS (python -m benchmarks)."""
@@ -0,0 +1,19 @@
+import os
+import shutil
+import sys
+import tempfile
+
+# pos.config lee el entorno al importarse: se prepara antes de importar la suite,
+# así los benchmarks nunca tocan los datos reales (journal, contador de recibos) ni el hub
+data_dir = tempfile.mkdtemp(prefix='pos-bench-')
+os.environ['POS_DATA_DIR'] = data_dir
+for name in ('POS_HUB', 'POS_PRINTER', 'POS_MENU', 'POS_RULES', 'POS_INSTRUMENT'):
+    os.environ.pop(name, None)
+
+try:
+    from benchmarks.suite import main
+
+    status = main()
+finally:
+    shutil.rmtree(data_dir, ignore_errors=True)
+sys.exit(status)
@@ -0,0 +1,344 @@
+"""Benchmarks de arranque, totales, recibos y calculadora con salida JSON comparable"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from pos.calculator import benchmark as calculator_benchmark
+from pos.config import JOURNAL_FILE, MENU_CATEGORIES, RECEIPT_ID_FILE, TAX_RATE
+from pos.pricing import PricingEngine, RunningTotals, np
+from pos.receipts import build_receipt, render_text
+
+SCHEMA_VERSION = 1
+SIZES = (24, 100, 1000, 10000)
+DEFAULT_THRESHOLD = 1.25  # Una mediana 25% más lenta que la base cuenta como regresión
+SELECTED_EVERY = 4  # Uno de cada N items va en la orden de prueba
+ISSUED_AT = datetime.datetime(2024, 1, 1, 12, 0, 0)
+
+# ==============================================================
+# 🌟 SYNTHETIC MENUS & TIMING 🌟
+# ==============================================================
+
+def synthetic_menu(total_items: int) -> Dict[str, Dict]:
+    """Menú con las categorías reales y `total_items` items repartidos entre ellas"""
+    keys = list(MENU_CATEGORIES)
+    if total_items < len(keys):
+        raise ValueError(f'menu needs at least {len(keys)} items')
+    base_prices = [price for info in MENU_CATEGORIES.values() for price in info['prices']]
+    menu = {}
+    for position, key in enumerate(keys):
+        count = total_items // len(keys) + (position < total_items % len(keys))
+        display_name = MENU_CATEGORIES[key]['display_name']
+        menu[key] = {
+            'items': [f'{display_name} {i:05d}' for i in range(count)],
+            'prices': [base_prices[(i + position) % len(base_prices)] for i in range(count)],
+            'display_name': display_name,
+        }
+    return menu
+
+
+def repeats_for(items: int, quick: bool = False) -> int:
+    """Repeticiones por medición: menos cuanto más grande es el menú"""
+    runs = max(5, min(200, 20000 // items))
+    return max(3, runs // 5) if quick else runs
+
+
+def time_call(func: Callable[[], object], runs: int) -> Dict[str, float]:
+    """Llama func() `runs` veces y resume la latencia por llamada en microsegundos"""
+    func()  # Calentamiento (cachés, imports perezosos)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        'median_us': statistics.median(samples),
+        'p95_us': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'min_us': samples[0],
+        'runs': runs,
+    }
+
+
+def result(name: str, items: Optional[int], timing: Dict[str, float], **extra) -> Dict:
+    """Registro de resultado; (name, items) es la clave para comparar versiones"""
+    return {'name': name, 'items': items, **timing, **extra}
+
+
+def _selected_quantity(index: int) -> str:
+    return '2' if index % SELECTED_EVERY == 0 else '0'
+
+
+# ==============================================================
+# 🌟 TK-FREE BENCHMARKS 🌟
+# ==============================================================
+
+def bench_headless(sizes, quick: bool = False) -> List[Dict]:
+    """Totales y recibos con el núcleo sin Tk (mismo código que usa la GUI)"""
+    results = []
+    for size in sizes:
+        menu = synthetic_menu(size)
+        runs = repeats_for(size, quick)
+        engine = PricingEngine(menu, TAX_RATE)
+        quantities = {key: [_selected_quantity(i) for i in range(len(info['items']))]
+                      for key, info in menu.items()}
+        lines = [(item_id, _selected_quantity(item_id)) for item_id in range(len(engine.catalog))]
+
+        results.append(result('pricing.price_order', size,
+                              time_call(lambda: engine.price_order(quantities), runs)))
+
+        running = RunningTotals(engine)
+        for item_id, quantity in lines:
+            running.set_item(item_id, quantity)
+        keystrokes = iter(range(10 ** 9))
+
+        def keystroke():
+            tick = next(keystrokes)
+            running.set_item(tick % size, str(tick % 5))
+            return running.snapshot()
+
+        results.append(result('pricing.live_keystroke', size, time_call(keystroke, runs * 10)))
+
+        def receipt():
+            return render_text(build_receipt(engine, lines, 1000, ISSUED_AT))
+
+        results.append(result('receipt.build_render', size, time_call(receipt, runs)))
+    return results
+
+
+def bench_calculator(quick: bool = False) -> List[Dict]:
+    """Throughput de Calculator.calculate con y sin la caché de expresiones"""
+    measured = calculator_benchmark(20000 if quick else 100000)
+    return [
+        result('calculator.cached', None, {'median_us': measured['cached_us']},
+               per_second=measured['cached_per_second'], runs=measured['iterations']),
+        result('calculator.uncached', None, {'median_us': measured['uncached_us']},
+               per_second=1e6 / measured['uncached_us'], runs=measured['iterations']),
+    ]
+
+
+# ==============================================================
+# 🌟 GUI BENCHMARKS (DISPLAY OR XVFB) 🌟
+# ==============================================================
+
+def start_xvfb() -> Optional[subprocess.Popen]:
+    """Arranca un Xvfb privado si no hay DISPLAY; None si no se puede"""
+    if os.environ.get('DISPLAY') or shutil.which('Xvfb') is None:
+        return None
+    for display in range(90, 110):
+        if os.path.exists(f'/tmp/.X11-unix/X{display}'):
+            continue
+        server = subprocess.Popen(['Xvfb', f':{display}', '-nolisten', 'tcp', '-screen', '0',
+                                   '1600x1000x24'], stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and server.poll() is None:
+            if os.path.exists(f'/tmp/.X11-unix/X{display}'):
+                os.environ['DISPLAY'] = f':{display}'
+                return server
+            time.sleep(0.05)
+        server.kill()
+    return None
+
+
+def display_available() -> Optional[str]:
+    """None si Tk puede abrir una ventana; si no, el motivo"""
+    try:
+        import tkinter
+        tkinter.Tk().destroy()
+    except Exception as exc:  # ImportError o TclError (sin display)
+        return str(exc).strip() or type(exc).__name__
+    return None
+
+
+def bench_gui(sizes, quick: bool = False) -> List[Dict]:
+    """Latencias de RestaurantApp real; cada medición incluye update_idletasks()"""
+    import restaurant_pos  # Importa tkinter: solo en este camino
+
+    results = []
+    for size in sizes:
+        menu = synthetic_menu(size)
+        startup_runs = 3 if quick else 5
+        startups = [restaurant_pos.measure_startup(menu) for _ in range(startup_runs)]
+        for phase in ('construct_s', 'first_paint_s'):
+            samples = sorted(startup[phase] * 1e6 for startup in startups)
+            results.append(result(f'gui.startup.{phase[:-2]}', size, {
+                'median_us': statistics.median(samples), 'p95_us': samples[-1],
+                'min_us': samples[0], 'runs': startup_runs}))
+
+        # Journal y contador propios de cada medición, sin menú ni reglas externas
+        with tempfile.TemporaryDirectory(prefix='pos-bench-') as data_dir:
+            app = restaurant_pos.RestaurantApp(
+                menu=menu, menu_file='', rules_file='',
+                journal_path=os.path.join(data_dir, JOURNAL_FILE),
+                receipt_ids_path=os.path.join(data_dir, RECEIPT_ID_FILE))
+            try:
+                results.extend(_bench_app(app, size, repeats_for(size, quick)))
+            finally:
+                app.io.shutdown(wait=True)
+                app.journal.close()
+                app.destroy()
+    return results
+
+
+def _bench_app(app, size: int, runs: int) -> List[Dict]:
+    """Mide los callbacks de los botones sobre una orden con 1 de cada N items"""
+    results = []
+    for category_key in app.category_data:
+        app.ensure_items_section(category_key)
+    for cat_data in app.category_data.values():
+        for i, (check_var, qty_var) in enumerate(zip(cat_data['check_vars'],
+                                                      cat_data['quantity_vars'])):
+            quantity = _selected_quantity(i)
+            check_var.set(int(quantity != '0'))
+            qty_var.set(quantity)
+    app.check_input_status()  # Sincroniza el modelo de la orden con las casillas
+    app.update()
+
+    def settled(callback):
+        def run():
+            callback()
+            app.update_idletasks()
+        return run
+
+    clicks = iter(range(10 ** 9))
+    first_category = app.category_data[next(iter(app.category_data))]
+
+    def click():
+        # Lo mismo que hace el Checkbutton: alternar la casilla y llamar a su command
+        index = next(clicks) % len(first_category['check_vars'])
+        check_var = first_category['check_vars'][index]
+        check_var.set(1 - check_var.get())
+        app.check_input_status(first_category['item_ids'][index])
+
+    results.append(result('gui.check_input_status', size, time_call(settled(click), runs)))
+
+    app.live_totals = True
+    results.append(result('gui.calculate_total.live', size,
+                          time_call(settled(app.calculate_total), runs)))
+    app.live_totals = False
+    results.append(result('gui.calculate_total.full', size,
+                          time_call(settled(app.calculate_total), runs)))
+    app.live_totals = True
+
+    results.append(result('gui.generate_receipt', size,
+                          time_call(settled(app.generate_receipt), runs)))
+    return results
+
+
+# ==============================================================
+# 🌟 RESULTS & COMPARISON 🌟
+# ==============================================================
+
+def git_revision() -> Optional[str]:
+    """Commit actual (si el árbol es un repositorio git)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes=SIZES, quick: bool = False, gui: bool = True, xvfb: bool = False) -> Dict:
+    """Ejecuta todos los benchmarks y devuelve el documento de resultados"""
+    skipped = []
+    results = bench_headless(sizes, quick) + bench_calculator(quick)
+
+    server = start_xvfb() if gui and xvfb else None
+    try:
+        reason = display_available() if gui else 'disabled with --no-gui'
+        if reason is None:
+            results += bench_gui(sizes, quick)
+        else:
+            skipped.append({'group': 'gui', 'reason': reason})
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    return {
+        'schema': SCHEMA_VERSION,
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np is not None,
+            'quick': quick,
+        },
+        'results': results,
+        'skipped': skipped,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Cociente de medianas (actual / base) para cada medición presente en ambos"""
+    previous = {(entry['name'], entry['items']): entry for entry in baseline['results']}
+    rows = []
+    for entry in current['results']:
+        old = previous.get((entry['name'], entry['items']))
+        if old is None or not old['median_us']:
+            continue
+        ratio = entry['median_us'] / old['median_us']
+        rows.append({'name': entry['name'], 'items': entry['items'],
+                     'baseline_us': old['median_us'], 'current_us': entry['median_us'],
+                     'ratio': ratio, 'regression': ratio > threshold})
+    return rows
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    """Tabla legible de la comparación"""
+    lines = [f"{'benchmark':<30}{'items':>7}{'base µs':>12}{'now µs':>12}{'ratio':>8}"]
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        items = '-' if row['items'] is None else row['items']
+        lines.append(f"{row['name']:<30}{items:>7}{row['baseline_us']:>12.1f}"
+                     f"{row['current_us']:>12.1f}{row['ratio']:>8.2f}{flag}")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Benchmark the POS and emit JSON results.')
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                        help='comma-separated menu sizes (default: %(default)s)')
+    parser.add_argument('--quick', action='store_true', help='fewer repetitions')
+    parser.add_argument('--no-gui', action='store_true', help='only the Tk-free benchmarks')
+    parser.add_argument('--xvfb', action='store_true',
+                        help='start a private Xvfb server when DISPLAY is not set')
+    parser.add_argument('--output', help='write the JSON results here instead of stdout')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='compare against a previous results file; exit 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='slowdown ratio counted as a regression (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    document = run_suite(sizes, quick=args.quick, gui=not args.no_gui, xvfb=args.xvfb)
+
+    for skip in document['skipped']:
+        print(f"skipped {skip['group']} benchmarks: {skip['reason']}", file=sys.stderr)
+    text = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            rows = compare(json.load(file), document, args.threshold)
+        print(format_comparison(rows), file=sys.stderr)
+        if any(row['regression'] for row in rows):
+            return 1
+    return 0
@@ -0,0 +1,31 @@
+"""Núcleo headless del POS: lógica de negocio sin dependencias de Tkinter."""
+
+from pos.calculator import Calculator
+from pos.catalog import MenuCatalog, MenuItem
+from pos.config import MENU_CATEGORIES, TAX_RATE
+from pos.journal import OrderJournal
+from pos.money import format_money
+from pos.pricing import BatchTotals, PricedOrder, PricingEngine, RunningTotals
+from pos.receipt_ids import ReceiptNumberAllocator
+from pos.receipts import Receipt, ReceiptLine, build_receipt, register_renderer, render, render_many
+
+__all__ = [
+    'Calculator',
+    'MenuCatalog',
+    'MenuItem',
+    'MENU_CATEGORIES',
+    'TAX_RATE',
+    'OrderJournal',
+    'BatchTotals',
+    'PricedOrder',
+    'PricingEngine',
+    'RunningTotals',
+    'ReceiptNumberAllocator',
+    'Receipt',
+    'ReceiptLine',
+    'build_receipt',
+    'register_renderer',
+    'render',
+    'render_many',
+    'format_money',
+]
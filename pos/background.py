@@ -0,0 +1,120 @@
+"""Trabajador de I/O en segundo plano: guardados, impresión y logs fuera del hilo de la GUI"""
+
+import datetime
+import os
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from pos.config import DATA_DIR, LOG_FILE
+
+# Carriles: cada uno es serial (conserva el orden), entre carriles hay concurrencia
+LANE_RECEIPTS = 'receipts'
+LANE_PRINT = 'print'
+LANE_LOG = 'log'
+LANE_JOURNAL = 'journal'
+LANE_MENU = 'menu'
+LANE_HISTORY = 'history'  # Índice de recibos: nunca demora las escrituras del journal
+
+
+class IOWorker:
+    """Ejecuta trabajos de I/O en hilos y entrega los resultados al hilo de la GUI.
+
+    Los callbacks nunca corren en los hilos de trabajo: quedan en una cola y el
+    hilo dueño de la GUI los ejecuta al llamar poll() (desde Tk, con after()).
+    """
+
+    def __init__(self):
+        self._lanes: Dict[str, ThreadPoolExecutor] = {}
+        self._completed: 'queue.SimpleQueue' = queue.SimpleQueue()
+        self.pending = 0
+        self.closed = False
+
+    def _lane(self, lane: str) -> ThreadPoolExecutor:
+        executor = self._lanes.get(lane)
+        if executor is None:
+            executor = self._lanes[lane] = ThreadPoolExecutor(max_workers=1,
+                                                              thread_name_prefix=f'io-{lane}')
+        return executor
+
+    def submit(self, lane: str, func: Callable, *args,
+               on_done: Optional[Callable] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None) -> Future:
+        """Encola func(*args) en el carril `lane`; los callbacks corren en poll()"""
+        self._check_open()
+        self.pending += 1
+        future = self._lane(lane).submit(func, *args)
+        future.add_done_callback(lambda done: self._completed.put((done, on_done, on_error)))
+        return future
+
+    def watch(self, future: Future, on_done: Optional[Callable] = None,
+              on_error: Optional[Callable[[BaseException], None]] = None) -> Future:
+        """Entrega en poll() el resultado de un Future creado fuera de los carriles"""
+        self._check_open()
+        self.pending += 1
+        future.add_done_callback(lambda done: self._completed.put((done, on_done, on_error)))
+        return future
+
+    def _check_open(self):
+        if self.closed:
+            raise RuntimeError('IOWorker is shut down; no new work is accepted')
+
+    def poll(self) -> int:
+        """Ejecuta los callbacks de los trabajos terminados; devuelve cuántos hubo"""
+        handled = 0
+        while True:
+            try:
+                future, on_done, on_error = self._completed.get_nowait()
+            except queue.Empty:
+                return handled
+            handled += 1
+            self.pending -= 1
+            error = future.exception()
+            if error is not None:
+                if on_error is not None:
+                    on_error(error)
+            elif on_done is not None:
+                on_done(future.result())
+
+    def shutdown(self, wait: bool = True):
+        """Termina los carriles (con wait=True, después de vaciar lo pendiente).
+
+        Se marca cerrado antes de vaciar: los callbacks que corren en el último poll()
+        ya no pueden encolar trabajo nuevo (submit() y watch() lanzan RuntimeError).
+        """
+        self.closed = True
+        for executor in self._lanes.values():
+            executor.shutdown(wait=wait)
+        self._lanes.clear()
+        self.poll()
+
+
+# ==============================================================
+# 🌟 I/O JOBS 🌟
+# ==============================================================
+
+def write_file(path: str, content, mode: str = 'w') -> str:
+    """Escribe un archivo completo y devuelve su ruta"""
+    encoding = None if 'b' in mode else 'utf-8'
+    with open(path, mode, encoding=encoding) as file:
+        file.write(content)
+    return path
+
+
+def append_log(message: str, path: Optional[str] = None) -> str:
+    """Añade una línea con fecha al log local"""
+    path = path or os.path.join(DATA_DIR, LOG_FILE)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    stamp = datetime.datetime.now().isoformat(timespec='seconds')
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write(f'{stamp} {message}\n')
+    return path
+
+
+def send_to_printer(device: str, data: bytes) -> str:
+    """Envía bytes (ESC/POS) al dispositivo o archivo de la impresora"""
+    with open(device, 'ab') as printer:
+        printer.write(data)
+    return device
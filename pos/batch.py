@@ -0,0 +1,366 @@
+"""Modo batch sin Tk: tarifica y renderiza órdenes de archivos JSONL/CSV en paralelo"""
+
+import collections
+import csv
+import datetime
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from pos.config import MENU_CATEGORIES, MENU_FILE, RULES_FILE, TAX_RATE
+from pos.menu import MenuSource
+from pos.money import format_money
+from pos.pricing import PricingEngine
+from pos.receipts import build_receipt, get_renderer
+from pos.rules import load_rules
+
+CHUNK_SIZE = 500  # Órdenes por tarea enviada a un proceso
+CHUNKS_PER_WORKER = 2  # Tareas en vuelo por proceso (limita la memoria)
+RECEIPT_EXTENSIONS = {'text': 'txt', 'json': 'json', 'escpos': 'bin'}
+
+TOTAL_FIELDS = ('number', 'order', 'issued_at', 'lines', 'subtotal_cents', 'discount_cents',
+                'tax_cents', 'total_cents', 'unknown', 'error')
+
+# ==============================================================
+# 🌟 INPUT STREAMS 🌟
+# ==============================================================
+
+def iter_jsonl(stream: IO[str]) -> Iterator[Dict]:
+    """Una orden por línea JSON; las líneas inválidas se emiten con 'error'"""
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield {'error': f'line {line_number}: {exc}'}
+            continue
+        yield record if isinstance(record, dict) else {'error': f'line {line_number}: not an object'}
+
+
+def _column(row: Dict[str, str], *names: str) -> str:
+    for name in names:
+        value = row.get(name)
+        if value:
+            return value.strip()
+    return ''
+
+
+def iter_csv(stream: IO[str]) -> Iterator[Dict]:
+    """Una fila por línea de orden; las filas seguidas con el mismo número forman una orden.
+
+    Columnas: order|number, sku o name (+ category), quantity|qty, issued_at (opcional).
+    La entrada debe venir agrupada por número de orden: un número que reaparece después
+    de otra orden se emite como registro con 'error' (con su línea) en vez de partirla.
+    Una fila sin número es siempre una orden propia.
+    """
+    rows = csv.DictReader(stream)
+    seen = set()
+    record: Optional[Dict] = None
+    current = ''
+    for row in rows:
+        number = _column(row, 'order', 'number', 'order_id')
+        if record is None or not number or number != current:
+            if record is not None:
+                yield record
+            current = number
+            record = {'lines': []}
+            if number in seen:
+                record = {'error': f'line {rows.line_num}: order {number} is split by other '
+                                   f'orders; rows must be grouped by order number'}
+            elif number:
+                seen.add(number)
+                record['number'] = number
+        if 'error' in record:
+            continue
+        issued_at = _column(row, 'issued_at')
+        if issued_at:
+            record['issued_at'] = issued_at
+        record['lines'].append({'sku': _column(row, 'sku'), 'name': _column(row, 'name', 'item'),
+                                'category': _column(row, 'category', 'category_key'),
+                                'quantity': _column(row, 'quantity', 'qty')})
+    if record is not None:
+        yield record
+
+
+def iter_input(paths: Iterable[str], input_format: Optional[str] = None) -> Iterator[Dict]:
+    """Órdenes de varios archivos ('-' = stdin), en orden y sin cargarlos en memoria"""
+    for path in paths:
+        fmt = input_format or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+        reader = iter_csv if fmt == 'csv' else iter_jsonl
+        if path == '-':
+            yield from reader(io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline=''))
+        else:
+            with open(path, encoding='utf-8', newline='') as stream:
+                yield from reader(stream)
+
+
+# ==============================================================
+# 🌟 WORKERS 🌟
+# ==============================================================
+
+_engine: Optional[PricingEngine] = None
+
+
+def init_worker(menu: Dict[str, Dict], tax_rate: float, rules: Optional[Dict] = None):
+    """Inicializador del pool: cada proceso construye su motor (y compila las reglas) una vez"""
+    global _engine
+    _engine = PricingEngine(menu, tax_rate, rules=rules)
+
+
+def resolve_lines(engine: PricingEngine, record: Dict) -> Tuple[List[Tuple[int, object]], List[str]]:
+    """Pares (item_id, cantidad) de una orden externa y los items que no están en el menú.
+
+    Acepta 'lines' o 'items' como lista de {sku|name[, category], quantity} o
+    como dict {sku o nombre: cantidad}; el formato del journal también sirve.
+    """
+    catalog = engine.catalog
+    entries = record.get('lines', record.get('items')) or []
+    if isinstance(entries, dict):
+        entries = [{'sku': key, 'name': key, 'quantity': value} for key, value in entries.items()]
+
+    lines, unknown = [], []
+    for entry in entries:
+        sku = entry.get('sku') or ''
+        name = entry.get('name') or entry.get('item') or ''
+        item_id = catalog.by_sku(sku) if sku else None
+        if item_id is None and name:
+            item_id = catalog.by_name(name, entry.get('category') or entry.get('category_key')
+                                      or None)
+        if item_id is None:
+            unknown.append(sku or name)
+            continue
+        lines.append((item_id, entry.get('quantity', entry.get('qty', 0))))
+    return lines, unknown
+
+
+def _issued_at(record: Dict, default: datetime.datetime) -> datetime.datetime:
+    value = record.get('issued_at')
+    return datetime.datetime.fromisoformat(value) if value else default
+
+
+def price_record(engine: PricingEngine, record: Dict, number: int,
+                 issued_at: datetime.datetime, render_format: Optional[str] = None,
+                 receipts_dir: Optional[str] = None) -> Dict:
+    """Tarifica una orden; con receipts_dir escribe además su recibo renderizado"""
+    if 'error' in record:
+        return {'number': number, 'error': record['error']}
+    try:
+        issued_at = _issued_at(record, issued_at)
+        lines, unknown = resolve_lines(engine, record)
+    except (TypeError, ValueError, AttributeError) as exc:
+        return {'number': number, 'error': f'{type(exc).__name__}: {exc}'}
+
+    receipt = build_receipt(engine, lines, number, issued_at)
+    totals = receipt.totals
+    result = {
+        'number': number,
+        'issued_at': issued_at.isoformat(),
+        'lines': len(receipt.lines),
+        'category_cents': totals.category_cents,
+        'subtotal_cents': totals.subtotal_cents,
+        'tax_cents': totals.tax_cents,
+        'total_cents': totals.total_cents,
+    }
+    source = record.get('number')
+    if source is not None and str(source) != str(number):
+        result['order'] = source  # Identificador externo no numérico
+    if totals.adjustments:
+        result['discount_cents'] = totals.discount_cents
+        result['adjustments'] = [adjustment._asdict() for adjustment in totals.adjustments]
+    if unknown:
+        result['unknown'] = unknown
+    if receipts_dir is not None:
+        rendered = get_renderer(render_format or 'text')(receipt)
+        extension = RECEIPT_EXTENSIONS.get(render_format or 'text', 'txt')
+        mode = 'wb' if isinstance(rendered, bytes) else 'w'
+        encoding = None if mode == 'wb' else 'utf-8'
+        with open(os.path.join(receipts_dir, f'{number}.{extension}'), mode,
+                  encoding=encoding) as file:
+            file.write(rendered)
+    return result
+
+
+def price_chunk(chunk: List[Tuple[Dict, int]], issued_at: datetime.datetime,
+                render_format: Optional[str], receipts_dir: Optional[str]) -> List[Dict]:
+    """Tarea del pool: tarifica un bloque de (registro, número) en el proceso actual"""
+    return [price_record(_engine, record, number, issued_at, render_format, receipts_dir)
+            for record, number in chunk]
+
+
+def _explicit_number(value) -> Tuple[Optional[int], Optional[str]]:
+    """(número, error) del campo 'number'; (None, None) si es un identificador externo"""
+    if isinstance(value, bool):
+        return None, None
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value), None
+        return None, f'order number {value!r} is not an integer'
+    try:
+        return int(value), None
+    except (TypeError, ValueError):
+        return None, None
+
+
+def _numbered(records: Iterable[Dict], first_number: int) -> Iterator[Tuple[Dict, int]]:
+    """Número de cada orden: el del registro si es entero, si no el siguiente libre.
+
+    Los números secuenciales saltan los ya usados; un número repetido o no entero
+    se emite como registro con 'error' (y un número libre) en lugar de pisar otro.
+    La entrada es un flujo: un número explícito que llega después de haberse
+    asignado como secuencial también cuenta como repetido.
+    """
+    used = set()
+    sequence = first_number
+    for record in records:
+        number, problem = _explicit_number(record.get('number'))
+        if number is not None and number in used:
+            number, problem = None, f'duplicate order number {number}'
+        if number is None:
+            while sequence in used:
+                sequence += 1
+            number = sequence
+        used.add(number)
+        yield ({'error': problem} if problem else record), number
+
+
+def _chunks(items: Iterator, size: int) -> Iterator[List]:
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def process_orders(records: Iterable[Dict], executor: Optional[Executor] = None,
+                   chunk_size: int = CHUNK_SIZE, max_in_flight: int = 1,
+                   first_number: int = 1, render_format: Optional[str] = None,
+                   receipts_dir: Optional[str] = None,
+                   issued_at: Optional[datetime.datetime] = None) -> Iterator[Dict]:
+    """Tarifica un flujo de órdenes y emite los totales en el mismo orden de entrada.
+
+    Como mucho `max_in_flight` bloques están en el pool a la vez, así que la
+    memoria solo crece con el conjunto de números usados. Sin executor todo corre aquí.
+    """
+    issued_at = issued_at or datetime.datetime.now().replace(microsecond=0)
+    chunks = _chunks(_numbered(records, first_number), chunk_size)
+    if executor is None:
+        if _engine is None:
+            init_worker(MENU_CATEGORIES, TAX_RATE)
+        for chunk in chunks:
+            yield from price_chunk(chunk, issued_at, render_format, receipts_dir)
+        return
+
+    in_flight: 'collections.deque' = collections.deque()
+    for chunk in chunks:
+        in_flight.append(executor.submit(price_chunk, chunk, issued_at, render_format,
+                                         receipts_dir))
+        if len(in_flight) >= max_in_flight:
+            yield from in_flight.popleft().result()
+    while in_flight:
+        yield from in_flight.popleft().result()
+
+
+# ==============================================================
+# 🌟 OUTPUT 🌟
+# ==============================================================
+
+class TotalsWriter:
+    """Escribe los totales como JSONL o CSV a medida que llegan"""
+
+    def __init__(self, stream: IO[str], fmt: str = 'jsonl'):
+        self.stream = stream
+        self.csv = csv.DictWriter(stream, TOTAL_FIELDS, extrasaction='ignore') if fmt == 'csv' else None
+        if self.csv is not None:
+            self.csv.writeheader()
+
+    def write(self, result: Dict):
+        if self.csv is None:
+            self.stream.write(json.dumps(result, separators=(',', ':')) + '\n')
+        else:
+            self.csv.writerow({**result, 'unknown': ' '.join(result.get('unknown', ()))})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """python -m pos.batch [FILE ...] [--workers N] [--receipts DIR]"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m pos.batch',
+                                     description='Price and render order files without the GUI')
+    parser.add_argument('inputs', nargs='*', default=['-'],
+                        help="JSONL or CSV order files ('-' or nothing reads stdin)")
+    parser.add_argument('--input-format', choices=('jsonl', 'csv'),
+                        help='input format (default: by file extension, else JSONL)')
+    parser.add_argument('--output', '-o', help='totals file (default: stdout)')
+    parser.add_argument('--output-format', choices=('jsonl', 'csv'), default='jsonl')
+    parser.add_argument('--receipts', metavar='DIR', help='write one rendered receipt per order')
+    parser.add_argument('--render', default='text', choices=sorted(RECEIPT_EXTENSIONS),
+                        help='receipt format for --receipts (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes; 0 prices in this process (default: %(default)s)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--menu', default=MENU_FILE or None,
+                        help='menu JSON file (default: POS_MENU, else the built-in menu)')
+    parser.add_argument('--rules', default=RULES_FILE or None,
+                        help='pricing rules JSON file (default: POS_RULES, else a single tax rate)')
+    parser.add_argument('--first-number', type=int, default=1,
+                        help='receipt number for orders without one (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.receipts:
+        os.makedirs(args.receipts, exist_ok=True)
+    try:
+        menu = MenuSource(args.menu).load().menu if args.menu else MENU_CATEGORIES
+    except (OSError, ValueError) as exc:
+        parser.error(f'cannot load menu {args.menu}: {exc}')
+    try:
+        rules = load_rules(args.rules) if args.rules else None
+    except (OSError, ValueError) as exc:
+        parser.error(f'cannot load pricing rules {args.rules}: {exc}')
+
+    try:
+        init_worker(menu, TAX_RATE, rules)  # Valida las reglas contra el menú antes del pool
+    except ValueError as exc:
+        parser.error(f'pricing rules rejected: {exc}')
+
+    output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    executor = None
+    if args.workers > 0:
+        executor = ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                                       initargs=(menu, TAX_RATE, rules))
+
+    started = time.perf_counter()
+    orders = errors = total_cents = 0
+    try:
+        writer = TotalsWriter(output, args.output_format)
+        results = process_orders(iter_input(args.inputs, args.input_format), executor,
+                                 chunk_size=args.chunk_size,
+                                 max_in_flight=max(1, args.workers) * CHUNKS_PER_WORKER,
+                                 first_number=args.first_number,
+                                 render_format=args.render, receipts_dir=args.receipts)
+        for result in results:
+            writer.write(result)
+            orders += 1
+            if 'error' in result:
+                errors += 1
+            else:
+                total_cents += result['total_cents']
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    print(f'{orders} orders ({errors} errors), total {format_money(total_cents)} '
+          f'in {elapsed:.2f}s ({orders / elapsed if elapsed else 0:.0f} orders/s)', file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
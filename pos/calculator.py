@@ -0,0 +1,196 @@
+"""Calculadora segura sin eval(): tokenizador, parser con precedencia y caché LRU"""
+
+import operator
+import re
+import sys
+import time
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+CACHE_SIZE = 512  # Expresiones compiladas que se conservan (LRU)
+
+Compiled = Callable[[], float]
+
+# Números con exponente opcional ('1e5', '2.5E-3'), como los aceptaba float()
+_TOKEN_RE = re.compile(r'\s*(?:((?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|(\S))')
+
+
+def tokenize(expression: str) -> List[str]:
+    """Divide la expresión en números, operadores y paréntesis"""
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if match is None:
+            raise ValueError(f'Unexpected input at {position}')
+        tokens.append(match.group(1) or match.group(2))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Parser descendente recursivo que compila a closures.
+
+    Gramática (de menor a mayor precedencia):
+        expr    := term (('+' | '-') term)*
+        term    := unary (('x' | '*' | '/') unary)*
+        unary   := ('-' | '+') unary | postfix
+        postfix := primary '%'*
+        primary := número | '(' expr ')'
+
+    Como en una calculadora de mano, 'a + b%' suma el b% de a (200+10% = 220);
+    en cualquier otro lugar 'b%' vale b/100. Las cadenas de sumas y productos
+    se evalúan en un bucle, así '1+1+...+1' no anida un closure por término.
+    """
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise ValueError('Unexpected end of expression')
+        self.position += 1
+        return token
+
+    def parse(self) -> Compiled:
+        compiled, _ = self.expr()
+        if self.peek() is not None:
+            raise ValueError(f'Unexpected token {self.peek()!r}')
+        return compiled
+
+    def expr(self) -> Tuple[Compiled, bool]:
+        first, is_percent = self.term()
+        rest = []
+        while self.peek() in ('+', '-'):
+            op_func = Calculator.OPERATORS[self.take()]
+            right, right_percent = self.term()
+            rest.append((op_func, right, right_percent))
+        if not rest:
+            return first, is_percent
+
+        def evaluate() -> float:
+            value = first()
+            for op_func, right, right_percent in rest:
+                operand = right()
+                value = op_func(value, value * operand if right_percent else operand)
+            return value
+        return evaluate, False
+
+    def term(self) -> Tuple[Compiled, bool]:
+        first, is_percent = self.unary()
+        rest = []
+        while self.peek() in ('x', '*', '/'):
+            op_func = Calculator.OPERATORS[self.take()]
+            right, _ = self.unary()
+            rest.append((op_func, right))
+        if not rest:
+            return first, is_percent
+
+        def evaluate() -> float:
+            value = first()
+            for op_func, right in rest:
+                value = op_func(value, right())
+            return value
+        return evaluate, False
+
+    def unary(self) -> Tuple[Compiled, bool]:
+        if self.peek() == '-':
+            self.take()
+            operand, is_percent = self.unary()
+            return (lambda o: lambda: -o())(operand), is_percent
+        if self.peek() == '+':
+            self.take()
+            return self.unary()
+        return self.postfix()
+
+    def postfix(self) -> Tuple[Compiled, bool]:
+        value = self.primary()
+        is_percent = False
+        while self.peek() == '%':
+            self.take()
+            value = (lambda v: lambda: v() / 100)(value)
+            is_percent = True
+        return value, is_percent
+
+    def primary(self) -> Compiled:
+        token = self.take()
+        if token == '(':
+            inner, _ = self.expr()
+            if self.take() != ')':
+                raise ValueError('Missing closing parenthesis')
+            return inner
+        number = float(token)  # ValueError si no es un número
+        return lambda: number
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(expression: str) -> Compiled:
+    """Compila (y guarda en caché LRU) una expresión; ValueError si es inválida"""
+    tokens = tokenize(expression)
+    if not tokens:
+        raise ValueError('Empty expression')
+    return _Parser(tokens).parse()
+
+
+class Calculator:
+    """Calculadora segura sin eval()"""
+
+    OPERATORS = {
+        '+': operator.add,
+        '-': operator.sub,
+        'x': operator.mul,
+        '*': operator.mul,
+        '/': operator.truediv,
+    }
+
+    @staticmethod
+    def calculate(expression: str) -> str:
+        """Evalúa expresiones matemáticas de forma segura"""
+        try:
+            result = compile_expression(expression)()
+            return f"{result:.2f}"
+        except ZeroDivisionError:
+            return "Zero Division Error"
+        except (ValueError, AttributeError, TypeError, OverflowError, RecursionError):
+            return "Syntax Error"
+
+
+# ==============================================================
+# 🌟 THROUGHPUT BENCHMARK 🌟
+# ==============================================================
+
+BENCH_EXPRESSIONS = ('7+8', '1.5x3+2', '-4+2x(3-1)', '200+10%', '(1+2)x(3+4)/5-6', '12/4x-3')
+
+
+def benchmark(iterations: int = 100000, expressions=BENCH_EXPRESSIONS) -> Dict[str, float]:
+    """Mide microsegundos por Calculator.calculate con y sin caché"""
+    results: Dict[str, float] = {}
+
+    compile_expression.cache_clear()
+    started = time.perf_counter()
+    for i in range(iterations):
+        compile_expression.cache_clear()
+        Calculator.calculate(expressions[i % len(expressions)])
+    results['uncached_us'] = (time.perf_counter() - started) / iterations * 1e6
+
+    compile_expression.cache_clear()
+    started = time.perf_counter()
+    for i in range(iterations):
+        Calculator.calculate(expressions[i % len(expressions)])
+    results['cached_us'] = (time.perf_counter() - started) / iterations * 1e6
+    results['cached_per_second'] = 1e6 / results['cached_us']
+    results['iterations'] = iterations
+    return results
+
+
+if __name__ == '__main__':
+    import json
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(json.dumps(benchmark(count)))
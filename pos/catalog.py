@@ -0,0 +1,144 @@
+"""Catálogo indexado del menú: almacenamiento compacto e IDs estables por item"""
+
+import re
+import sys
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from pos.config import MENU_CATEGORIES
+from pos.money import to_cents
+
+
+class MenuItem(NamedTuple):
+    """Vista de solo lectura de un item del catálogo"""
+    item_id: int
+    sku: str
+    name: str
+    category_key: str
+    index: int
+    price_cents: int
+
+
+def make_sku(category_key: str, name: str) -> str:
+    """SKU por defecto derivado de la categoría y el nombre ('food.soft-drink')"""
+    slug = re.sub(r'[^a-z0-9]+', '-', name.casefold()).strip('-')
+    return f'{category_key}.{slug}'
+
+
+def _name_key(name: str) -> str:
+    """Clave de búsqueda por nombre (sin mayúsculas ni espacios extremos)"""
+    return name.strip().casefold()
+
+
+class MenuCatalog:
+    """Menú en arreglos compactos con índices O(1) por SKU, nombre y categoría.
+
+    Cada item recibe un item_id entero denso; los items de una categoría son
+    contiguos, así que la categoría es un range() y el item_id coincide con la
+    posición en la fila plana de PricingEngine. El item_id reemplaza a los
+    pares (category_key, i) en recibos, totales y logs.
+    """
+
+    __slots__ = ('category_keys', 'display_names', 'skus', 'names', 'prices_cents',
+                 'category_codes', '_ranges', '_by_sku', '_by_name')
+
+    def __init__(self, categories: Sequence[Tuple[str, str, Sequence[Tuple[str, str, int]]]]):
+        """`categories` es [(category_key, display_name, [(sku, name, price_cents)...])...]"""
+        self.category_keys: Tuple[str, ...] = tuple(sys.intern(key) for key, _, _ in categories)
+        self.display_names: Dict[str, str] = {}
+        self.prices_cents = array('q')
+        self.category_codes = array('H')
+        self._ranges: Dict[str, range] = {}
+        self._by_sku: Dict[str, int] = {}
+        self._by_name: Dict[str, List[int]] = {}
+        skus: List[str] = []
+        names: List[str] = []
+
+        for code, (category_key, display_name, items) in enumerate(categories):
+            category_key = self.category_keys[code]
+            self.display_names[category_key] = display_name
+            start = len(names)
+            for sku, name, price_cents in items:
+                sku = sys.intern(sku)
+                if sku in self._by_sku:
+                    raise ValueError(f'Duplicate SKU: {sku}')
+                item_id = len(names)
+                skus.append(sku)
+                names.append(sys.intern(name))
+                self.prices_cents.append(price_cents)
+                self.category_codes.append(code)
+                self._by_sku[sku] = item_id
+                self._by_name.setdefault(_name_key(name), []).append(item_id)
+            self._ranges[category_key] = range(start, len(names))
+
+        self.skus: Tuple[str, ...] = tuple(skus)
+        self.names: Tuple[str, ...] = tuple(names)
+
+    @classmethod
+    def from_menu(cls, menu: Dict[str, Dict] = MENU_CATEGORIES) -> 'MenuCatalog':
+        """Construye el catálogo desde la estructura de MENU_CATEGORIES.
+
+        Una categoría puede traer una lista opcional 'skus' paralela a 'items';
+        si no, el SKU se deriva del nombre con make_sku().
+        """
+        categories = []
+        for category_key, info in menu.items():
+            items = info['items']
+            skus = info.get('skus') or [make_sku(category_key, name) for name in items]
+            rows = [(sku, name, to_cents(price))
+                    for sku, name, price in zip(skus, items, info['prices'])]
+            categories.append((category_key, info.get('display_name', category_key.title()), rows))
+        return cls(categories)
+
+    # --- Tamaño e iteración ---
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[MenuItem]:
+        return (self.item(item_id) for item_id in range(len(self.names)))
+
+    # --- Índices ---
+
+    def item(self, item_id: int) -> MenuItem:
+        """Item completo a partir de su item_id"""
+        category_key = self.category_keys[self.category_codes[item_id]]
+        return MenuItem(item_id, self.skus[item_id], self.names[item_id], category_key,
+                        item_id - self._ranges[category_key].start,
+                        self.prices_cents[item_id])
+
+    def by_sku(self, sku: str) -> Optional[int]:
+        """item_id para un SKU, o None"""
+        return self._by_sku.get(sku)
+
+    def by_name(self, name: str, category_key: Optional[str] = None) -> Optional[int]:
+        """item_id para un nombre (sin distinguir mayúsculas), opcionalmente por categoría"""
+        for item_id in self._by_name.get(_name_key(name), ()):
+            if category_key is None or self.category_of(item_id) == category_key:
+                return item_id
+        return None
+
+    def category_items(self, category_key: str) -> range:
+        """Rango de item_ids de una categoría"""
+        return self._ranges[category_key]
+
+    def category_of(self, item_id: int) -> str:
+        """Clave de categoría de un item"""
+        return self.category_keys[self.category_codes[item_id]]
+
+    def item_id(self, category_key: str, index: int) -> int:
+        """Traduce un par (category_key, i) al item_id estable"""
+        span = self._ranges[category_key]
+        if not 0 <= index < len(span):
+            raise IndexError(f'{category_key}[{index}] out of range')
+        return span.start + index
+
+    def locate(self, item_id: int) -> Tuple[str, int]:
+        """Traduce un item_id al par (category_key, i)"""
+        category_key = self.category_of(item_id)
+        return category_key, item_id - self._ranges[category_key].start
+
+    def category_prices(self, category_key: str) -> Tuple[int, ...]:
+        """Precios en centavos de una categoría, en orden de menú"""
+        span = self._ranges[category_key]
+        return tuple(self.prices_cents[span.start:span.stop])
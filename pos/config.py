@@ -0,0 +1,75 @@
+"""Configuración del menú e impuestos compartida por la GUI y el núcleo headless"""
+
+import os
+
+# ==============================================================
+# 🌟 MENU & TAX CONFIGURATION 🌟
+# ==============================================================
+
+MENU_CATEGORIES = {
+    'food': {
+        'items': ['Ramen', 'Salmon', 'Giyosas', 'Sushi', 'Hanbaga', 'Mochi', 'Onigiri', 'Curry'],
+        'prices': [1.32, 1.65, 2.31, 3.22, 1.22, 1.99, 2.05, 2.65],
+        'display_name': 'Food'
+    },
+    'drinks': {
+        'items': ['Water', 'Soda', 'Juice', 'Beer', 'Wine', 'Lemonade', 'Soft Drink', 'Chicha'],
+        'prices': [0.25, 0.99, 1.21, 1.54, 1.08, 1.10, 2.00, 1.58],
+        'display_name': 'Drinks'
+    },
+    'desserts': {
+        'items': ['Ice Cream', 'Fruit', 'Brownies', 'Flan', 'Mousse', 'Tiramisu', 'Cheesecake', 'Cupcake'],
+        'prices': [1.54, 1.68, 1.32, 1.97, 2.55, 2.14, 1.94, 1.74],
+        'display_name': 'Desserts'
+    }
+}
+
+TAX_RATE = 0.07
+
+# ==============================================================
+# 🌟 LOCAL STORAGE 🌟
+# ==============================================================
+
+# Directorio de datos locales (journal, historial); se puede cambiar con POS_DATA_DIR
+DATA_DIR = os.environ.get('POS_DATA_DIR', 'pos_data')
+JOURNAL_FILE = 'journal.log'
+
+# Números de recibo: contador compartido, reservado por bloques en cada terminal
+RECEIPT_ID_FILE = 'receipt_ids.dat'
+RECEIPT_ID_BLOCK = 50
+FIRST_RECEIPT_NUMBER = 1000
+
+# Hub de órdenes local ('host:port' o 'unix:/ruta'); vacío = sin hub
+HUB_ADDRESS = os.environ.get('POS_HUB', '')
+
+# Log local e impresora térmica (dispositivo o archivo; vacío = sin impresora)
+LOG_FILE = 'pos.log'
+PRINTER_PATH = os.environ.get('POS_PRINTER', '')
+
+# ==============================================================
+# 🌟 INSTRUMENTATION 🌟
+# ==============================================================
+
+# Instrumentación opcional (POS_INSTRUMENT=1 o --instrument); apagada no cuesta nada
+INSTRUMENT = os.environ.get('POS_INSTRUMENT', '') not in ('', '0')
+METRICS_FILE = 'metrics.json'
+METRICS_DUMP_SECONDS = 30
+STALL_PROBE_MS = 50  # Intervalo del latido que detecta bloqueos del event loop
+STALL_THRESHOLD_MS = 100  # Retraso del latido a partir del cual cuenta como stall
+OVERLAY_REFRESH_MS = 1000
+
+# ==============================================================
+# 🌟 MENU FILE 🌟
+# ==============================================================
+
+# Menú desde un archivo JSON (POS_MENU); vacío = MENU_CATEGORIES. Se relee en caliente
+MENU_FILE = os.environ.get('POS_MENU', '')
+MENU_RELOAD_MS = 2000
+
+# ==============================================================
+# 🌟 PRICING RULES 🌟
+# ==============================================================
+
+# Reglas de precio desde un archivo JSON (POS_RULES): impuesto por categoría,
+# descuentos por franja horaria y combos; vacío = TAX_RATE sobre todo el subtotal
+RULES_FILE = os.environ.get('POS_RULES', '')
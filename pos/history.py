@@ -0,0 +1,300 @@
+"""Índice de recibos sobre el journal: búsqueda por número, fecha, item y total, y reimpresión"""
+
+import bisect
+import datetime
+import heapq
+import os
+import sys
+import threading
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from pos.journal import RECORD_ORDER, read_record, scan_records
+from pos.receipts import Receipt, receipt_from_dict, render_text
+
+BULK_SORT_THRESHOLD = 64  # Con más filas nuevas que esto se reordena en bloque en vez de insertar
+
+TimeOfDay = Tuple[datetime.time, datetime.time]
+
+
+class SearchResult(NamedTuple):
+    """Números encontrados (los más recientes primero) y cuántos cumplían los filtros"""
+    numbers: List[int]
+    matched: int
+
+    @property
+    def truncated(self) -> bool:
+        return len(self.numbers) < self.matched
+
+
+class _SortedKeys:
+    """Claves ordenadas (fecha o total) con la fila a la que apunta cada una"""
+
+    __slots__ = ('keys', 'rows', 'sorted_rows')
+
+    def __init__(self, typecode: str):
+        self.keys = array(typecode)
+        self.rows = array('I')
+        self.sorted_rows = 0  # Filas del índice ya incluidas
+
+    def catch_up(self, column: Sequence):
+        """Incorpora las filas nuevas de `column`: inserción o reordenamiento en bloque"""
+        total = len(column)
+        if total - self.sorted_rows > BULK_SORT_THRESHOLD:
+            order = sorted(range(total), key=column.__getitem__)
+            self.keys = array(self.keys.typecode, (column[row] for row in order))
+            self.rows = array('I', order)
+        else:
+            for row in range(self.sorted_rows, total):
+                position = bisect.bisect_right(self.keys, column[row])
+                self.keys.insert(position, column[row])
+                self.rows.insert(position, row)
+        self.sorted_rows = total
+
+    def between(self, low=None, high=None) -> array:
+        """Filas con clave en [low, high] (sin límite si es None)"""
+        start = 0 if low is None else bisect.bisect_left(self.keys, low)
+        stop = len(self.keys) if high is None else bisect.bisect_right(self.keys, high)
+        return self.rows[start:stop]
+
+
+class ReceiptIndex:
+    """Índice incremental de los recibos registrados en el journal.
+
+    Cada versión registrada de una orden es una fila en columnas compactas
+    (array): número, fecha, total, minuto del día y offset del registro en el
+    journal. Solo cuenta la última versión de cada número; el recibo completo
+    se relee del journal al reimprimirlo, así un año de historia ocupa poca
+    memoria. refresh() lee solo lo que se agregó desde la última vez.
+    """
+
+    def __init__(self, journal_path: str):
+        self.path = journal_path
+        self.scanned_bytes = 0
+        self.numbers = array('q')
+        self.issued = array('d')  # Epoch (hora local)
+        self.minutes = array('H')  # Minuto del día, para filtrar franjas horarias
+        self.totals = array('q')
+        self.offsets = array('Q')
+        self.alive = bytearray()
+        self._by_number: Dict[int, int] = {}
+        self._by_sku: Dict[str, array] = {}
+        self._skus_by_name: Dict[str, Set[str]] = {}
+        self._by_time = _SortedKeys('d')
+        self._by_total = _SortedKeys('q')
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_number)
+
+    # --- Actualización incremental ---
+
+    def refresh(self) -> int:
+        """Indexa los registros nuevos del journal; devuelve cuántas órdenes agregó"""
+        with self._lock:
+            added = 0
+            start = self.scanned_bytes
+            for record, end in scan_records(self.path, start):
+                if record.get('type') == RECORD_ORDER:
+                    self._add(record['order'], start)
+                    added += 1
+                start = self.scanned_bytes = end
+            # Los índices ordenados se ponen al día aquí (en segundo plano), no al consultar
+            self._by_time.catch_up(self.issued)
+            self._by_total.catch_up(self.totals)
+            return added
+
+    def _add(self, order: Dict, offset: int):
+        number = order['number']
+        previous = self._by_number.get(number)
+        if previous is not None:
+            self.alive[previous] = 0  # Una versión más nueva reemplaza a la anterior
+
+        issued_at = datetime.datetime.fromisoformat(order['issued_at'])
+        row = len(self.numbers)
+        self.numbers.append(number)
+        self.issued.append(issued_at.timestamp())
+        self.minutes.append(issued_at.hour * 60 + issued_at.minute)
+        self.totals.append(order['total_cents'])
+        self.offsets.append(offset)
+        self.alive.append(1)
+        self._by_number[number] = row
+
+        for sku in {line['sku'] for line in order['lines']}:
+            postings = self._by_sku.get(sku)
+            if postings is None:
+                postings = self._by_sku[sku] = array('I')
+            postings.append(row)
+        for line in order['lines']:
+            self._skus_by_name.setdefault(line['name'].casefold(), set()).add(line['sku'])
+
+    # --- Consultas ---
+
+    def receipt(self, number: int) -> Optional[Receipt]:
+        """Última versión registrada de un recibo (releída del journal)"""
+        with self._lock:
+            row = self._by_number.get(number)
+            if row is None:
+                return None
+            offset = self.offsets[row]
+        return receipt_from_dict(read_record(self.path, offset)['order'])
+
+    def reprint(self, number: int) -> Optional[str]:
+        """Recibo con el mismo formato de texto que genera la caja"""
+        receipt = self.receipt(number)
+        return None if receipt is None else render_text(receipt)
+
+    def skus_for(self, item: str) -> Set[str]:
+        """SKUs que corresponden a un SKU o nombre de item (sin distinguir mayúsculas)"""
+        if item in self._by_sku:
+            return {item}
+        return set(self._skus_by_name.get(item.strip().casefold(), ()))
+
+    def search(self, item: Optional[str] = None,
+               start: Optional[datetime.datetime] = None, end: Optional[datetime.datetime] = None,
+               min_cents: Optional[int] = None, max_cents: Optional[int] = None,
+               time_of_day: Optional[TimeOfDay] = None,
+               limit: Optional[int] = None) -> SearchResult:
+        """Recibos que cumplen todos los filtros, del más reciente al más antiguo.
+
+        Se parte de la lista candidata más corta (postings del item, rango de
+        fechas o rango de totales) y el resto de los filtros se verifica fila
+        por fila contra las columnas. Con `limit` se devuelven solo los
+        `limit` más recientes; `matched` dice cuántos había en total.
+        """
+        with self._lock:
+            sources: List[Iterable[int]] = []
+            item_rows: Optional[Set[int]] = None
+            if item is not None:
+                postings = [self._by_sku[sku] for sku in self.skus_for(item)]
+                item_rows = set().union(*postings)
+                sources.append(item_rows)
+
+            low_time = start.timestamp() if start is not None else None
+            high_time = end.timestamp() if end is not None else None
+            if low_time is not None or high_time is not None:
+                sources.append(self._by_time.between(low_time, high_time))
+            if min_cents is not None or max_cents is not None:
+                sources.append(self._by_total.between(min_cents, max_cents))
+            if not sources:
+                sources.append(range(len(self.numbers)))
+
+            if time_of_day is not None:
+                first, last = time_of_day
+                low_minute, high_minute = first.hour * 60 + first.minute, last.hour * 60 + last.minute
+
+            rows = []
+            for row in min(sources, key=len):
+                if not self.alive[row]:
+                    continue
+                if item_rows is not None and row not in item_rows:
+                    continue
+                if low_time is not None and self.issued[row] < low_time:
+                    continue
+                if high_time is not None and self.issued[row] > high_time:
+                    continue
+                if min_cents is not None and self.totals[row] < min_cents:
+                    continue
+                if max_cents is not None and self.totals[row] > max_cents:
+                    continue
+                if time_of_day is not None:
+                    minute = self.minutes[row]
+                    # Una franja que cruza la medianoche (22:00-02:00) se invierte
+                    if low_minute <= high_minute:
+                        if not low_minute <= minute < high_minute:
+                            continue
+                    elif high_minute <= minute < low_minute:
+                        continue
+                rows.append(row)
+
+            # A igual fecha, la fila posterior del journal es la más reciente
+            newest = lambda row: (self.issued[row], row)
+            if limit is not None and limit < len(rows):
+                ordered = heapq.nlargest(limit, rows, key=newest)
+            else:
+                ordered = sorted(rows, key=newest, reverse=True)
+            return SearchResult([self.numbers[row] for row in ordered], len(rows))
+
+    def summary(self, number: int) -> Tuple[int, datetime.datetime, int]:
+        """(número, fecha, total en centavos) sin releer el journal"""
+        with self._lock:
+            row = self._by_number[number]
+            return number, datetime.datetime.fromtimestamp(self.issued[row]), self.totals[row]
+
+
+# ==============================================================
+# 🌟 COMMAND LINE 🌟
+# ==============================================================
+
+def parse_bound(text: str, end: bool = False) -> datetime.datetime:
+    """'YYYY-MM-DD[ HH:MM]'; una fecha sola como límite final incluye todo ese día"""
+    text = text.strip()
+    moment = datetime.datetime.fromisoformat(text)
+    if end and len(text) <= len('YYYY-MM-DD'):
+        moment += datetime.timedelta(days=1, microseconds=-1)
+    return moment
+
+
+def parse_time_of_day(text: str) -> TimeOfDay:
+    """'19:00-20:00' -> (time(19, 0), time(20, 0))"""
+    first, _, last = text.partition('-')
+    return datetime.time.fromisoformat(first.strip()), datetime.time.fromisoformat(last.strip())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """python -m pos.history [--journal FILE] [--number N | filtros] [--json]"""
+    import argparse
+    import json
+    import time
+
+    from pos.config import DATA_DIR, JOURNAL_FILE
+    from pos.money import format_money, to_cents
+    from pos.receipts import receipt_to_dict
+
+    parser = argparse.ArgumentParser(prog='python -m pos.history',
+                                     description='Look up and reprint recorded receipts')
+    parser.add_argument('--journal', default=os.path.join(DATA_DIR, JOURNAL_FILE))
+    parser.add_argument('--number', type=int, help='reprint this receipt number')
+    parser.add_argument('--item', help='SKU or item name')
+    parser.add_argument('--from', dest='start', type=parse_bound,
+                        help='issued at or after (YYYY-MM-DD[ HH:MM])')
+    parser.add_argument('--to', dest='end', type=lambda text: parse_bound(text, end=True),
+                        help='issued at or before (YYYY-MM-DD[ HH:MM])')
+    parser.add_argument('--time', type=parse_time_of_day, help='time of day, e.g. 19:00-20:00')
+    parser.add_argument('--min-total', type=to_cents, help='minimum total, e.g. 12.50')
+    parser.add_argument('--max-total', type=to_cents, help='maximum total')
+    parser.add_argument('--limit', type=int)
+    parser.add_argument('--json', action='store_true', help='print matching receipts as JSON lines')
+    parser.add_argument('--reprint', action='store_true', help='print every match in full')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    index = ReceiptIndex(args.journal)
+    index.refresh()
+    indexed = time.perf_counter()
+
+    if args.number is not None:
+        numbers = [args.number] if index.receipt(args.number) is not None else []
+        matched = len(numbers)
+        args.reprint = True
+    else:
+        numbers, matched = index.search(args.item, args.start, args.end, args.min_total,
+                                        args.max_total, args.time, args.limit)
+    searched = time.perf_counter()
+
+    for number in numbers:
+        if args.json:
+            print(json.dumps(receipt_to_dict(index.receipt(number))))
+        elif args.reprint:
+            print(index.reprint(number))
+        else:
+            _, issued_at, total_cents = index.summary(number)
+            print(f'N# {number:<10} {issued_at:%Y-%m-%d %H:%M:%S} {format_money(total_cents):>12}')
+    shown = f'{len(numbers)} of {matched}' if len(numbers) < matched else f'{len(numbers)}'
+    print(f'{shown} receipts (newest first); indexed {len(index)} in {indexed - started:.3f}s, '
+          f'query {(searched - indexed) * 1000:.2f} ms', file=sys.stderr)
+    return 0 if numbers else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
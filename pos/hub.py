@@ -0,0 +1,642 @@
+"""Hub local de órdenes (asyncio): terminales publican, cocina y displays se suscriben"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from pos.config import HUB_ADDRESS
+
+# Cada frame: [longitud u32][payload JSON]; un frame lleva un lote de órdenes
+FRAME_HEADER = struct.Struct('>I')
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+MAX_BATCH = 256           # Órdenes por frame
+SEND_WINDOW = 8           # Frames sin ack que una terminal puede tener en vuelo
+SUBSCRIBER_QUEUE = 64     # Lotes encolados por suscriptor antes de frenar a las terminales
+PUBLISH_TIMEOUT = 5.0     # Segundos para que el hub confirme una orden antes de reportarla
+CONNECT_TIMEOUT = 3.0     # Segundos para abrir la conexión con el hub
+RECONNECT_DELAY = 0.5     # Primera espera antes de reconectar; se duplica hasta el máximo
+MAX_RECONNECT_DELAY = 30.0
+OUTBOX_LIMIT = 10000      # Órdenes sin ack que una terminal guarda mientras el hub no está
+
+ROLE_TERMINAL = 'terminal'
+ROLE_SUBSCRIBER = 'subscriber'
+
+
+class HubError(Exception):
+    """Error de protocolo o de conexión con el hub"""
+
+
+# ==============================================================
+# 🌟 FRAMING 🌟
+# ==============================================================
+
+def encode_frame(message: Dict) -> bytes:
+    """Serializa un mensaje con su prefijo de longitud"""
+    payload = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict]:
+    """Lee un frame completo; None si la conexión se cerró limpiamente"""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial:
+            raise HubError('Connection closed mid-frame') from exc
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise HubError(f'Frame too large: {length} bytes')
+    try:
+        payload = await reader.readexactly(length)
+    except asyncio.IncompleteReadError as exc:
+        raise HubError('Connection closed mid-frame') from exc
+    return json.loads(payload)
+
+
+def parse_address(address: str) -> Tuple[Optional[str], Optional[int], Optional[str]]:
+    """'host:port' o 'unix:/ruta/socket' -> (host, port, path); ValueError si no es válida"""
+    if address.startswith('unix:'):
+        path = address[len('unix:'):]
+        if not path:
+            raise ValueError(f"Invalid hub address {address!r}: expected 'unix:/path/to/socket'")
+        return None, None, path
+    host, _, port = address.rpartition(':')
+    if not port.isdigit() or not 0 <= int(port) <= 65535:
+        raise ValueError(f"Invalid hub address {address!r}: expected 'host:port' "
+                         f"or 'unix:/path/to/socket'")
+    return host or '127.0.0.1', int(port), None
+
+
+async def open_connection(address: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Abre una conexión TCP o Unix según la dirección"""
+    host, port, path = parse_address(address)
+    if path is not None:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
+
+
+# ==============================================================
+# 🌟 HUB SERVER 🌟
+# ==============================================================
+
+class _Subscriber:
+    __slots__ = ('writer', 'queue')
+
+    def __init__(self, writer: asyncio.StreamWriter, queue_size: int):
+        self.writer = writer
+        self.queue: 'asyncio.Queue[List[Dict]]' = asyncio.Queue(queue_size)
+
+
+class OrderHub:
+    """Servidor de órdenes con conexiones persistentes y backpressure.
+
+    Las terminales envían lotes ('submit') y reciben un 'ack' por lote cuando
+    el hub ya lo entregó a las colas de los suscriptores (y al journal, si hay).
+    Si un suscriptor se atrasa su cola acotada se llena, el hub deja de leer de
+    las terminales y TCP propaga la presión hasta ellas.
+    """
+
+    def __init__(self, journal=None, subscriber_queue: int = SUBSCRIBER_QUEUE,
+                 max_batch: int = MAX_BATCH):
+        self.journal = journal
+        self.subscriber_queue = subscriber_queue
+        self.max_batch = max_batch
+        self.subscribers: List[_Subscriber] = []
+        self.orders_in = 0
+        self.frames_in = 0
+        self.frames_out = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: set = set()
+
+    async def start(self, address: str = '127.0.0.1:0') -> str:
+        """Empieza a escuchar; devuelve la dirección real (con el puerto asignado)"""
+        host, port, path = parse_address(address)
+        if path is not None:
+            if os.path.exists(path):
+                os.unlink(path)
+            self._server = await asyncio.start_unix_server(self._handle, path)
+            return address
+        self._server = await asyncio.start_server(self._handle, host, port)
+        sock_host, sock_port = self._server.sockets[0].getsockname()[:2]
+        return f'{sock_host}:{sock_port}'
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Cierra el servidor y todas las conexiones"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Cerrar los sockets termina los loops de cada conexión (EOF)
+        for writer in list(self._connections):
+            writer.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections.add(writer)
+        try:
+            hello = await read_frame(reader)
+            role = hello.get('role') if hello else None
+            if role == ROLE_TERMINAL:
+                await self._terminal_loop(reader, writer)
+            elif role == ROLE_SUBSCRIBER:
+                await self._subscriber_loop(reader, writer)
+        except (HubError, ConnectionError, ValueError):
+            pass  # Cliente con protocolo inválido o desconectado: se descarta
+        except asyncio.CancelledError:
+            pass  # El loop se está apagando: cerrar la conexión sin ruido
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _terminal_loop(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        while True:
+            frame = await read_frame(reader)
+            if frame is None:
+                return
+            orders = frame.get('orders') or []
+            self.frames_in += 1
+            self.orders_in += len(orders)
+            if orders and self.journal is not None:
+                await loop.run_in_executor(None, self._journal_batch, orders)
+            if orders:
+                await self._publish(orders)
+            writer.write(encode_frame({'op': 'ack', 'id': frame.get('id'), 'count': len(orders)}))
+            await writer.drain()
+
+    def _journal_batch(self, orders: List[Dict]):
+        """Registra un lote en el journal esperando un solo commit (el del último)"""
+        for order in orders[:-1]:
+            self.journal.append_order(order, wait=False)
+        self.journal.append_order(orders[-1], wait=True)
+
+    async def _publish(self, orders: List[Dict]):
+        for subscriber in list(self.subscribers):
+            await subscriber.queue.put(orders)
+
+    async def _subscriber_loop(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscriber = _Subscriber(writer, self.subscriber_queue)
+        self.subscribers.append(subscriber)
+        closed = asyncio.ensure_future(reader.read())  # EOF = el suscriptor se fue
+        try:
+            while True:
+                getter = asyncio.ensure_future(subscriber.queue.get())
+                done, _ = await asyncio.wait({getter, closed}, return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    return
+
+                # Juntar lo que ya está encolado en un solo frame
+                batch = list(getter.result())
+                while len(batch) < self.max_batch and not subscriber.queue.empty():
+                    batch.extend(subscriber.queue.get_nowait())
+                writer.write(encode_frame({'op': 'orders', 'orders': batch}))
+                self.frames_out += 1
+                await writer.drain()
+        finally:
+            closed.cancel()
+            self.subscribers.remove(subscriber)
+
+
+# ==============================================================
+# 🌟 CLIENTS 🌟
+# ==============================================================
+
+class HubClient:
+    """Cliente persistente del hub (terminal o suscriptor).
+
+    Como terminal, submit() acumula órdenes y las envía en lotes; como mucho
+    SEND_WINDOW lotes quedan sin ack, después submit() espera (backpressure).
+    Si la conexión se pierde, `lost` termina, quien espera crédito o acks
+    recibe HubError y unsent() devuelve lo que el hub no confirmó.
+    """
+
+    def __init__(self, role: str = ROLE_TERMINAL, max_batch: int = MAX_BATCH,
+                 window: int = SEND_WINDOW):
+        self.role = role
+        self.max_batch = max_batch
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self._pending: List[Dict] = []
+        self._in_flight: Dict[int, List[Dict]] = {}  # Lotes enviados sin ack, por id de frame
+        self._credits = asyncio.Semaphore(window)
+        self._unacked = 0
+        self._all_acked = asyncio.Event()
+        self._all_acked.set()
+        self._flush_scheduled = False
+        self._frame_id = 0
+        self._ack_task: Optional[asyncio.Task] = None
+        self.acked = 0
+        self.on_ack: Optional[Callable[[List[Dict]], None]] = None  # Lote confirmado por el hub
+        self.error: Optional[BaseException] = None
+        self.lost: Optional[asyncio.Future] = None  # Termina cuando la conexión se pierde
+
+    async def connect(self, address: str, timeout: float = CONNECT_TIMEOUT) -> 'HubClient':
+        """Conecta y saluda al hub (TimeoutError si no responde en `timeout` segundos)"""
+        self.lost = asyncio.get_running_loop().create_future()
+        self.reader, self.writer = await asyncio.wait_for(open_connection(address), timeout)
+        self.writer.write(encode_frame({'op': 'hello', 'role': self.role}))
+        await self.writer.drain()
+        if self.role == ROLE_TERMINAL:
+            self._ack_task = asyncio.ensure_future(self._read_acks())
+        return self
+
+    # --- Terminal ---
+
+    async def submit(self, order: Dict):
+        """Encola una orden; se envía en el próximo lote"""
+        self._check()
+        self._pending.append(order)
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(
+                lambda: asyncio.ensure_future(self._scheduled_flush()))
+
+    def requeue(self, orders: List[Dict]):
+        """Agrega órdenes a enviar en el próximo flush (p. ej. las de una conexión anterior)"""
+        self._pending.extend(orders)
+
+    async def _scheduled_flush(self):
+        try:
+            await self.flush()
+        except HubError:
+            pass  # La pérdida ya quedó en `lost`; las órdenes siguen en unsent()
+
+    async def flush(self):
+        """Envía lo acumulado como un frame (espera crédito si la ventana está llena)"""
+        self._flush_scheduled = False
+        while self._pending:
+            await self._acquire_credit()
+            if not self._pending:  # Otro flush lo envió mientras se esperaba
+                self._credits.release()
+                return
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            self._frame_id += 1
+            self._unacked += 1
+            self._all_acked.clear()
+            self._in_flight[self._frame_id] = batch
+            self.writer.write(encode_frame({'op': 'submit', 'id': self._frame_id, 'orders': batch}))
+            try:
+                await self.writer.drain()
+            except ConnectionError as exc:
+                self._fail(exc)
+                self._check()
+
+    async def _acquire_credit(self):
+        self._check()
+        if not self._credits.locked():
+            await self._credits.acquire()
+            return
+        acquire = asyncio.ensure_future(self._credits.acquire())
+        await asyncio.wait({acquire, self.lost}, return_when=asyncio.FIRST_COMPLETED)
+        if not acquire.done():
+            acquire.cancel()
+        elif self.error is not None:
+            self._credits.release()
+        self._check()
+
+    async def wait_acked(self):
+        """Espera a que el hub confirme todo lo enviado (HubError si se cae antes)"""
+        await self.flush()
+        await self._all_acked.wait()
+        if self._in_flight:
+            self._check()
+
+    def unsent(self) -> List[Dict]:
+        """Órdenes sin ack del hub, en el orden en que se enviaron o encolaron"""
+        return [order for batch in self._in_flight.values() for order in batch] + self._pending
+
+    def _check(self):
+        if self.error is not None:
+            raise HubError(f'Hub connection lost: {self.error}')
+
+    def _fail(self, error: BaseException):
+        """Marca la conexión como perdida y despierta a todos los que esperan"""
+        if self.error is None:
+            self.error = error
+        self._all_acked.set()
+        if self.lost is not None and not self.lost.done():
+            self.lost.set_result(None)
+
+    async def _read_acks(self):
+        error: BaseException = HubError('Hub closed the connection')
+        try:
+            while True:
+                frame = await read_frame(self.reader)
+                if frame is None:
+                    break
+                if frame.get('op') == 'ack':
+                    self._acked(frame)
+        except (HubError, ConnectionError, ValueError) as exc:
+            error = exc
+        self._fail(error)
+
+    def _acked(self, frame: Dict):
+        batch = self._in_flight.pop(frame.get('id'), None)
+        self.acked += frame.get('count', 0)
+        self._unacked -= 1
+        self._credits.release()
+        if not self._unacked:
+            self._all_acked.set()
+        if batch and self.on_ack is not None:
+            self.on_ack(batch)
+
+    # --- Suscriptor ---
+
+    async def batches(self) -> AsyncIterator[List[Dict]]:
+        """Itera los lotes de órdenes que envía el hub"""
+        while True:
+            frame = await read_frame(self.reader)
+            if frame is None:
+                return
+            if frame.get('op') == 'orders':
+                yield frame['orders']
+
+    async def close(self):
+        try:
+            if self.role == ROLE_TERMINAL and self.writer is not None and self.error is None:
+                await self.wait_acked()
+        finally:
+            if self._ack_task is not None:
+                self._ack_task.cancel()
+            if self.writer is not None:
+                self.writer.close()
+
+
+class HubPublisher:
+    """Puente para código síncrono (la GUI): publica órdenes desde cualquier hilo.
+
+    Corre su propio event loop en un hilo daemon con un HubClient terminal.
+    Si el hub se cae, las órdenes sin ack se guardan y se reenvían al
+    reconectar (con espera exponencial): la entrega es al menos una vez.
+    """
+
+    def __init__(self, address: str = HUB_ADDRESS, connect_timeout: float = CONNECT_TIMEOUT,
+                 retry_delay: float = RECONNECT_DELAY, max_retry_delay: float = MAX_RECONNECT_DELAY):
+        parse_address(address)  # ValueError antes de arrancar el hilo
+        self.address = address
+        self.connect_timeout = connect_timeout
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.loop = asyncio.new_event_loop()
+        self.client: Optional[HubClient] = None
+        self.reconnects = 0
+        self._backlog: List[Dict] = []  # Órdenes a reenviar cuando vuelva la conexión
+        self._waiting: Dict[int, Tuple[Dict, concurrent.futures.Future]] = {}
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._thread = threading.Thread(target=self.loop.run_forever, name='hub-publisher',
+                                        daemon=True)
+        self._thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self._connect(), self.loop).result(
+                connect_timeout + 1)
+        except BaseException:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            raise
+
+    async def _connect(self):
+        client = HubClient(ROLE_TERMINAL)
+        client.on_ack = self._acked
+        await client.connect(self.address, self.connect_timeout)
+        self.client = client
+        self._watch_task = asyncio.ensure_future(self._watch(client))
+        backlog, self._backlog = self._backlog, []
+        client.requeue(backlog)  # Si la conexión vuelve a caer, siguen en unsent()
+        await client.flush()
+
+    async def _watch(self, client: HubClient):
+        """Al perder la conexión guarda lo que no tuvo ack y empieza a reconectar"""
+        await client.lost
+        if self.client is client:
+            self.client = None
+        newer, self._backlog = self._backlog, []
+        self._hold(client.unsent() + newer)
+        client.writer.close()
+        if not self._closing and self._reconnect_task is None:
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self):
+        delay = self.retry_delay
+        try:
+            while not self._closing:
+                await asyncio.sleep(delay)
+                try:
+                    await self._connect()
+                except (OSError, HubError):
+                    delay = min(delay * 2, self.max_retry_delay)
+                    continue
+                self.reconnects += 1
+                return
+        finally:
+            self._reconnect_task = None
+
+    def publish(self, order: Dict) -> 'concurrent.futures.Future':
+        """Envía una orden al hub sin bloquear al llamador.
+
+        Devuelve un Future que termina cuando el hub confirma la orden y que
+        falla si no la confirmó en PUBLISH_TIMEOUT segundos. Una orden que
+        falló sigue en cola y se reenvía cuando el hub vuelva.
+        """
+        result: concurrent.futures.Future = concurrent.futures.Future()
+        self.loop.call_soon_threadsafe(self._enqueue, order, result)
+        return result
+
+    def _enqueue(self, order: Dict, result: concurrent.futures.Future):
+        self._waiting[id(order)] = (order, result)
+        self.loop.call_later(PUBLISH_TIMEOUT, self._expire, result)
+        client = self.client
+        if client is not None and client.error is None:
+            asyncio.ensure_future(self._send(client, order))
+        else:
+            self._hold([order])
+
+    async def _send(self, client: HubClient, order: Dict):
+        try:
+            await client.submit(order)
+        except HubError:
+            self._hold([order])  # La conexión ya se perdió: va con el reenvío
+
+    def _hold(self, orders: List[Dict]):
+        """Guarda órdenes para el reenvío; pasado OUTBOX_LIMIT se descartan las más viejas"""
+        self._backlog.extend(orders)
+        overflow = len(self._backlog) - OUTBOX_LIMIT
+        if overflow > 0:
+            for order in self._backlog[:overflow]:
+                self._waiting.pop(id(order), None)
+            del self._backlog[:overflow]
+
+    def _acked(self, batch: List[Dict]):
+        for order in batch:
+            entry = self._waiting.pop(id(order), None)
+            if entry is not None and not entry[1].done():
+                entry[1].set_result(None)
+
+    @staticmethod
+    def _expire(result: concurrent.futures.Future):
+        if not result.done():
+            result.set_exception(TimeoutError(
+                f'hub did not confirm the order in {PUBLISH_TIMEOUT:g}s; it will be resent'))
+
+    async def _close(self):
+        self._closing = True
+        for task in (self._reconnect_task, self._watch_task):
+            if task is not None:
+                task.cancel()
+        if self.client is not None:
+            await self.client.close()
+
+    def close(self, timeout: float = 5.0):
+        """Espera los acks pendientes y detiene el hilo"""
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), self.loop).result(timeout)
+        finally:
+            for _, result in list(self._waiting.values()):
+                if not result.done():
+                    result.set_exception(HubError('hub publisher closed'))
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+
+
+# ==============================================================
+# 🌟 LOOPBACK LOAD GENERATOR 🌟
+# ==============================================================
+
+def _sample_orders(count: int = 16) -> List[Dict]:
+    """Órdenes de ejemplo construidas con el menú real"""
+    import datetime
+    import random
+
+    from pos.pricing import PricingEngine
+    from pos.receipts import build_receipt, receipt_to_dict
+
+    engine = PricingEngine()
+    rng = random.Random(42)
+    issued_at = datetime.datetime(2026, 1, 1, 12, 0, 0)
+    return [
+        receipt_to_dict(build_receipt(
+            engine, [(rng.randrange(engine.width), rng.randint(1, 3)) for _ in range(4)],
+            number, issued_at))
+        for number in range(count)
+    ]
+
+
+async def run_load(terminals: int = 8, orders_per_terminal: int = 2000, subscribers: int = 1,
+                   address: str = '127.0.0.1:0') -> Dict:
+    """Simula N terminales contra un hub local y mide throughput y latencia"""
+    hub = OrderHub()
+    address = await hub.start(address)
+    templates = _sample_orders()
+    expected = terminals * orders_per_terminal
+    latencies: List[float] = []
+
+    async def subscriber_task(record: bool):
+        client = await HubClient(ROLE_SUBSCRIBER).connect(address)
+        received = 0
+        async for batch in client.batches():
+            now = time.perf_counter()
+            if record:
+                latencies.extend(now - order['sent_at'] for order in batch)
+            received += len(batch)
+            if received >= expected:
+                break
+        await client.close()
+
+    async def terminal_task(terminal: int):
+        client = await HubClient(ROLE_TERMINAL).connect(address)
+        for i in range(orders_per_terminal):
+            order = dict(templates[i % len(templates)],
+                         number=terminal * orders_per_terminal + i,
+                         sent_at=time.perf_counter())
+            await client.submit(order)
+        await client.close()
+
+    readers = [asyncio.ensure_future(subscriber_task(index == 0)) for index in range(subscribers)]
+    while len(hub.subscribers) < subscribers:
+        await asyncio.sleep(0.001)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(terminal_task(t) for t in range(terminals)))
+    await asyncio.gather(*readers)
+    elapsed = time.perf_counter() - started
+    await hub.close()
+
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    return {
+        'terminals': terminals,
+        'subscribers': subscribers,
+        'orders': expected,
+        'seconds': elapsed,
+        'orders_per_second': expected / elapsed if elapsed else 0.0,
+        'frames_in': hub.frames_in,
+        'frames_out': hub.frames_out,
+        'latency_ms_p50': pick(0.50),
+        'latency_ms_p99': pick(0.99),
+    }
+
+
+# ==============================================================
+# 🌟 COMMAND LINE 🌟
+# ==============================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """python -m pos.hub serve|bench ..."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m pos.hub', description='Local POS order hub')
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help='run the hub')
+    serve.add_argument('--address', default=HUB_ADDRESS or '127.0.0.1:8765',
+                       help="'host:port' or 'unix:/path/to/socket'")
+    serve.add_argument('--journal', help='also journal every order to this file')
+    bench = commands.add_parser('bench', help='loopback load test with simulated terminals')
+    bench.add_argument('--terminals', type=int, default=8)
+    bench.add_argument('--orders', type=int, default=2000, help='orders per terminal')
+    bench.add_argument('--subscribers', type=int, default=1)
+    bench.add_argument('--address', default='127.0.0.1:0')
+    args = parser.parse_args(argv)
+    try:
+        parse_address(args.address)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    if args.command == 'bench':
+        result = asyncio.run(run_load(args.terminals, args.orders, args.subscribers, args.address))
+        print(json.dumps(result))
+        return 0
+
+    async def serve_hub():
+        journal = None
+        if args.journal:
+            from pos.journal import OrderJournal
+            journal = OrderJournal(args.journal)
+        hub = OrderHub(journal)
+        print(f'Order hub listening on {await hub.start(args.address)}', file=sys.stderr)
+        try:
+            await hub.serve_forever()
+        finally:
+            await hub.close()
+            if journal is not None:
+                journal.close()
+
+    try:
+        asyncio.run(serve_hub())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
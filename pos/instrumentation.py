@@ -0,0 +1,152 @@
+"""Instrumentación opcional: histogramas de latencia por acción y stalls del event loop"""
+
+import functools
+import json
+import os
+import sys
+import time
+from array import array
+from typing import Callable, Dict, Optional
+
+from pos.config import STALL_PROBE_MS, STALL_THRESHOLD_MS
+
+BUCKETS = 32  # Cubeta i: [2^i, 2^(i+1)) microsegundos (la 0 incluye < 1 µs)
+STALLS = 'event_loop.stall'
+
+
+def bucket_for(micros: float) -> int:
+    """Cubeta logarítmica (base 2) de una latencia en microsegundos"""
+    return min(BUCKETS - 1, max(0, int(micros).bit_length() - 1))
+
+
+class LatencyHistogram:
+    """Histograma logarítmico de latencias: memoria fija y registro O(1)"""
+
+    __slots__ = ('counts', 'count', 'total_us', 'max_us')
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * BUCKETS))
+        self.count = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+
+    def record(self, micros: float):
+        self.counts[bucket_for(micros)] += 1
+        self.count += 1
+        self.total_us += micros
+        if micros > self.max_us:
+            self.max_us = micros
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'total_us': self.total_us,
+            'max_us': self.max_us,
+            'buckets': {str(1 << i): n for i, n in enumerate(self.counts) if n},
+        }
+
+
+def percentile(stats: Dict, fraction: float) -> float:
+    """Percentil aproximado (límite superior de la cubeta, acotado por el máximo)"""
+    if not stats['count']:
+        return 0.0
+    rank = fraction * stats['count']
+    seen = 0
+    for lower, n in sorted((int(lower), n) for lower, n in stats['buckets'].items()):
+        seen += n
+        if seen >= rank:
+            return min(float(lower * 2), stats['max_us'])
+    return stats['max_us']
+
+
+class Instrumentation:
+    """Mide callbacks de la GUI y la puntualidad del event loop.
+
+    Solo existe cuando se activa: sin ella los callbacks se conectan tal cual,
+    así que apagada no cuesta nada.
+    """
+
+    def __init__(self, probe_ms: int = STALL_PROBE_MS, stall_threshold_ms: int = STALL_THRESHOLD_MS,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.actions: Dict[str, LatencyHistogram] = {}
+        self.probe_seconds = probe_ms / 1000
+        self.stall_threshold = stall_threshold_ms / 1000
+        self.clock = clock
+        self.started_at = time.time()
+        self._last_tick: Optional[float] = None
+
+    def histogram(self, action: str) -> LatencyHistogram:
+        histogram = self.actions.get(action)
+        if histogram is None:
+            histogram = self.actions[action] = LatencyHistogram()
+        return histogram
+
+    def wrap(self, action: str, func: Callable) -> Callable:
+        """Devuelve func midiendo cada llamada en el histograma de `action`"""
+        histogram = self.histogram(action)
+        clock = self.clock
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.record((clock() - started) * 1e6)
+        return timed
+
+    def tick(self) -> Optional[float]:
+        """Latido del sondeo: devuelve el retraso (s) si el loop estuvo bloqueado"""
+        now = self.clock()
+        last, self._last_tick = self._last_tick, now
+        if last is None:
+            return None
+        late = now - last - self.probe_seconds
+        if late < self.stall_threshold:
+            return None
+        self.histogram(STALLS).record(late * 1e6)
+        return late
+
+    def pause(self):
+        """Olvida el último latido (p. ej. mientras un diálogo modal bloquea a propósito)"""
+        self._last_tick = None
+
+    def snapshot(self) -> Dict:
+        """Copia serializable de todas las mediciones"""
+        return {
+            'started_at': self.started_at,
+            'taken_at': time.time(),
+            'probe_ms': self.probe_seconds * 1000,
+            'stall_threshold_ms': self.stall_threshold * 1000,
+            'actions': {name: histogram.to_dict() for name, histogram in self.actions.items()},
+        }
+
+
+def format_snapshot(snapshot: Dict) -> str:
+    """Tabla compacta (overlay en pantalla y CLI): conteo, p50, p95 y máximo en ms"""
+    lines = [f"{'action':<20}{'n':>6}{'p50':>8}{'p95':>8}{'max':>8}"]
+    for name, stats in sorted(snapshot['actions'].items()):
+        lines.append(f"{name:<20}{stats['count']:>6}"
+                     f"{percentile(stats, 0.5) / 1000:>8.2f}{percentile(stats, 0.95) / 1000:>8.2f}"
+                     f"{stats['max_us'] / 1000:>8.2f}")
+    return '\n'.join(lines)
+
+
+def write_snapshot(path: str, snapshot: Dict) -> str:
+    """Escribe el volcado de forma atómica (nunca queda un JSON a medias)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(snapshot, file, indent=1)
+    os.replace(temporary, path)
+    return path
+
+
+if __name__ == '__main__':
+    from pos.config import DATA_DIR, METRICS_FILE
+
+    metrics_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(DATA_DIR, METRICS_FILE)
+    with open(metrics_path, encoding='utf-8') as metrics_file:
+        print(format_snapshot(json.load(metrics_file)))
@@ -0,0 +1,253 @@
+"""Journal de transacciones: log binario append-only con group commit y replay"""
+
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pos.config import DATA_DIR, JOURNAL_FILE
+
+# Cada registro: [longitud u32][crc32 u32][payload JSON]
+RECORD_HEADER = struct.Struct('>II')
+GROUP_COMMIT_WINDOW = 0.002  # Segundos que el escritor espera para juntar registros
+
+RECORD_ORDER = 'order'
+RECORD_CLOSE = 'close'
+
+
+class JournalError(Exception):
+    """Error del journal (archivo cerrado o escritura fallida)"""
+
+
+def scan_records(path: str, start: int = 0) -> Iterator[Tuple[Dict, int]]:
+    """Itera (registro, offset al final del registro) sin cargar todo el archivo.
+
+    La lectura se detiene en el primer registro truncado o con CRC inválido:
+    es la cola de una escritura interrumpida por un crash. `start` permite
+    seguir leyendo desde el final de un recorrido anterior.
+    """
+    header_size = RECORD_HEADER.size
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with file:
+        file.seek(start)
+        offset = start
+        while True:
+            header = file.read(header_size)
+            if len(header) < header_size:
+                return
+            length, crc = RECORD_HEADER.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                return
+            try:
+                record = json.loads(payload)
+            except ValueError:
+                return
+            offset += header_size + length
+            yield record, offset
+
+
+def read_record(path: str, offset: int) -> Dict:
+    """Lee el registro que empieza en `offset` (JournalError si no es válido)"""
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        header = file.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            raise JournalError(f'No record at offset {offset}')
+        length, crc = RECORD_HEADER.unpack(header)
+        payload = file.read(length)
+    if len(payload) < length or zlib.crc32(payload) != crc:
+        raise JournalError(f'Corrupt record at offset {offset}')
+    return json.loads(payload)
+
+
+def iter_records(path: str) -> Iterator[Dict]:
+    """Itera los registros válidos del journal en orden"""
+    for record, _ in scan_records(path):
+        yield record
+
+
+def encode_record(record: Dict) -> bytes:
+    """Serializa un registro con su encabezado de longitud y CRC"""
+    payload = json.dumps(record, separators=(',', ':')).encode('utf-8')
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+class _PendingWrite:
+    __slots__ = ('record', 'data', 'done', 'error')
+
+    def __init__(self, record: Dict):
+        self.record = record
+        self.data = encode_record(record)
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class OrderJournal:
+    """Journal durable de órdenes finalizadas.
+
+    Un hilo escritor agrupa los registros que llegan casi juntos y los escribe
+    con un solo write + fsync (group commit): una ráfaga de tickets cuesta pocos
+    fsyncs. Al abrir, se descarta la cola corrupta de un crash y se reconstruye
+    el estado: las órdenes sin registro 'close' quedaron en vuelo. Un registro
+    solo cambia el estado en memoria cuando ya está escrito; si la escritura
+    falla, el archivo se trunca al último registro bueno.
+    """
+
+    def __init__(self, path: Optional[str] = None, group_window: float = GROUP_COMMIT_WINDOW,
+                 fsync: bool = True):
+        self.path = path or os.path.join(DATA_DIR, JOURNAL_FILE)
+        self.group_window = group_window
+        self.fsync = fsync
+        self.commits = 0  # fsyncs realizados (para medir el efecto del group commit)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Replay: recuperar registros válidos y truncar la cola rota
+        self._open_orders: Dict[int, Dict] = {}
+        self._next_seq = 1
+        self.recovered_records = 0
+        valid_bytes = 0
+        for record, valid_bytes in scan_records(self.path):
+            self._apply(record)
+            self.recovered_records += 1
+
+        # Sin búfer: tras un write fallido no quedan bytes pendientes que se reintenten
+        self._file = open(self.path, 'ab', buffering=0)
+        if self._file.tell() != valid_bytes:
+            self._file.truncate(valid_bytes)
+            self._file.seek(valid_bytes)
+        self._good_bytes = valid_bytes  # Fin del último registro escrito entero
+        self._broken: Optional[BaseException] = None  # Cola rota que no se pudo truncar
+
+        self._lock = threading.Lock()
+        self._queue: 'queue.Queue[Optional[_PendingWrite]]' = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='order-journal', daemon=True)
+        self._writer.start()
+
+    # --- Estado reconstruido ---
+
+    def _apply(self, record: Dict):
+        """Aplica un registro al estado en memoria (órdenes abiertas, secuencia)"""
+        self._next_seq = max(self._next_seq, record.get('seq', 0) + 1)
+        kind = record.get('type')
+        if kind == RECORD_ORDER:
+            self._open_orders[record['order']['number']] = record['order']
+        elif kind == RECORD_CLOSE:
+            self._open_orders.pop(record['number'], None)
+
+    def in_flight(self) -> List[Dict]:
+        """Órdenes registradas que nunca se cerraron (p. ej. por un crash)"""
+        return list(self._open_orders.values())
+
+    # --- Escritura ---
+
+    def append(self, record: Dict, wait: bool = True) -> int:
+        """Añade un registro; con wait=True espera a que esté en disco. Devuelve su seq"""
+        with self._lock:
+            if self._closed:
+                raise JournalError('Journal is closed')
+            if self._broken is not None:
+                raise JournalError(f'Journal tail could not be repaired: {self._broken}')
+            seq = self._next_seq
+            self._next_seq += 1
+            pending = _PendingWrite(dict(record, seq=seq, ts=time.time()))
+            self._queue.put(pending)
+        if wait:
+            pending.done.wait()
+            if pending.error is not None:
+                raise JournalError(f'Journal write failed: {pending.error}') from pending.error
+        return seq
+
+    def append_order(self, order: Dict, wait: bool = True) -> int:
+        """Registra una orden finalizada (dict de receipt_to_dict)"""
+        return self.append({'type': RECORD_ORDER, 'order': order}, wait)
+
+    def close_order(self, number: int, wait: bool = True) -> int:
+        """Marca una orden como cerrada: ya no está en vuelo"""
+        return self.append({'type': RECORD_CLOSE, 'number': number}, wait)
+
+    def _write_loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            if self.group_window:
+                time.sleep(self.group_window)
+
+            # Juntar todo lo que llegó durante la ventana
+            batch = [first]
+            stop = False
+            while True:
+                try:
+                    pending = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stop = True
+                    break
+                batch.append(pending)
+
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch: List[_PendingWrite]):
+        data = memoryview(b''.join(pending.data for pending in batch))
+        error = None
+        try:
+            written = 0
+            while written < len(data):  # Un write sin búfer puede ser parcial
+                written += self._file.write(data[written:])
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.commits += 1
+        except OSError as exc:
+            error = exc
+            self._discard_tail()
+        with self._lock:
+            if error is None:
+                self._good_bytes += len(data)
+                for pending in batch:
+                    self._apply(pending.record)
+        for pending in batch:
+            pending.error = error
+            pending.done.set()
+
+    def _discard_tail(self):
+        """Quita los bytes de un commit fallido.
+
+        Si quedaran, el próximo replay cortaría el archivo ahí y perdería todos
+        los registros buenos escritos después.
+        """
+        try:
+            self._file.truncate(self._good_bytes)
+            self._file.seek(self._good_bytes)
+        except OSError as exc:
+            self._broken = exc
+
+    def close(self):
+        """Vacía los registros pendientes y cierra el archivo"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._writer.join()
+        self._file.close()
+
+    def __enter__(self) -> 'OrderJournal':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
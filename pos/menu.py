@@ -0,0 +1,163 @@
+"""Menú desde un archivo de datos: caché del catálogo por hash y diferencias entre versiones"""
+
+import collections
+import hashlib
+import json
+import math
+import os
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from pos.catalog import MenuCatalog, make_sku
+from pos.config import MENU_CATEGORIES
+from pos.money import MAX_AMOUNT
+
+MENU_CACHE_SIZE = 4  # Versiones parseadas que se conservan (por hash del contenido)
+
+# ==============================================================
+# 🌟 LOADING & CACHE 🌟
+# ==============================================================
+
+class LoadedMenu(NamedTuple):
+    """Menú parseado junto con su catálogo y el hash del archivo"""
+    menu: Dict[str, Dict]
+    catalog: MenuCatalog
+    digest: str
+
+
+def parse_menu(data: bytes) -> Dict[str, Dict]:
+    """Valida un menú JSON con la misma forma que MENU_CATEGORIES (ValueError si no)"""
+    menu = json.loads(data)
+    if not isinstance(menu, dict) or not menu:
+        raise ValueError('menu must be a non-empty JSON object')
+    for category_key, info in menu.items():
+        if not isinstance(info, dict):
+            raise ValueError(f'{category_key}: category must be a JSON object')
+        items, prices = info.get('items'), info.get('prices')
+        if not isinstance(items, list) or not isinstance(prices, list) or len(items) != len(prices):
+            raise ValueError(f'{category_key}: items and prices must be lists of the same length')
+        if not all(isinstance(name, str) and name.strip() for name in items):
+            raise ValueError(f'{category_key}: item names must be non-empty strings')
+        if not all(isinstance(price, (int, float)) and not isinstance(price, bool)
+                   and math.isfinite(price) and 0 <= price <= MAX_AMOUNT for price in prices):
+            raise ValueError(f'{category_key}: prices must be non-negative numbers '
+                             f'up to {MAX_AMOUNT}')
+        skus = info.get('skus')
+        if skus is not None and (not isinstance(skus, list) or len(skus) != len(items)
+                                 or not all(isinstance(sku, str) and sku.strip() for sku in skus)):
+            raise ValueError(f'{category_key}: skus must be a list of non-empty strings '
+                             f'matching items')
+        if not isinstance(info.setdefault('display_name', category_key.title()), str):
+            raise ValueError(f'{category_key}: display_name must be a string')
+    return menu
+
+
+_cache: 'collections.OrderedDict[str, LoadedMenu]' = collections.OrderedDict()
+
+
+def load_menu_bytes(data: bytes) -> LoadedMenu:
+    """Parsea un menú; el mismo contenido reutiliza el catálogo ya construido"""
+    digest = hashlib.sha256(data).hexdigest()
+    loaded = _cache.get(digest)
+    if loaded is None:
+        menu = parse_menu(data)
+        loaded = LoadedMenu(menu, MenuCatalog.from_menu(menu), digest)
+        _cache[digest] = loaded
+        while len(_cache) > MENU_CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(digest)
+    return loaded
+
+
+class MenuSource:
+    """Archivo de menú vigilado.
+
+    check() solo relee el archivo si cambió su mtime o tamaño, y solo lo
+    vuelve a parsear si además cambió su hash.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.current: Optional[LoadedMenu] = None
+        self._stat_key: Optional[Tuple[int, int]] = None
+
+    def load(self) -> LoadedMenu:
+        """Lee y parsea el archivo (OSError/ValueError si no se puede)"""
+        stat = os.stat(self.path)
+        self._stat_key = (stat.st_mtime_ns, stat.st_size)
+        with open(self.path, 'rb') as file:
+            self.current = load_menu_bytes(file.read())
+        return self.current
+
+    def check(self) -> Optional[LoadedMenu]:
+        """La nueva versión del menú si el archivo cambió; None si no"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None  # Se conserva el menú actual hasta que el archivo vuelva
+        if (stat.st_mtime_ns, stat.st_size) == self._stat_key:
+            return None
+        previous = self.current
+        loaded = self.load()
+        if previous is not None and loaded.digest == previous.digest:
+            return None
+        return loaded
+
+
+# ==============================================================
+# 🌟 MENU DIFF 🌟
+# ==============================================================
+
+class MenuDiff(NamedTuple):
+    """Qué cambió entre dos catálogos (los items se emparejan por SKU)"""
+    changed: Dict[str, List[int]]  # Categoría -> índices con nombre o precio nuevo
+    relaid: Tuple[str, ...]  # Categorías con items agregados, quitados o reordenados
+    renamed: Tuple[str, ...]  # Categorías con display_name nuevo
+    removed: Tuple[str, ...]  # SKUs que ya no existen
+    categories_changed: bool  # Cambió el conjunto u orden de categorías
+
+    @property
+    def empty(self) -> bool:
+        return not (self.changed or self.relaid or self.renamed or self.categories_changed)
+
+
+def diff_menus(old: MenuCatalog, new: MenuCatalog) -> MenuDiff:
+    """Compara dos catálogos categoría por categoría"""
+    removed = tuple(sku for sku in old.skus if new.by_sku(sku) is None)
+    if old.category_keys != new.category_keys:
+        return MenuDiff({}, (), (), removed, True)
+
+    changed: Dict[str, List[int]] = {}
+    relaid = []
+    for category_key in new.category_keys:
+        old_ids, new_ids = old.category_items(category_key), new.category_items(category_key)
+        if old.skus[old_ids.start:old_ids.stop] != new.skus[new_ids.start:new_ids.stop]:
+            relaid.append(category_key)
+            continue
+        indices = [index for index, (old_id, new_id) in enumerate(zip(old_ids, new_ids))
+                   if old.names[old_id] != new.names[new_id]
+                   or old.prices_cents[old_id] != new.prices_cents[new_id]]
+        if indices:
+            changed[category_key] = indices
+    renamed = tuple(key for key in new.category_keys
+                    if old.display_names[key] != new.display_names[key])
+    return MenuDiff(changed, tuple(relaid), renamed, removed, False)
+
+
+def export_menu(menu: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Copia del menú con 'skus' explícitos: así renombrar un item no cambia su SKU"""
+    exported = {}
+    for category_key, info in menu.items():
+        skus = info.get('skus') or [make_sku(category_key, name) for name in info['items']]
+        exported[category_key] = {**info, 'skus': list(skus)}
+    return exported
+
+
+if __name__ == '__main__':
+    # python -m pos.menu [archivo]: exporta el menú incorporado como punto de partida
+    target = open(sys.argv[1], 'w', encoding='utf-8') if len(sys.argv) > 1 else sys.stdout
+    json.dump(export_menu(MENU_CATEGORIES), target, indent=2)
+    target.write('\n')
+    if target is not sys.stdout:
+        target.close()
@@ -0,0 +1,22 @@
+"""Utilidades de dinero en centavos enteros (sin floats en los totales)"""
+
+from decimal import Decimal, ROUND_HALF_UP
+
+MAX_AMOUNT = 1_000_000  # Tope en dólares de un precio o descuento leído de un archivo
+
+
+def to_cents(amount) -> int:
+    """Convierte un precio en dólares (float/str) a centavos enteros"""
+    return int(Decimal(str(amount)).scaleb(2).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def format_money(cents: int) -> str:
+    """Formatea centavos enteros como '$1.23' sin pasar por float"""
+    sign = '-' if cents < 0 else ''
+    dollars, rest = divmod(abs(cents), 100)
+    return f'{sign}${dollars}.{rest:02d}'
+
+
+def round_half_up_div(numerator: int, denominator: int) -> int:
+    """División entera redondeando la mitad hacia arriba (numerador >= 0)"""
+    return (2 * numerator + denominator) // (2 * denominator)
@@ -0,0 +1,57 @@
+"""Modelo de la orden en pantalla: selección de items con seguimiento de filas cambiadas"""
+
+from typing import Iterable, List, Optional, Set
+
+
+def quantity_after_toggle(checked: bool, quantity: str) -> Optional[str]:
+    """Cantidad que debe mostrar un item tras marcarlo/desmarcarlo (None = sin cambio)"""
+    if checked:
+        return '' if quantity == '0' else None
+    return None if quantity == '0' else '0'
+
+
+class OrderModel:
+    """Items marcados de la orden y filas pendientes de repintar.
+
+    Cada clic marca solo su item como "dirty"; la GUI repinta esas filas en un
+    único flush por ciclo idle en vez de recorrer todo el menú.
+    """
+
+    __slots__ = ('checked', 'dirty', 'focus_item')
+
+    def __init__(self):
+        self.checked: Set[int] = set()
+        self.dirty: Set[int] = set()
+        self.focus_item: Optional[int] = None  # Item cuyo Entry debe recibir el foco
+
+    def toggle(self, item_id: int, checked: bool):
+        """Registra el nuevo estado de un checkbox"""
+        if checked:
+            self.checked.add(item_id)
+            self.focus_item = item_id
+        else:
+            self.checked.discard(item_id)
+            if self.focus_item == item_id:
+                self.focus_item = None
+        self.dirty.add(item_id)
+
+    def mark_dirty(self, item_ids: Iterable[int]):
+        self.dirty.update(item_ids)
+
+    def take_dirty(self) -> List[int]:
+        """Devuelve (en orden de menú) y limpia las filas pendientes"""
+        dirty = sorted(self.dirty)
+        self.dirty.clear()
+        return dirty
+
+    def take_focus(self) -> Optional[int]:
+        focus_item, self.focus_item = self.focus_item, None
+        return focus_item
+
+    def clear(self) -> List[int]:
+        """Desmarca todo; devuelve los items que estaban marcados (ya marcados dirty)"""
+        checked = sorted(self.checked)
+        self.dirty.update(checked)
+        self.checked.clear()
+        self.focus_item = None
+        return checked
@@ -0,0 +1,312 @@
+"""Motor de precios headless: totales exactos en centavos, por orden o por lotes"""
+
+import datetime
+from array import array
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from pos.catalog import MenuCatalog
+from pos.config import MENU_CATEGORIES, TAX_RATE
+from pos.money import round_half_up_div
+from pos.rules import ADJUST_TAX, Adjustment, CompiledRules, compile_rules
+
+try:  # NumPy es opcional: acelera price_batch si está instalado
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+Quantity = Union[int, Decimal]
+
+# ==============================================================
+# 🌟 QUANTITY VALIDATION 🌟
+# ==============================================================
+
+def normalize_quantity(value) -> Quantity:
+    """Valida una cantidad (str o número); inválida, vacía o negativa vale 0"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return max(0, value)
+    try:
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                return 0
+            amount = Decimal(value)
+        else:
+            amount = Decimal(repr(float(value)))
+    except (InvalidOperation, ValueError, TypeError):
+        return 0
+
+    if not amount.is_finite() or amount <= 0:
+        return 0
+    if amount == amount.to_integral_value():
+        return int(amount)
+    return amount
+
+
+def format_quantity(quantity: Quantity) -> str:
+    """Cantidad como texto sin ceros sobrantes ('2', '1.5')"""
+    if isinstance(quantity, Decimal):
+        if quantity == quantity.to_integral_value():
+            return str(int(quantity))
+        return format(quantity.normalize(), 'f')
+    return str(quantity)
+
+
+# ==============================================================
+# 🌟 RESULT TYPES 🌟
+# ==============================================================
+
+class PricedOrder(NamedTuple):
+    """Totales de una orden, todos en centavos enteros"""
+    category_cents: Dict[str, int]
+    subtotal_cents: int
+    tax_cents: int
+    total_cents: int
+    adjustments: Tuple[Adjustment, ...] = ()  # Descuentos, combos y desglose de impuestos
+
+    @property
+    def discount_cents(self) -> int:
+        """Suma de descuentos y combos aplicados (positiva)"""
+        return -sum(adjustment.cents for adjustment in self.adjustments
+                    if adjustment.kind != ADJUST_TAX)
+
+
+class BatchTotals(NamedTuple):
+    """Totales columnares de un lote: una secuencia (lista o ndarray) por campo"""
+    category_cents: Dict[str, Sequence[int]]
+    subtotal_cents: Sequence[int]
+    tax_cents: Sequence[int]
+    total_cents: Sequence[int]
+    adjustments: Optional[Sequence[Tuple[Adjustment, ...]]] = None  # Solo con reglas
+
+    def __len__(self) -> int:
+        return len(self.total_cents)
+
+    def order(self, index: int) -> PricedOrder:
+        """Devuelve la fila `index` del lote como PricedOrder (con sus ajustes)"""
+        return PricedOrder(
+            {key: int(column[index]) for key, column in self.category_cents.items()},
+            int(self.subtotal_cents[index]),
+            int(self.tax_cents[index]),
+            int(self.total_cents[index]),
+            self.adjustments[index] if self.adjustments is not None else (),
+        )
+
+
+# ==============================================================
+# 🌟 PRICING ENGINE 🌟
+# ==============================================================
+
+class PricingEngine:
+    """Calcula subtotales, impuesto y total sin depender de Tkinter.
+
+    Las cantidades se alinean con los precios de MENU_CATEGORIES: una secuencia
+    por categoría (price_order) o una fila plana con todas las categorías en
+    orden (price_batch). Cada línea se redondea a centavos y el impuesto se
+    aplica sobre la suma de las líneas, así el recibo siempre cuadra. Con
+    `rules` (ver pos.rules) se compilan una vez el impuesto por categoría,
+    los descuentos y los combos; sin reglas el cálculo no cambia.
+    """
+
+    def __init__(self, menu: Dict[str, Dict] = MENU_CATEGORIES, tax_rate: float = TAX_RATE,
+                 catalog: Optional[MenuCatalog] = None, rules: Optional[Dict] = None):
+        self.menu_data = menu
+        self.catalog = catalog if catalog is not None else MenuCatalog.from_menu(menu)
+        self.category_keys = self.catalog.category_keys
+        self.price_cents: Dict[str, tuple] = {
+            key: self.catalog.category_prices(key) for key in self.category_keys
+        }
+        self.tax_rate = Decimal(str(tax_rate))
+        self._tax_num, self._tax_den = self.tax_rate.as_integer_ratio()
+        self.rules: Optional[CompiledRules] = compile_rules(rules, self.catalog, self.tax_rate)
+
+        # Layout plano: la posición en la fila es el item_id del catálogo
+        self.offsets: Dict[str, slice] = {
+            key: slice(span.start, span.stop)
+            for key, span in ((key, self.catalog.category_items(key)) for key in self.category_keys)
+        }
+        self.width = len(self.catalog)
+        self.flat_price_cents = tuple(self.catalog.prices_cents)
+
+    # --- Escalar ---
+
+    @staticmethod
+    def line_cents(quantity: Quantity, price_cents: int) -> int:
+        """Costo de una línea en centavos, redondeado a la mitad hacia arriba"""
+        if isinstance(quantity, int):
+            return quantity * price_cents
+        return int((quantity * price_cents).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+    def tax_cents(self, subtotal_cents: int) -> int:
+        """Impuesto en centavos sobre un subtotal no negativo"""
+        return round_half_up_div(subtotal_cents * self._tax_num, self._tax_den)
+
+    def price_order(self, quantities: Dict[str, Sequence],
+                    when: Optional[datetime.datetime] = None) -> PricedOrder:
+        """Precio de una orden dada como {categoría: [cantidades...]}"""
+        if self.rules is not None:
+            return self.price_items(self._order_lines(quantities), when)
+        category_cents = {}
+        line_cents = self.line_cents
+        for key in self.category_keys:
+            prices = self.price_cents[key]
+            subtotal = 0
+            for quantity, price in zip(quantities.get(key, ()), prices):
+                quantity = normalize_quantity(quantity)
+                if quantity:
+                    subtotal += line_cents(quantity, price)
+            category_cents[key] = subtotal
+        return self._finish(category_cents)
+
+    def _order_lines(self, quantities: Dict[str, Sequence]) -> Iterable[Tuple[int, object]]:
+        """Pares (item_id, cantidad) de una orden dada por categoría"""
+        for key in self.category_keys:
+            yield from zip(self.catalog.category_items(key), quantities.get(key, ()))
+
+    def price_row(self, row: Sequence, when: Optional[datetime.datetime] = None) -> PricedOrder:
+        """Precio de una orden dada como fila plana (layout de `offsets`)"""
+        return self.price_order({key: row[span] for key, span in self.offsets.items()}, when)
+
+    def price_items(self, lines: Iterable[Tuple[int, object]],
+                    when: Optional[datetime.datetime] = None) -> PricedOrder:
+        """Precio de una orden dispersa dada como pares (item_id, cantidad)"""
+        catalog = self.catalog
+        category_cents = dict.fromkeys(self.category_keys, 0)
+        priced_lines = []
+        for item_id, quantity in lines:
+            quantity = normalize_quantity(quantity)
+            if quantity:
+                cents = self.line_cents(quantity, catalog.prices_cents[item_id])
+                category_cents[catalog.category_of(item_id)] += cents
+                priced_lines.append((item_id, quantity, cents))
+        return self._finish(category_cents, priced_lines, when)
+
+    def _finish(self, category_cents: Dict[str, int],
+                lines: Optional[Iterable[Tuple[int, Quantity, int]]] = None,
+                when: Optional[datetime.datetime] = None) -> PricedOrder:
+        """Totales a partir de los subtotales; las reglas necesitan además las líneas"""
+        subtotal = sum(category_cents.values())
+        if self.rules is None or lines is None:
+            tax = self.tax_cents(subtotal)
+            return PricedOrder(category_cents, subtotal, tax, subtotal + tax)
+        discount, tax, adjustments = self.rules.apply(lines, when or datetime.datetime.now())
+        return PricedOrder(category_cents, subtotal, tax, subtotal - discount + tax, adjustments)
+
+    # --- Lotes ---
+
+    def price_batch(self, rows, when: Optional[datetime.datetime] = None) -> BatchTotals:
+        """Precio de un lote de filas planas en una sola llamada.
+
+        Con NumPy y cantidades enteras el lote se resuelve con operaciones
+        vectorizadas en int64 (exactas); sin NumPy, con cantidades
+        fraccionarias o con reglas, se usa la ruta exacta en Python puro.
+        Con reglas, todas las filas se tarifican en el mismo momento `when`.
+        """
+        if np is not None and self.rules is None:
+            matrix = np.asarray(rows)
+            if matrix.ndim == 2 and matrix.shape[1] == self.width:
+                integral = self._as_integral_matrix(matrix)
+                if integral is not None:
+                    return self._price_matrix(integral)
+            rows = matrix.tolist()
+        return self._price_rows(rows, when)
+
+    def _as_integral_matrix(self, matrix):
+        """Devuelve la matriz como int64 (negativos a 0) o None si hay fracciones"""
+        if matrix.dtype.kind in 'iub':
+            return np.clip(matrix.astype(np.int64), 0, None)
+        if matrix.dtype.kind != 'f':
+            return None
+        clean = np.where(np.isfinite(matrix) & (matrix > 0), matrix, 0)
+        if not np.array_equal(clean, np.floor(clean)):
+            return None
+        return clean.astype(np.int64)
+
+    def _price_matrix(self, matrix) -> BatchTotals:
+        line_costs = matrix * np.asarray(self.flat_price_cents, dtype=np.int64)
+        category_cents = {
+            key: line_costs[:, span].sum(axis=1) for key, span in self.offsets.items()
+        }
+        subtotal = line_costs.sum(axis=1)
+        tax = (2 * subtotal * self._tax_num + self._tax_den) // (2 * self._tax_den)
+        return BatchTotals(category_cents, subtotal, tax, subtotal + tax)
+
+    def _price_rows(self, rows: Iterable[Sequence],
+                    when: Optional[datetime.datetime] = None) -> BatchTotals:
+        category_cents: Dict[str, List[int]] = {key: [] for key in self.category_keys}
+        subtotals: List[int] = []
+        taxes: List[int] = []
+        totals: List[int] = []
+        adjustments: Optional[List[Tuple[Adjustment, ...]]] = None
+        if self.rules is not None:
+            adjustments = []
+            when = when or datetime.datetime.now()
+        for row in rows:
+            priced = self.price_row(row, when)
+            for key, cents in priced.category_cents.items():
+                category_cents[key].append(cents)
+            subtotals.append(priced.subtotal_cents)
+            taxes.append(priced.tax_cents)
+            totals.append(priced.total_cents)
+            if adjustments is not None:
+                adjustments.append(priced.adjustments)
+        return BatchTotals(category_cents, subtotals, taxes, totals, adjustments)
+
+
+# ==============================================================
+# 🌟 INCREMENTAL RUNNING TOTALS 🌟
+# ==============================================================
+
+class RunningTotals:
+    """Subtotales vivos que se actualizan con el delta de una sola línea.
+
+    Guarda el costo actual de cada línea por item_id, así cambiar una cantidad
+    cuesta O(1) sin importar el tamaño del menú; snapshot() calcula impuesto
+    y total.
+    """
+
+    def __init__(self, engine: PricingEngine):
+        self.engine = engine
+        self.line_cents = array('q', bytes(8 * engine.width))
+        self.category_cents: Dict[str, int] = dict.fromkeys(engine.category_keys, 0)
+        self.subtotal_cents = 0
+        self.quantities: Dict[int, Quantity] = {}  # Solo las líneas con cantidad (para las reglas)
+
+    def set_item(self, item_id: int, quantity) -> int:
+        """Registra la nueva cantidad de un item y devuelve el delta en centavos"""
+        catalog = self.engine.catalog
+        quantity = normalize_quantity(quantity)
+        new_cents = self.engine.line_cents(quantity, catalog.prices_cents[item_id]) if quantity else 0
+
+        if self.engine.rules is not None:
+            if quantity:
+                self.quantities[item_id] = quantity
+            else:
+                self.quantities.pop(item_id, None)
+        delta = new_cents - self.line_cents[item_id]
+        if delta:
+            self.line_cents[item_id] = new_cents
+            self.category_cents[catalog.category_of(item_id)] += delta
+            self.subtotal_cents += delta
+        return delta
+
+    def set_quantity(self, category_key: str, index: int, quantity) -> int:
+        """Igual que set_item() pero con el par (category_key, i)"""
+        return self.set_item(self.engine.catalog.item_id(category_key, index), quantity)
+
+    def reset(self):
+        """Pone todas las líneas en cero"""
+        self.line_cents = array('q', bytes(8 * self.engine.width))
+        self.category_cents = dict.fromkeys(self.engine.category_keys, 0)
+        self.subtotal_cents = 0
+        self.quantities = {}
+
+    def snapshot(self, when: Optional[datetime.datetime] = None) -> PricedOrder:
+        """Totales actuales como PricedOrder (O(categorías); con reglas, O(líneas))"""
+        if self.engine.rules is None:
+            return self.engine._finish(dict(self.category_cents))
+        lines = [(item_id, quantity, self.line_cents[item_id])
+                 for item_id, quantity in self.quantities.items()]
+        return self.engine._finish(dict(self.category_cents), lines, when)
@@ -0,0 +1,88 @@
+"""Números de recibo únicos y monótonos, repartidos por bloques entre terminales"""
+
+import os
+import struct
+import threading
+from typing import Optional
+
+from pos.config import DATA_DIR, FIRST_RECEIPT_NUMBER, RECEIPT_ID_BLOCK, RECEIPT_ID_FILE
+
+try:  # Bloqueo de archivo entre procesos: fcntl (POSIX) o msvcrt (Windows)
+    import fcntl
+except ImportError:  # pragma: no cover - solo en Windows
+    fcntl = None
+    import msvcrt
+
+# El archivo guarda el siguiente número sin repartir (u64 big-endian)
+COUNTER = struct.Struct('>Q')
+
+
+def _lock(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, COUNTER.size)
+
+
+def _unlock(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, COUNTER.size)
+
+
+class ReceiptNumberAllocator:
+    """Reparte números de recibo sin colisiones entre reinicios y terminales.
+
+    Varias terminales comparten un archivo contador. Cada una reserva un bloque
+    de `block_size` números bajo un lock de archivo y luego los entrega desde
+    memoria, sin tocar el disco por ticket. Los números no usados de un bloque
+    se pierden al reiniciar (quedan huecos), pero nunca se repiten.
+    """
+
+    def __init__(self, path: Optional[str] = None, block_size: int = RECEIPT_ID_BLOCK,
+                 first_number: int = FIRST_RECEIPT_NUMBER):
+        if block_size < 1:
+            raise ValueError('block_size must be positive')
+        self.path = path or os.path.join(DATA_DIR, RECEIPT_ID_FILE)
+        self.block_size = block_size
+        self.first_number = first_number
+        self.leases = 0  # Bloques reservados (viajes al disco)
+        self._next = 0
+        self._limit = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _lease_block(self):
+        """Reserva el siguiente bloque en el archivo compartido"""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, 'r+b') as file:
+            _lock(file)
+            try:
+                file.seek(0)
+                data = file.read(COUNTER.size)
+                start = COUNTER.unpack(data)[0] if len(data) == COUNTER.size else self.first_number
+                start = max(start, self.first_number)
+                file.seek(0)
+                file.write(COUNTER.pack(start + self.block_size))
+                file.flush()
+                os.fsync(file.fileno())
+            finally:
+                _unlock(file)
+        self._next = start
+        self._limit = start + self.block_size
+        self.leases += 1
+
+    def next(self) -> int:
+        """Siguiente número de recibo de esta terminal"""
+        with self._lock:
+            if self._next >= self._limit:
+                self._lease_block()
+            number = self._next
+            self._next += 1
+            return number
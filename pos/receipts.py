@@ -0,0 +1,241 @@
+"""Recibos: construcción en una pasada y renderizadores enchufables (texto, ESC/POS, JSON)"""
+
+import datetime
+import json
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from pos.money import format_money
+from pos.pricing import PricedOrder, PricingEngine, format_quantity, normalize_quantity
+from pos.rules import ADJUST_TAX, Adjustment
+
+RECEIPT_WIDTH = 54
+RECEIPT_DATE_FORMAT = '%d/%m/%Y - %H:%M:%S'
+RECEIPT_FOOTER = 'Please come again'
+
+# ==============================================================
+# 🌟 RECEIPT DATA 🌟
+# ==============================================================
+
+class ReceiptLine(NamedTuple):
+    """Una línea del recibo (cantidad ya validada, costo en centavos)"""
+    item_id: int
+    sku: str
+    name: str
+    category_key: str
+    quantity: str
+    cents: int
+
+
+class Receipt(NamedTuple):
+    """Todo lo necesario para imprimir un recibo, sin referencias a Tk"""
+    number: int
+    issued_at: datetime.datetime
+    lines: Tuple[ReceiptLine, ...]
+    totals: PricedOrder
+    category_names: Dict[str, str]
+    tax_rate: str
+
+    @property
+    def label(self) -> str:
+        """Número como se imprime en el recibo"""
+        return f'N# - {self.number}'
+
+
+def build_receipt(engine: PricingEngine, lines: Iterable[Tuple[int, object]], number: int,
+                  issued_at: Optional[datetime.datetime] = None) -> Receipt:
+    """Construye un recibo en una sola pasada sobre pares (item_id, cantidad).
+
+    Las cantidades vacías, inválidas o en cero no generan línea; los totales se
+    acumulan en la misma pasada con las reglas de PricingEngine (las de
+    descuento se evalúan a la hora de emisión).
+    """
+    catalog = engine.catalog
+    issued_at = issued_at or datetime.datetime.now()
+    category_cents = dict.fromkeys(engine.category_keys, 0)
+    priced_lines = [] if engine.rules is not None else None
+    receipt_lines = []
+    for item_id, quantity in lines:
+        quantity = normalize_quantity(quantity)
+        if not quantity:
+            continue
+        category_key = catalog.category_of(item_id)
+        cents = engine.line_cents(quantity, catalog.prices_cents[item_id])
+        category_cents[category_key] += cents
+        if priced_lines is not None:
+            priced_lines.append((item_id, quantity, cents))
+        receipt_lines.append(ReceiptLine(item_id, catalog.skus[item_id], catalog.names[item_id],
+                                         category_key, format_quantity(quantity), cents))
+
+    return Receipt(
+        number=number,
+        issued_at=issued_at,
+        lines=tuple(receipt_lines),
+        totals=engine._finish(category_cents, priced_lines, issued_at),
+        category_names=dict(catalog.display_names),
+        tax_rate=str(engine.tax_rate),
+    )
+
+
+# ==============================================================
+# 🌟 PLUGGABLE RENDERERS 🌟
+# ==============================================================
+
+Renderer = Callable[[Receipt], Union[str, bytes]]
+RENDERERS: Dict[str, Renderer] = {}
+
+
+def register_renderer(name: str) -> Callable[[Renderer], Renderer]:
+    """Decorador para registrar un formato de salida nuevo"""
+    def decorator(func: Renderer) -> Renderer:
+        RENDERERS[name] = func
+        return func
+    return decorator
+
+
+def get_renderer(fmt: str) -> Renderer:
+    """Devuelve el renderizador registrado para `fmt`"""
+    try:
+        return RENDERERS[fmt]
+    except KeyError:
+        raise ValueError(f'Unknown receipt format: {fmt}') from None
+
+
+def render(receipt: Receipt, fmt: str = 'text') -> Union[str, bytes]:
+    """Renderiza un recibo con el formato registrado `fmt`"""
+    return get_renderer(fmt)(receipt)
+
+
+def render_many(receipts: Iterable[Receipt], fmt: str = 'text') -> Iterator[Union[str, bytes]]:
+    """Renderiza recibos en lote (reimpresiones de fin de día, auditoría)"""
+    renderer = get_renderer(fmt)
+    return (renderer(receipt) for receipt in receipts)
+
+
+def _tax_label(receipt: Receipt) -> str:
+    percent = float(receipt.tax_rate) * 100
+    return f'Tax ({percent:.0f}%)'
+
+
+def _adjustment_rows(receipt: Receipt) -> Tuple[List[Adjustment], List[Adjustment]]:
+    """(descuentos y combos, filas de impuesto); sin desglose, una sola fila de impuesto"""
+    totals = receipt.totals
+    discounts = [adjustment for adjustment in totals.adjustments if adjustment.kind != ADJUST_TAX]
+    taxes = [adjustment for adjustment in totals.adjustments if adjustment.kind == ADJUST_TAX]
+    if not taxes:
+        taxes = [Adjustment(ADJUST_TAX, _tax_label(receipt), totals.tax_cents)]
+    return discounts, taxes
+
+
+@register_renderer('text')
+def render_text(receipt: Receipt) -> str:
+    """Texto plano con el mismo diseño del recibo en pantalla"""
+    totals = receipt.totals
+    out: List[str] = [
+        f'Data: {receipt.label:<20} {receipt.issued_at.strftime(RECEIPT_DATE_FORMAT)}\n',
+        '=' * RECEIPT_WIDTH + '\n',
+        f'{"Item":<20} {"QTY":<10} {"Cost":>10}\n',
+        '-' * RECEIPT_WIDTH + '\n',
+    ]
+    out.extend(f'{line.name:<20}{line.quantity:<10}{format_money(line.cents)}\n'
+               for line in receipt.lines)
+
+    out.append('-' * RECEIPT_WIDTH + '\n')
+    for category_key, cents in totals.category_cents.items():
+        label = f'Cost of {receipt.category_names.get(category_key, category_key)}: '
+        tabs = '\t\t\t\t' if len(label) < 18 else '\t\t\t'
+        out.append(f'{label}{tabs}{format_money(cents)}\n')
+    out.append('-' * RECEIPT_WIDTH + '\n')
+    out.append(f'Subtotal: \t\t\t\t{format_money(totals.subtotal_cents)}\n')
+    discounts, taxes = _adjustment_rows(receipt)
+    for adjustment in discounts + taxes:
+        label = f'{adjustment.label}: '
+        tabs = '\t\t\t\t' if len(label) < 18 else '\t\t\t'
+        out.append(f'{label}{tabs}{format_money(adjustment.cents)}\n')
+    out.append(f'Total: \t\t\t\t{format_money(totals.total_cents)}\n')
+    out.append('-' * RECEIPT_WIDTH + '\n')
+    out.append(RECEIPT_FOOTER)
+    return ''.join(out)
+
+
+# Comandos ESC/POS básicos para impresoras térmicas de 80 mm
+ESC_INIT = b'\x1b@'
+ESC_ALIGN_LEFT = b'\x1ba\x00'
+ESC_ALIGN_CENTER = b'\x1ba\x01'
+ESC_BOLD_ON = b'\x1bE\x01'
+ESC_BOLD_OFF = b'\x1bE\x00'
+ESC_FEED_AND_CUT = b'\x1bd\x04\x1dVB\x00'
+ESCPOS_COLUMNS = 42
+ESCPOS_ENCODING = 'cp437'
+
+
+@register_renderer('escpos')
+def render_escpos(receipt: Receipt) -> bytes:
+    """Flujo de bytes ESC/POS listo para enviar a una impresora térmica"""
+    totals = receipt.totals
+    width = ESCPOS_COLUMNS
+
+    def row(left: str, right: str) -> str:
+        return f'{left[:width - len(right) - 1]:<{width - len(right)}}{right}\n'
+
+    body: List[str] = [
+        row(receipt.label, receipt.issued_at.strftime(RECEIPT_DATE_FORMAT)),
+        '=' * width + '\n',
+    ]
+    body.extend(row(f'{line.quantity:>4} x {line.name}', format_money(line.cents))
+                for line in receipt.lines)
+    body.append('-' * width + '\n')
+    for category_key, cents in totals.category_cents.items():
+        body.append(row(receipt.category_names.get(category_key, category_key), format_money(cents)))
+    body.append(row('Subtotal', format_money(totals.subtotal_cents)))
+    discounts, taxes = _adjustment_rows(receipt)
+    body.extend(row(adjustment.label, format_money(adjustment.cents))
+                for adjustment in discounts + taxes)
+
+    encode = lambda text: text.encode(ESCPOS_ENCODING, errors='replace')
+    return b''.join((
+        ESC_INIT, ESC_ALIGN_LEFT,
+        encode(''.join(body)),
+        ESC_BOLD_ON, encode(row('TOTAL', format_money(totals.total_cents))), ESC_BOLD_OFF,
+        ESC_ALIGN_CENTER, encode(RECEIPT_FOOTER + '\n'),
+        ESC_FEED_AND_CUT,
+    ))
+
+
+def receipt_to_dict(receipt: Receipt) -> Dict:
+    """Recibo como dict serializable (montos en centavos enteros)"""
+    totals = receipt.totals
+    data = {
+        'number': receipt.number,
+        'issued_at': receipt.issued_at.isoformat(),
+        'lines': [line._asdict() for line in receipt.lines],
+        'category_cents': totals.category_cents,
+        'subtotal_cents': totals.subtotal_cents,
+        'tax_cents': totals.tax_cents,
+        'total_cents': totals.total_cents,
+        'tax_rate': receipt.tax_rate,
+        'category_names': receipt.category_names,
+    }
+    if totals.adjustments:
+        data['adjustments'] = [adjustment._asdict() for adjustment in totals.adjustments]
+    return data
+
+
+def receipt_from_dict(data: Dict) -> Receipt:
+    """Inverso de receipt_to_dict (recibos del journal o del historial)"""
+    return Receipt(
+        number=data['number'],
+        issued_at=datetime.datetime.fromisoformat(data['issued_at']),
+        lines=tuple(ReceiptLine(**line) for line in data['lines']),
+        totals=PricedOrder(dict(data['category_cents']), data['subtotal_cents'],
+                           data['tax_cents'], data['total_cents'],
+                           tuple(Adjustment(**adjustment)
+                                 for adjustment in data.get('adjustments', ()))),
+        category_names=dict(data.get('category_names') or {}),
+        tax_rate=data['tax_rate'],
+    )
+
+
+@register_renderer('json')
+def render_json(receipt: Receipt) -> str:
+    """JSON compacto en una sola línea (apto para JSONL)"""
+    return json.dumps(receipt_to_dict(receipt), separators=(',', ':'))
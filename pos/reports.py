@@ -0,0 +1,376 @@
+"""Reportes de ventas de fin de día en streaming sobre el historial de órdenes"""
+
+import datetime
+import json
+import mmap
+import os
+import sys
+from array import array
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from pos.catalog import MenuCatalog
+from pos.journal import RECORD_CLOSE, RECORD_ORDER, iter_records
+from pos.money import format_money, round_half_up_div
+from pos.pricing import format_quantity, normalize_quantity
+
+# ==============================================================
+# 🌟 ORDER STREAM 🌟
+# ==============================================================
+
+def iter_orders(records: Iterable[Dict], include_open: bool = True) -> Iterator[Dict]:
+    """Órdenes finales a partir de registros del journal, en orden de cierre.
+
+    Una orden puede registrarse varias veces (se corrigió antes de cerrarla);
+    solo cuenta la última versión. Se emite al llegar su 'close', así que en
+    memoria solo viven las órdenes abiertas. Con include_open=True las que
+    nunca se cerraron se emiten al final.
+    """
+    open_orders: Dict[int, Dict] = {}
+    for record in records:
+        kind = record.get('type')
+        if kind == RECORD_ORDER:
+            order = record['order']
+            open_orders[order['number']] = order
+        elif kind == RECORD_CLOSE:
+            order = open_orders.pop(record['number'], None)
+            if order is not None:
+                yield order
+    if include_open:
+        yield from open_orders.values()
+
+
+def iter_journal_orders(path: str, include_open: bool = True) -> Iterator[Dict]:
+    """Órdenes finales leídas en streaming desde un archivo de journal"""
+    return iter_orders(iter_records(path), include_open)
+
+
+def _order_hour(order: Dict) -> int:
+    """Hora (0-23) de emisión de una orden con issued_at en ISO 8601"""
+    issued_at = order['issued_at']
+    if len(issued_at) >= 13 and issued_at[10] == 'T':
+        return int(issued_at[11:13])
+    return datetime.datetime.fromisoformat(issued_at).hour
+
+
+# ==============================================================
+# 🌟 STREAMING REPORT 🌟
+# ==============================================================
+
+class ItemSales:
+    """Acumulado de ventas de un item"""
+    __slots__ = ('sku', 'name', 'category_key', 'price_cents', 'quantity', 'cents', 'tickets')
+
+    def __init__(self, sku: str, name: str, category_key: str, price_cents: Optional[int]):
+        self.sku = sku
+        self.name = name
+        self.category_key = category_key
+        self.price_cents = price_cents
+        self.quantity = 0
+        self.cents = 0
+        self.tickets = 0
+
+
+class SalesReport:
+    """Reporte de ventas acumulado orden por orden en memoria constante.
+
+    El tamaño del estado depende del menú (items, categorías, 24 horas), no de
+    la cantidad de órdenes. Nombres, categorías y precios salen del catálogo
+    construido desde MENU_CATEGORIES; los items que ya no están en el menú
+    conservan el nombre y la categoría con que se vendieron.
+    """
+
+    def __init__(self, catalog: Optional[MenuCatalog] = None):
+        self.catalog = catalog or MenuCatalog.from_menu()
+        self.items: Dict[str, ItemSales] = {}
+        self.category_cents: Dict[str, int] = dict.fromkeys(self.catalog.category_keys, 0)
+        self.hourly_tickets: List[int] = [0] * 24
+        self.hourly_cents: List[int] = [0] * 24
+        self.tickets = 0
+        self.subtotal_cents = 0
+        self.tax_cents = 0
+        self.total_cents = 0
+
+    def _item(self, sku: str, name: str, category_key: str) -> ItemSales:
+        item = self.items.get(sku)
+        if item is None:
+            item_id = self.catalog.by_sku(sku)
+            if item_id is not None:
+                menu_item = self.catalog.item(item_id)
+                item = ItemSales(sku, menu_item.name, menu_item.category_key, menu_item.price_cents)
+            else:
+                item = ItemSales(sku, name, category_key, None)
+            self.items[sku] = item
+        return item
+
+    def add_order(self, order: Dict):
+        """Suma una orden (dict de receipt_to_dict) al reporte"""
+        hour = _order_hour(order)
+        self.tickets += 1
+        self.subtotal_cents += order['subtotal_cents']
+        self.tax_cents += order['tax_cents']
+        self.total_cents += order['total_cents']
+        self.hourly_tickets[hour] += 1
+        self.hourly_cents[hour] += order['total_cents']
+
+        for line in order['lines']:
+            item = self._item(line['sku'], line['name'], line['category_key'])
+            item.quantity += normalize_quantity(line['quantity'])
+            item.cents += line['cents']
+            item.tickets += 1
+            self.category_cents[item.category_key] = (
+                self.category_cents.get(item.category_key, 0) + line['cents'])
+
+    def add_orders(self, orders: Iterable[Dict]) -> 'SalesReport':
+        """Suma un flujo de órdenes; devuelve el propio reporte"""
+        for order in orders:
+            self.add_order(order)
+        return self
+
+    @property
+    def average_ticket_cents(self) -> int:
+        """Ticket promedio (total con impuesto) en centavos"""
+        if not self.tickets:
+            return 0
+        return round_half_up_div(self.total_cents, self.tickets)
+
+    def top_items(self, limit: Optional[int] = None) -> List[ItemSales]:
+        """Items ordenados por venta (centavos) descendente"""
+        ranked = sorted(self.items.values(), key=lambda item: (-item.cents, item.sku))
+        return ranked[:limit] if limit is not None else ranked
+
+    def to_dict(self) -> Dict:
+        """Reporte serializable (montos en centavos, cantidades como texto)"""
+        return {
+            'tickets': self.tickets,
+            'subtotal_cents': self.subtotal_cents,
+            'tax_cents': self.tax_cents,
+            'total_cents': self.total_cents,
+            'average_ticket_cents': self.average_ticket_cents,
+            'category_cents': dict(self.category_cents),
+            'hourly_tickets': list(self.hourly_tickets),
+            'hourly_cents': list(self.hourly_cents),
+            'items': [
+                {
+                    'sku': item.sku,
+                    'name': item.name,
+                    'category_key': item.category_key,
+                    'price_cents': item.price_cents,
+                    'quantity': format_quantity(item.quantity),
+                    'cents': item.cents,
+                    'tickets': item.tickets,
+                }
+                for item in self.top_items()
+            ],
+        }
+
+    def format_text(self) -> str:
+        """Reporte de fin de día en texto plano"""
+        width = 54
+        display_names = self.catalog.display_names
+        out = [
+            'END OF DAY SALES REPORT\n',
+            '=' * width + '\n',
+            f'{"Tickets":<30}{self.tickets:>24}\n',
+            f'{"Subtotal":<30}{format_money(self.subtotal_cents):>24}\n',
+            f'{"Tax collected":<30}{format_money(self.tax_cents):>24}\n',
+            f'{"Total":<30}{format_money(self.total_cents):>24}\n',
+            f'{"Average ticket":<30}{format_money(self.average_ticket_cents):>24}\n',
+            '-' * width + '\n',
+        ]
+        for category_key, cents in self.category_cents.items():
+            name = display_names.get(category_key, category_key)
+            out.append(f'{name:<30}{format_money(cents):>24}\n')
+        out.append('-' * width + '\n')
+        out.append(f'{"Item":<20}{"QTY":>10}{"Sales":>24}\n')
+        for item in self.top_items():
+            out.append(f'{item.name:<20}{format_quantity(item.quantity):>10}{format_money(item.cents):>24}\n')
+        out.append('-' * width + '\n')
+        out.append(f'{"Hour":<20}{"Tickets":>10}{"Sales":>24}\n')
+        for hour, tickets in enumerate(self.hourly_tickets):
+            if tickets:
+                out.append(f'{hour:02d}:00{"":<15}{tickets:>10}'
+                           f'{format_money(self.hourly_cents[hour]):>24}\n')
+        return ''.join(out)
+
+
+# ==============================================================
+# 🌟 COLUMNAR EXPORT (consultas repetidas vía mmap) 🌟
+# ==============================================================
+
+# Columnas de tamaño fijo: un archivo por columna. Solo tipos de ancho fijo en todas las
+# plataformas ('q' = 8 bytes, 'b' = 1), así un export se puede copiar entre máquinas
+ORDER_COLUMNS = (('number', 'q'), ('hour', 'b'), ('subtotal_cents', 'q'),
+                 ('tax_cents', 'q'), ('total_cents', 'q'))
+# quantity_milli: cantidad en milésimas, redondeada a la mitad hacia arriba (1.2345 -> 1235)
+LINE_COLUMNS = (('order_row', 'q'), ('sku_code', 'q'), ('quantity_milli', 'q'), ('cents', 'q'))
+EXPORT_CHUNK_ROWS = 65536
+SKU_FILE = 'skus.json'
+
+
+def _column_path(directory: str, table: str, name: str) -> str:
+    return os.path.join(directory, f'{table}.{name}.col')
+
+
+def export_columns(orders: Iterable[Dict], directory: str) -> int:
+    """Exporta órdenes a columnas binarias en `directory`; devuelve las órdenes escritas.
+
+    Se escribe por bloques de EXPORT_CHUNK_ROWS filas, así la memoria no crece
+    con el historial. Los SKU se codifican como enteros (diccionario en skus.json).
+    """
+    os.makedirs(directory, exist_ok=True)
+    tables = {'orders': ORDER_COLUMNS, 'lines': LINE_COLUMNS}
+    files = {(table, name): open(_column_path(directory, table, name), 'wb')
+             for table, columns in tables.items() for name, _ in columns}
+    buffers = {(table, name): array(code)
+               for table, columns in tables.items() for name, code in columns}
+    sku_codes: Dict[str, int] = {}
+    sku_info: List[Dict] = []
+
+    def flush(table: str):
+        for name, _ in tables[table]:
+            buffers[table, name].tofile(files[table, name])
+            del buffers[table, name][:]
+
+    order_row = 0
+    try:
+        for order in orders:
+            buffers['orders', 'number'].append(order['number'])
+            buffers['orders', 'hour'].append(_order_hour(order))
+            buffers['orders', 'subtotal_cents'].append(order['subtotal_cents'])
+            buffers['orders', 'tax_cents'].append(order['tax_cents'])
+            buffers['orders', 'total_cents'].append(order['total_cents'])
+            for line in order['lines']:
+                code = sku_codes.get(line['sku'])
+                if code is None:
+                    code = sku_codes[line['sku']] = len(sku_info)
+                    sku_info.append({'sku': line['sku'], 'name': line['name'],
+                                     'category_key': line['category_key']})
+                quantity = Decimal(str(normalize_quantity(line['quantity'])))
+                buffers['lines', 'order_row'].append(order_row)
+                buffers['lines', 'sku_code'].append(code)
+                buffers['lines', 'quantity_milli'].append(
+                    int(quantity.scaleb(3).quantize(Decimal(1), rounding=ROUND_HALF_UP)))
+                buffers['lines', 'cents'].append(line['cents'])
+            order_row += 1
+            if len(buffers['lines', 'cents']) >= EXPORT_CHUNK_ROWS:
+                flush('lines')
+            if len(buffers['orders', 'number']) >= EXPORT_CHUNK_ROWS:
+                flush('orders')
+        flush('orders')
+        flush('lines')
+    finally:
+        for file in files.values():
+            file.close()
+
+    with open(os.path.join(directory, SKU_FILE), 'w', encoding='utf-8') as file:
+        json.dump(sku_info, file)
+    return order_row
+
+
+class ColumnarHistory:
+    """Historial exportado abierto con mmap: cada columna es un memoryview tipado"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._maps: List[mmap.mmap] = []
+        self.orders: Dict[str, memoryview] = {
+            name: self._open_column('orders', name, code) for name, code in ORDER_COLUMNS}
+        self.lines: Dict[str, memoryview] = {
+            name: self._open_column('lines', name, code) for name, code in LINE_COLUMNS}
+        with open(os.path.join(directory, SKU_FILE), encoding='utf-8') as file:
+            self.skus: List[Dict] = json.load(file)
+
+    def _open_column(self, table: str, name: str, code: str) -> memoryview:
+        path = _column_path(self.directory, table, name)
+        if os.path.getsize(path) == 0:
+            return memoryview(array(code))
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast(code)
+
+    def __len__(self) -> int:
+        return len(self.orders['number'])
+
+    def report(self, catalog: Optional[MenuCatalog] = None) -> SalesReport:
+        """Recalcula el reporte completo desde las columnas (sin parsear JSON)"""
+        report = SalesReport(catalog)
+        orders = self.orders
+        report.tickets = len(orders['number'])
+        report.subtotal_cents = sum(orders['subtotal_cents'])
+        report.tax_cents = sum(orders['tax_cents'])
+        report.total_cents = sum(orders['total_cents'])
+        for hour, total in zip(orders['hour'], orders['total_cents']):
+            report.hourly_tickets[hour] += 1
+            report.hourly_cents[hour] += total
+
+        quantity_milli = [0] * len(self.skus)
+        cents = [0] * len(self.skus)
+        tickets = [0] * len(self.skus)
+        lines = self.lines
+        for code, milli, line_cents in zip(lines['sku_code'], lines['quantity_milli'], lines['cents']):
+            quantity_milli[code] += milli
+            cents[code] += line_cents
+            tickets[code] += 1
+
+        for code, info in enumerate(self.skus):
+            item = report._item(info['sku'], info['name'], info['category_key'])
+            item.quantity = Decimal(quantity_milli[code]).scaleb(-3)
+            item.cents = cents[code]
+            item.tickets = tickets[code]
+            report.category_cents[item.category_key] = (
+                report.category_cents.get(item.category_key, 0) + cents[code])
+        return report
+
+    def close(self):
+        """Libera los mapas de memoria"""
+        for name in list(self.orders):
+            self.orders[name].release()
+        for name in list(self.lines):
+            self.lines[name].release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps.clear()
+
+    def __enter__(self) -> 'ColumnarHistory':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# ==============================================================
+# 🌟 COMMAND LINE 🌟
+# ==============================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """python -m pos.reports [journal.log] [--json] [--export DIR]"""
+    import argparse
+
+    from pos.config import DATA_DIR, JOURNAL_FILE
+
+    parser = argparse.ArgumentParser(prog='python -m pos.reports',
+                                     description='End-of-day sales report from the order journal')
+    parser.add_argument('journal', nargs='?', default=os.path.join(DATA_DIR, JOURNAL_FILE))
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--export', metavar='DIR', help='also write a columnar export to DIR')
+    args = parser.parse_args(argv)
+
+    if args.export:
+        export_columns(iter_journal_orders(args.journal), args.export)
+        with ColumnarHistory(args.export) as history:
+            report = history.report()
+    else:
+        report = SalesReport().add_orders(iter_journal_orders(args.journal))
+
+    if args.json:
+        json.dump(report.to_dict(), sys.stdout)
+        sys.stdout.write('\n')
+    else:
+        sys.stdout.write(report.format_text())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,389 @@
+"""Reglas de precio compiladas: impuesto por categoría, descuentos por franja horaria y combos"""
+
+import datetime
+import json
+import sys
+from array import array
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from pos.catalog import MenuCatalog
+from pos.money import MAX_AMOUNT, round_half_up_div, to_cents
+
+ADJUST_DISCOUNT = 'discount'
+ADJUST_COMBO = 'combo'
+ADJUST_TAX = 'tax'
+
+MAX_TAX_RATE = 1  # Tasa de impuesto máxima (100%)
+
+DAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+ALL_DAYS = (1 << len(DAYS)) - 1
+
+# Punto de partida para un archivo de reglas (python -m pos.rules rules.json)
+EXAMPLE_RULES = {
+    'tax': {'drinks': 0.10},
+    'discounts': [
+        {'name': 'Happy Hour', 'percent': 20, 'categories': ['drinks'],
+         'days': ['mon', 'tue', 'wed', 'thu', 'fri'], 'start': '17:00', 'end': '19:00'},
+        {'name': 'Sunday Desserts', 'percent': 10, 'categories': ['desserts'], 'days': ['sun']},
+    ],
+    'combos': [
+        {'name': 'Lunch Combo', 'components': ['food', 'drinks', 'desserts'], 'discount': 1.00},
+    ],
+}
+
+# ==============================================================
+# 🌟 RULE DEFINITIONS 🌟
+# ==============================================================
+
+class Adjustment(NamedTuple):
+    """Una línea de ajuste del total en centavos (los descuentos son negativos)"""
+    kind: str
+    label: str
+    cents: int
+
+
+def _fraction(value, what: str, limit) -> Decimal:
+    """Número entre 0 y limit (los valores enormes romperían to_cents y los totales)"""
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'{what}: not a number: {value!r}') from None
+    if not amount.is_finite() or amount < 0:
+        raise ValueError(f'{what}: must be a non-negative number')
+    if amount > limit:
+        raise ValueError(f'{what} must be at most {limit}')
+    return amount
+
+
+def _entries(value, what: str) -> List[Dict]:
+    """Lista de objetos JSON (None o ausente es una lista vacía)"""
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(entry, dict) for entry in value):
+        raise ValueError(f'{what} must be a list of JSON objects')
+    return value
+
+
+def _names(value, what: str) -> List[str]:
+    """Lista de textos no vacíos; un texto suelto no se acepta (se leería letra por letra)"""
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(name, str) and name.strip()
+                                              for name in value):
+        raise ValueError(f'{what} must be a list of non-empty strings')
+    return value
+
+
+def _label(entry: Dict, default: str) -> str:
+    name = entry.get('name') or default
+    if not isinstance(name, str):
+        raise ValueError(f'{default} name must be a string: {name!r}')
+    return name
+
+
+def _minute_of_day(text, what: str) -> int:
+    if not isinstance(text, str):
+        raise ValueError(f'{what} must be a time such as "17:00"')
+    moment = datetime.time.fromisoformat(text.strip())
+    return moment.hour * 60 + moment.minute
+
+
+def _days_mask(days) -> int:
+    days = _names(days, 'days')
+    if not days:
+        return ALL_DAYS
+    mask = 0
+    for day in days:
+        key = day.strip().lower()[:3]
+        if key not in DAYS:
+            raise ValueError(f'Unknown day: {day!r}')
+        mask |= 1 << DAYS.index(key)
+    return mask
+
+
+def _component(value, name: str) -> Dict:
+    """Componente de combo: 'categoría', 'sku' o {categories, skus, count}"""
+    if isinstance(value, str) and value.strip():
+        return {'names': [value], 'count': 1}
+    if not isinstance(value, dict):
+        raise ValueError(f'{name}: a component is a category, a SKU or an object, '
+                         f'not {value!r}')
+    names = (_names(value.get('categories'), f'{name}: categories')
+             + _names(value.get('skus'), f'{name}: skus'))
+    count = value.get('count', 1)
+    if not names or not isinstance(count, int) or isinstance(count, bool) or count < 1:
+        raise ValueError(f'{name}: combo components need categories or skus '
+                         f'and a positive integer count')
+    return {'names': names, 'count': count}
+
+
+def parse_rules(data) -> Dict:
+    """Valida y normaliza reglas con la forma de EXAMPLE_RULES (ValueError si no)"""
+    if not isinstance(data, dict):
+        raise ValueError('rules must be a JSON object')
+    unknown = set(data) - {'tax', 'discounts', 'combos'}
+    if unknown:
+        raise ValueError(f'Unknown rule sections: {", ".join(sorted(unknown))}')
+
+    tax_rates = data.get('tax') or {}
+    if not isinstance(tax_rates, dict):
+        raise ValueError('tax must be a JSON object of category rates')
+    tax = {key: _fraction(rate, f'tax.{key}', MAX_TAX_RATE) for key, rate in tax_rates.items()}
+    discounts = []
+    for entry in _entries(data.get('discounts'), 'discounts'):
+        name = _label(entry, 'Discount')
+        percent = _fraction(entry.get('percent'), f'{name}: percent', 100)
+        categories = _names(entry.get('categories'), f'{name}: categories')
+        skus = _names(entry.get('skus'), f'{name}: skus')
+        if not categories and not skus:
+            raise ValueError(f'{name}: a discount needs categories or skus')
+        start, end = entry.get('start'), entry.get('end')
+        discounts.append({
+            'name': name,
+            'percent': percent,
+            'categories': categories,
+            'skus': skus,
+            'days': _days_mask(entry.get('days')),
+            'start': _minute_of_day(start, f'{name}: start') if start else 0,
+            'end': _minute_of_day(end, f'{name}: end') if end else 0,
+        })
+    combos = []
+    for entry in _entries(data.get('combos'), 'combos'):
+        name = _label(entry, 'Combo')
+        components = entry.get('components') or []
+        if not isinstance(components, list):
+            raise ValueError(f'{name}: components must be a list')
+        components = [_component(value, name) for value in components]
+        if len(components) < 2:
+            raise ValueError(f'{name}: a combo needs at least two components')
+        combos.append({'name': name, 'components': components,
+                       'discount': to_cents(_fraction(entry.get('discount', 0),
+                                                      f'{name}: discount', MAX_AMOUNT))})
+    return {'tax': tax, 'discounts': discounts, 'combos': combos}
+
+
+def load_rules(path: str) -> Dict:
+    """Lee un archivo JSON de reglas (OSError/ValueError si no se puede)"""
+    with open(path, 'rb') as file:
+        return parse_rules(json.loads(file.read()))
+
+
+def format_rate(rate: Decimal) -> str:
+    """Tasa como porcentaje sin ceros sobrantes (0.07 -> '7', 0.08875 -> '8.875')"""
+    percent = (rate * 100).normalize()
+    return format(percent, 'f') if percent != percent.to_integral_value() else str(int(percent))
+
+
+# ==============================================================
+# 🌟 COMPILED RULES 🌟
+# ==============================================================
+
+class _Discount(NamedTuple):
+    label: str
+    num: int  # Fracción del costo de la línea que se descuenta
+    den: int
+    days: int  # Bitmask de días de la semana (lunes = bit 0)
+    start: int  # Minutos del día; start == end es todo el día
+    end: int
+
+
+class _Combo(NamedTuple):
+    label: str
+    slots: Tuple[int, ...]  # Un slot global por componente
+    counts: Tuple[int, ...]  # Unidades que pide cada componente
+    cents: int  # Descuento por combo armado
+
+
+class CompiledRules:
+    """Reglas resueltas una sola vez contra los item_ids de un catálogo.
+
+    Cada item tiene su código de tasa (array), un bitmask con los descuentos
+    que le aplican y otro con los slots de combo que puede llenar. apply()
+    recorre las líneas una vez: la franja horaria se evalúa por orden y no
+    por línea, el mejor descuento activo es el bit más bajo (se ordenan por
+    porcentaje al compilar) y los combos solo suman unidades a sus slots.
+    """
+
+    def __init__(self, rules: Dict, catalog: MenuCatalog, default_rate):
+        default_rate = Decimal(str(default_rate))
+        item_count = len(catalog)
+
+        # Impuesto: una tabla de código de tasa por item (la tasa por defecto es el código 0)
+        unknown = set(rules['tax']) - set(catalog.category_keys)
+        if unknown:
+            raise ValueError(f'Unknown tax categories: {", ".join(sorted(unknown))}')
+        self.rates: List[Decimal] = [default_rate]
+        category_code = []
+        for category_key in catalog.category_keys:
+            rate = rules['tax'].get(category_key, default_rate)
+            if rate not in self.rates:
+                self.rates.append(rate)
+            category_code.append(self.rates.index(rate))
+        self._rate_ratios = [rate.as_integer_ratio() for rate in self.rates]
+        self.tax_codes = array('B', (category_code[code] for code in catalog.category_codes))
+        self.tax_labels = [f'Tax ({format_rate(rate)}%)' for rate in self.rates]
+
+        # Descuentos: el de mayor porcentaje ocupa el bit más bajo
+        ordered = sorted(rules['discounts'], key=lambda entry: -entry['percent'])
+        self.discounts: List[_Discount] = []
+        self.discount_masks = [0] * item_count
+        for bit, entry in enumerate(ordered):
+            num, den = (entry['percent'] / 100).as_integer_ratio()
+            self.discounts.append(_Discount(entry['name'], num, den, entry['days'],
+                                            entry['start'], entry['end']))
+            for item_id in self._resolve(catalog, entry['categories'] + entry['skus'],
+                                         entry['name']):
+                self.discount_masks[item_id] |= 1 << bit
+
+        # Combos: cada componente es un slot; los de mayor descuento se arman primero
+        ordered = sorted(rules['combos'], key=lambda entry: -entry['discount'])
+        self.combos: List[_Combo] = []
+        self.slot_masks = [0] * item_count
+        self._slot_codes: List[int] = []
+        combo_slots: List[int] = []  # Bitmask de los slots de cada combo
+        for entry in ordered:
+            slots, counts, mask = [], [], 0
+            for component in entry['components']:
+                slot = len(self._slot_codes)
+                items = self._resolve(catalog, component['names'], entry['name'])
+                for item_id in items:
+                    if self.slot_masks[item_id] & mask:
+                        raise ValueError(f'{entry["name"]}: components overlap '
+                                         f'on {catalog.skus[item_id]}')
+                    self.slot_masks[item_id] |= 1 << slot
+                # Parte del descuento que rebaja la base de esta tasa (la del primer item)
+                self._slot_codes.append(self.tax_codes[items[0]] if items else 0)
+                slots.append(slot)
+                counts.append(component['count'])
+                mask |= 1 << slot
+            combo_slots.append(mask)
+            self.combos.append(_Combo(entry['name'], tuple(slots), tuple(counts),
+                                      entry['discount']))
+
+        # Slots de otros combos que comparten items: armar un combo les resta unidades
+        slot_combo = [mask for mask in combo_slots for _ in range(bin(mask).count('1'))]
+        self._overlaps = [0] * len(self._slot_codes)
+        for slots in set(self.slot_masks):
+            for slot in _bits(slots):
+                self._overlaps[slot] |= slots & ~slot_combo[slot]
+
+    @staticmethod
+    def _resolve(catalog: MenuCatalog, names: Iterable[str], rule: str) -> List[int]:
+        """item_ids de categorías o SKUs (ValueError si alguno no está en el menú)"""
+        item_ids: List[int] = []
+        for name in names:
+            if name in catalog.category_keys:
+                item_ids.extend(catalog.category_items(name))
+                continue
+            item_id = catalog.by_sku(name)
+            if item_id is None:
+                raise ValueError(f'{rule}: unknown category or SKU {name!r}')
+            item_ids.append(item_id)
+        return item_ids
+
+    def active_discounts(self, when: datetime.datetime) -> int:
+        """Bitmask de los descuentos vigentes en `when` (una vez por orden)"""
+        day = 1 << when.weekday()
+        minute = when.hour * 60 + when.minute
+        active = 0
+        for bit, discount in enumerate(self.discounts):
+            if not discount.days & day:
+                continue
+            start, end = discount.start, discount.end
+            # Una franja que cruza la medianoche (22:00-02:00) se invierte
+            if start == end or (start <= minute < end if start < end
+                                else not end <= minute < start):
+                active |= 1 << bit
+        return active
+
+    def apply(self, lines: Iterable[Tuple[int, object, int]],
+              when: datetime.datetime) -> Tuple[int, int, Tuple[Adjustment, ...]]:
+        """(descuento total, impuesto, ajustes) para líneas (item_id, cantidad, centavos)"""
+        active = self.active_discounts(when)
+        tax_codes, discount_masks, slot_masks = self.tax_codes, self.discount_masks, self.slot_masks
+        bases = [0] * len(self.rates)
+        discounted = [0] * len(self.discounts)
+        slot_units = [0] * len(self._slot_codes)
+
+        for item_id, quantity, cents in lines:
+            mask = discount_masks[item_id] & active
+            if mask:
+                bit = (mask & -mask).bit_length() - 1
+                discount = self.discounts[bit]
+                off = round_half_up_div(cents * discount.num, discount.den)
+                discounted[bit] += off
+                cents -= off
+            bases[tax_codes[item_id]] += cents
+            slots = slot_masks[item_id]
+            if slots:
+                units = int(quantity)  # Una fracción de plato no completa un combo
+                for slot in _bits(slots):
+                    slot_units[slot] += units
+
+        adjustments = [Adjustment(ADJUST_DISCOUNT, discount.label, -cents)
+                       for discount, cents in zip(self.discounts, discounted) if cents]
+        discount_total = sum(discounted)
+
+        for combo in self.combos:
+            times = min(slot_units[slot] // count for slot, count in zip(combo.slots, combo.counts))
+            if not times or not combo.cents:
+                continue
+            for slot, count in zip(combo.slots, combo.counts):
+                used = times * count
+                for other in _bits(self._overlaps[slot]):
+                    slot_units[other] = max(0, slot_units[other] - used)
+            cents = min(times * combo.cents, sum(bases))
+            if cents <= 0:
+                continue
+            # El descuento se reparte entre los componentes y rebaja la base de su tasa
+            share, rest = divmod(cents, len(combo.slots))
+            for position, slot in enumerate(combo.slots):
+                bases[self._slot_codes[slot]] -= share + (rest if position == 0 else 0)
+            label = combo.label if times == 1 else f'{combo.label} x{times}'
+            adjustments.append(Adjustment(ADJUST_COMBO, label, -cents))
+            discount_total += cents
+
+        # Si un combo dejó una base en negativo, el resto de su parte rebaja las demás
+        deficit = sum(-base for base in bases if base < 0)
+        if deficit:
+            for code, base in enumerate(bases):
+                taken = min(max(base, 0), deficit)
+                bases[code] = max(base, 0) - taken
+                deficit -= taken
+
+        taxes = [round_half_up_div(base * num, den)
+                 for base, (num, den) in zip(bases, self._rate_ratios)]
+        if len(self.rates) > 1:
+            adjustments.extend(Adjustment(ADJUST_TAX, label, cents)
+                               for label, cents in zip(self.tax_labels, taxes) if cents)
+        return discount_total, sum(taxes), tuple(adjustments)
+
+
+def _bits(mask: int):
+    """Índices de los bits en 1 de un bitmask"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def compile_rules(rules: Optional[Dict], catalog: MenuCatalog,
+                  default_rate) -> Optional[CompiledRules]:
+    """Compila las reglas; None si no cambian nada (una sola tasa, sin descuentos ni combos)"""
+    if not rules:
+        return None
+    default_rate = Decimal(str(default_rate))
+    if (not rules['discounts'] and not rules['combos']
+            and all(rate == default_rate for rate in rules['tax'].values())):
+        return None
+    return CompiledRules(rules, catalog, default_rate)
+
+
+if __name__ == '__main__':
+    # python -m pos.rules [archivo]: exporta reglas de ejemplo como punto de partida
+    target = open(sys.argv[1], 'w', encoding='utf-8') if len(sys.argv) > 1 else sys.stdout
+    json.dump(EXAMPLE_RULES, target, indent=2)
+    target.write('\n')
+    if target is not sys.stdout:
+        target.close()
@@ -0,0 +1,103 @@
+"""Tickets abiertos (mesas): órdenes compactas que se alternan en la misma pantalla"""
+
+from typing import Callable, Dict, Iterator, List, Optional
+
+TICKET_PREFIX = 'Table'
+
+
+class Ticket:
+    """Una orden abierta guardada en forma dispersa.
+
+    `lines` solo tiene los items marcados (item_id -> cantidad tal como se
+    escribió, '' si aún no tiene). Mientras el ticket está en pantalla su
+    estado vive en las variables de Tk y `lines` se actualiza al salir de él.
+    """
+
+    __slots__ = ('label', 'lines', 'receipt')
+
+    def __init__(self, label: str):
+        self.label = label
+        self.lines: Dict[int, str] = {}
+        self.receipt = None  # Último Receipt generado (conserva el número de la orden)
+
+    def __repr__(self) -> str:
+        return f'Ticket({self.label!r}, lines={len(self.lines)})'
+
+
+def diff_lines(old: Dict[int, str], new: Dict[int, str]) -> List[int]:
+    """item_ids cuya fila se ve distinta entre dos tickets (en orden de menú)"""
+    return sorted(item_id for item_id in old.keys() | new.keys()
+                  if old.get(item_id) != new.get(item_id))
+
+
+class TicketBook:
+    """Los tickets abiertos, en orden de apertura, y cuál está activo"""
+
+    def __init__(self):
+        self._tickets: Dict[str, Ticket] = {}
+        self.active: Optional[str] = None
+        self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tickets)
+
+    def __contains__(self, label: str) -> bool:
+        return label in self._tickets
+
+    def next_label(self) -> str:
+        """Siguiente nombre libre ('Table 1', 'Table 2', ...)"""
+        while True:
+            self._counter += 1
+            label = f'{TICKET_PREFIX} {self._counter}'
+            if label not in self._tickets:
+                return label
+
+    def open(self, label: Optional[str] = None) -> Ticket:
+        """Abre un ticket vacío (ValueError si el nombre ya está en uso)"""
+        label = label or self.next_label()
+        if label in self._tickets:
+            raise ValueError(f'Ticket already open: {label}')
+        ticket = self._tickets[label] = Ticket(label)
+        if self.active is None:
+            self.active = label
+        return ticket
+
+    def get(self, label: str) -> Ticket:
+        return self._tickets[label]
+
+    def current(self) -> Ticket:
+        return self._tickets[self.active]
+
+    def activate(self, label: str) -> Ticket:
+        ticket = self._tickets[label]
+        self.active = label
+        return ticket
+
+    def close(self, label: str) -> Ticket:
+        ticket = self._tickets.pop(label)
+        if self.active == label:
+            self.active = None
+        return ticket
+
+    def neighbor(self, label: str, step: int = 1) -> str:
+        """El ticket `step` posiciones después de `label` (circular)"""
+        labels = list(self._tickets)
+        return labels[(labels.index(label) + step) % len(labels)]
+
+    def remap(self, mapping: Callable[[int], Optional[int]]):
+        """Traduce los item_ids de los tickets inactivos (p. ej. tras recargar el menú).
+
+        Los items que ya no existen (mapping devuelve None) se descartan.
+        """
+        for label, ticket in self._tickets.items():
+            if label == self.active:
+                continue
+            remapped = {}
+            for item_id, quantity in ticket.lines.items():
+                new_id = mapping(item_id)
+                if new_id is not None:
+                    remapped[new_id] = quantity
+            ticket.lines = remapped
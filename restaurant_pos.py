@@ -1,85 +1,265 @@
 from tkinter import *
 from tkinter import filedialog, messagebox
-import random
-import datetime
-import operator
-from typing import Dict, List, Tuple
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pos.background import (LANE_HISTORY, LANE_JOURNAL, LANE_LOG, LANE_MENU, LANE_PRINT,
+                            LANE_RECEIPTS, IOWorker, append_log, send_to_printer, write_file)
+from pos.calculator import Calculator
+from pos.config import (DATA_DIR, HUB_ADDRESS, INSTRUMENT, JOURNAL_FILE, MENU_CATEGORIES,
+                        MENU_FILE, MENU_RELOAD_MS, METRICS_DUMP_SECONDS, METRICS_FILE,
+                        OVERLAY_REFRESH_MS, PRINTER_PATH, RECEIPT_ID_FILE, RULES_FILE, TAX_RATE)
+from pos.hub import HubPublisher
+from pos.instrumentation import Instrumentation, format_snapshot, write_snapshot
+from pos.history import ReceiptIndex, parse_bound, parse_time_of_day
+from pos.journal import OrderJournal
+from pos.menu import LoadedMenu, MenuSource, diff_menus
+from pos.order import OrderModel, quantity_after_toggle
+from pos.money import format_money, to_cents
+from pos.pricing import PricingEngine, RunningTotals
+from pos.receipt_ids import ReceiptNumberAllocator
+from pos.receipts import build_receipt, receipt_from_dict, receipt_to_dict, render_escpos, render_text
+from pos.rules import load_rules
+from pos.tickets import TicketBook, diff_lines
 
 # ==============================================================
 # 🌟 CONFIGURATION & CONSTANTS 🌟
 # ==============================================================
 
-MENU_CATEGORIES = {
-    'food': {
-        'items': ['Ramen', 'Salmon', 'Giyosas', 'Sushi', 'Hanbaga', 'Mochi', 'Onigiri', 'Curry'],
-        'prices': [1.32, 1.65, 2.31, 3.22, 1.22, 1.99, 2.05, 2.65],
-        'display_name': 'Food'
-    },
-    'drinks': {
-        'items': ['Water', 'Soda', 'Juice', 'Beer', 'Wine', 'Lemonade', 'Soft Drink', 'Chicha'],
-        'prices': [0.25, 0.99, 1.21, 1.54, 1.08, 1.10, 2.00, 1.58],
-        'display_name': 'Drinks'
-    },
-    'desserts': {
-        'items': ['Ice Cream', 'Fruit', 'Brownies', 'Flan', 'Mousse', 'Tiramisu', 'Cheesecake', 'Cupcake'],
-        'prices': [1.54, 1.68, 1.32, 1.97, 2.55, 2.14, 1.94, 1.74],
-        'display_name': 'Desserts'
-    }
-}
-
-TAX_RATE = 0.07
 WINDOW_TITLE = "Resutoranto - POS System"
 WINDOW_BG = '#FFFFFF'
 ACCENT_COLOR = '#0066CC'
 LIGHT_GRAY = '#EAEAEA'
 DARK_GRAY = '#333333'
+VISIBLE_ROWS = 12  # Filas de items con widgets reales por categoría
+IO_POLL_MS = 50  # Cada cuánto se revisan los trabajos de I/O terminados
+ERROR_COLOR = '#CC0000'
+LOOKUP_LIMIT = 500  # Resultados que muestra la búsqueda de recibos
 
 # ==============================================================
-# 🌟 SAFE CALCULATOR CLASS (Elimina eval()) 🌟
+# 🌟 VIRTUALIZED ITEM LIST (Solo widgets para filas visibles) 🌟
 # ==============================================================
 
-class Calculator:
-    """Calculadora segura sin eval()"""
-    
-    OPERATORS = {
-        '+': operator.add,
-        '-': operator.sub,
-        'x': operator.mul,
-        '*': operator.mul,
-        '/': operator.truediv,
-    }
+class VirtualItemList(Frame):
+    """Lista de items que solo crea widgets para las filas visibles.
 
-    @staticmethod
-    def calculate(expression: str) -> str:
-        """Evalúa expresiones matemáticas de forma segura"""
-        try:
-            # Dividir por operadores
-            for op_char, op_func in Calculator.OPERATORS.items():
-                if op_char in expression:
-                    parts = expression.split(op_char)
-                    if len(parts) == 2:
-                        left = float(parts[0].strip())
-                        right = float(parts[1].strip())
-                        result = op_func(left, right)
-                        return f"{result:.2f}"
-            
-            # Si no hay operador, retornar el número
-            return f"{float(expression):.2f}"
-        
-        except ZeroDivisionError:
-            return "Zero Division Error"
-        except (ValueError, AttributeError):
-            return "Syntax Error"
+    Las filas (Checkbutton, Label de precio, Entry) se reutilizan al desplazarse:
+    se vuelven a enlazar a las variables del item que ahora muestran.
+    """
+
+    def __init__(self, parent, cat_data: Dict, on_toggle, visible_rows: int = VISIBLE_ROWS):
+        super().__init__(parent, bg=LIGHT_GRAY)
+        self.cat_data = cat_data
+        self.on_toggle = on_toggle
+        self.first = 0
+        self.rows: List[Tuple[Checkbutton, Label, Entry]] = []
+        self._bound: List[Optional[int]] = []
+
+        item_count = len(cat_data['items'])
+        name_width = max((len(name) for name in cat_data['items']), default=0)
+        self.name_width = name_width
+
+        # Encabezados de columna (dentro de la lista para alinear columnas)
+        Label(self, text="Item", font=('Dosis Bold', 12), 
+              fg=DARK_GRAY, bg=LIGHT_GRAY).grid(row=0, column=0, sticky=W)
+        Label(self, text="Price", font=('Dosis Bold', 12), 
+              fg=ACCENT_COLOR, bg=LIGHT_GRAY).grid(row=0, column=1, padx=10)
+        Label(self, text="Qty", font=('Dosis Bold', 12), 
+              fg=DARK_GRAY, bg=LIGHT_GRAY).grid(row=0, column=2, padx=5)
+
+        for row_index in range(1, min(visible_rows, item_count) + 1):
+            self.rows.append(self._create_row(row_index, name_width))
+            self._bound.append(None)
+
+        # Barra de desplazamiento solo si hay más items que filas
+        self.scrollbar = None
+        if item_count > len(self.rows):
+            self.scrollbar = Scrollbar(self, orient=VERTICAL, command=self.yview)
+            self.scrollbar.grid(row=1, column=3, rowspan=len(self.rows), sticky='ns')
+            for widget in [self, *(w for row in self.rows for w in row)]:
+                widget.bind('<MouseWheel>', self._on_mousewheel)
+                widget.bind('<Button-4>', lambda event: self.yview('scroll', -1, 'units'))
+                widget.bind('<Button-5>', lambda event: self.yview('scroll', 1, 'units'))
+
+        self.refresh()
+        self._update_scrollbar()
+
+    def _create_row(self, row_index: int, name_width: int) -> Tuple[Checkbutton, Label, Entry]:
+        """Crea los widgets de una fila reutilizable"""
+        check = Checkbutton(self, font=('Dosis', 12), width=name_width, anchor=W,
+                            command=lambda offset=row_index - 1: self._toggled(offset),
+                            bg=WINDOW_BG, fg=DARK_GRAY, 
+                            selectcolor=ACCENT_COLOR)
+        check.grid(row=row_index, column=0, sticky=W, padx=5, pady=2)
+
+        price = Label(self, font=('Dosis', 12), fg=ACCENT_COLOR, bg=WINDOW_BG)
+        price.grid(row=row_index, column=1, sticky=W, padx=10, pady=2)
+
+        entry = Entry(self, font=('Dosis bold', 12), bd=1, width=4, 
+                      state="disabled", bg='white', fg='black')
+        entry.grid(row=row_index, column=2, padx=5, pady=2)
+        return check, price, entry
+
+    def _toggled(self, offset: int):
+        """Clic en un checkbox: avisa con el item_id que muestra esa fila"""
+        self.on_toggle(self.cat_data['item_ids'][self.first + offset])
+
+    def visible_indices(self) -> range:
+        """Índices (dentro de la categoría) de los items con fila visible"""
+        return range(self.first, self.first + len(self.rows))
+
+    def entry_for(self, index: int) -> Optional[Entry]:
+        """Entry que muestra el item `index`, o None si no está visible"""
+        if index in self.visible_indices():
+            return self.rows[index - self.first][2]
+        return None
+
+    def refresh(self):
+        """Enlaza cada fila al item que le toca y actualiza el estado de su Entry"""
+        cat_data = self.cat_data
+        focused = self.focus_get()
+        for offset, (check, price, entry) in enumerate(self.rows):
+            i = self.first + offset
+            if self._bound[offset] != i:
+                # Lo que se escribe va a la variable del item, no a la fila reciclada
+                if entry is focused:
+                    self.focus_set()
+                check.config(text=cat_data['items'][i].title(), variable=cat_data['check_vars'][i])
+                price.config(text=f'${cat_data["prices"][i]:.2f}')
+                entry.config(textvariable=cat_data['quantity_vars'][i])
+                self._bound[offset] = i
+            entry.config(state=NORMAL if cat_data['check_vars'][i].get() == 1 else DISABLED)
+
+    def invalidate(self, indices):
+        """Vuelve a enlazar las filas visibles de `indices` (nombre o precio nuevos)"""
+        for index in indices:
+            if index in self.visible_indices():
+                self._bound[index - self.first] = None
+        self.refresh()
+
+    def refresh_item(self, index: int):
+        """Actualiza solo la fila del item `index` (si está visible)"""
+        entry = self.entry_for(index)
+        if entry is not None:
+            checked = self.cat_data['check_vars'][index].get() == 1
+            entry.config(state=NORMAL if checked else DISABLED)
+
+    def yview(self, *args):
+        """Protocolo de Scrollbar: 'moveto fracción' o 'scroll n units|pages'"""
+        total = len(self.cat_data['items'])
+        if args[0] == 'moveto':
+            first = int(float(args[1]) * total)
+        else:
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= len(self.rows)
+            first = self.first + amount
+        self.scroll_to(first)
+
+    def scroll_to(self, first: int):
+        """Desplaza la lista para que `first` sea la primera fila visible"""
+        total = len(self.cat_data['items'])
+        first = max(0, min(first, total - len(self.rows)))
+        if first != self.first:
+            self.first = first
+            self.refresh()
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        """Ajusta la barra a la porción visible de la lista"""
+        if self.scrollbar is not None:
+            total = len(self.cat_data['items'])
+            self.scrollbar.set(self.first / total, (self.first + len(self.rows)) / total)
+
+    def _on_mousewheel(self, event):
+        """Rueda del ratón (Windows/macOS)"""
+        self.yview('scroll', -1 if event.delta > 0 else 1, 'units')
+        return 'break'
 
 # ==============================================================
 # 🌟 CLASS DEFINITIONS (POO CORE) 🌟
 # ==============================================================
 
 class RestaurantApp(Tk):
-    def __init__(self):
+    def __init__(self, live_totals: bool = True, menu: Dict[str, Dict] = MENU_CATEGORIES,
+                 journal_path: Optional[str] = None, instrument: bool = INSTRUMENT,
+                 menu_file: str = MENU_FILE, rules_file: str = RULES_FILE,
+                 receipt_ids_path: Optional[str] = None):
+        started = time.perf_counter()
+
         # 1. NON-TKINTER VARIABLES (SAFE TO DECLARE HERE)
         self.operator_buffer = ''
-        self.menu_data = MENU_CATEGORIES
+        # Problemas del arranque: se muestran en la barra de estado cuando ya existe
+        self.startup_problems: List[str] = []
+
+        # Menú desde archivo (opcional): se vigila y se recarga sin reiniciar
+        self.menu_source = MenuSource(menu_file) if menu_file else None
+        catalog = None
+        if self.menu_source is not None:
+            try:
+                menu, catalog = self.menu_source.load()[:2]
+            except (OSError, ValueError) as exc:
+                self.startup_problems.append(
+                    f'Menu file unavailable ({menu_file}): {exc}; using the built-in menu')
+        self.menu_data = menu
+
+        # Reglas de precio (opcional): se compilan con el catálogo en cada PricingEngine
+        self.pricing_rules = None
+        if rules_file:
+            try:
+                self.pricing_rules = load_rules(rules_file)
+            except (OSError, ValueError) as exc:
+                self.startup_problems.append(
+                    f'Pricing rules unavailable ({rules_file}): {exc}; using TAX_RATE only')
+        try:
+            self.pricing = PricingEngine(self.menu_data, TAX_RATE, catalog, self.pricing_rules)
+        except ValueError as exc:
+            self.startup_problems.append(f'Pricing rules rejected: {exc}; using TAX_RATE only')
+            self.pricing_rules = None
+            self.pricing = PricingEngine(self.menu_data, TAX_RATE, catalog)
+        self.catalog = self.pricing.catalog
+
+        # Totales en vivo: cada tecla aplica solo el delta de su línea
+        self.live_totals = live_totals
+        self.running_totals = RunningTotals(self.pricing)
+        self._live_refresh_id = None
+        self.current_receipt = None
+
+        # Selección con seguimiento de cambios: cada clic repinta solo su fila
+        self.order = OrderModel()
+        self._widget_flush_id = None
+
+        # Tickets abiertos (mesas): solo el activo vive en las variables de Tk
+        self.tickets = TicketBook()
+        self.tickets.open()
+        self.ticket_menu = None
+
+        # I/O en segundo plano: el mainloop nunca espera al disco ni a la impresora
+        self.io = IOWorker()
+        self._io_poll_id = None
+
+        # Journal durable: cada orden finalizada se registra automáticamente
+        self.journal = OrderJournal(journal_path)
+        self.history = ReceiptIndex(self.journal.path)
+        self.lookup_window = None
+        self.receipt_numbers = ReceiptNumberAllocator(receipt_ids_path)
+
+        # Hub de órdenes (opcional): la cocina y otros displays reciben cada orden
+        self.hub = None
+        if HUB_ADDRESS:
+            try:
+                self.hub = HubPublisher(HUB_ADDRESS)
+            except (OSError, ValueError) as exc:
+                self.startup_problems.append(f'Order hub unavailable ({HUB_ADDRESS}): {exc}')
+
+        # Instrumentación opcional: sin ella los callbacks se conectan sin envolver
+        self.metrics = Instrumentation() if instrument else None
+        self.metrics_path = os.path.join(DATA_DIR, METRICS_FILE)
+        self.debug_overlay = None
+        self._overlay_refresh_id = None
         
         # Diccionarios para almacenar variables por categoría (MEJOR ESTRUCTURA)
         self.category_data: Dict[str, Dict] = {}
@@ -98,6 +278,7 @@ class RestaurantApp(Tk):
         self.cost_frame = None
         self.right_frame = None
         self.main_body_frame = None 
+        self.status_label = None
 
         # --- 4. START GUI CONSTRUCTION ---
         self.configure_window()
@@ -107,6 +288,20 @@ class RestaurantApp(Tk):
         self.create_cost_section() 
         self.create_receipt_and_calculator()
 
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
+        self._report_startup_problems()
+        if self.metrics is not None:
+            self.start_instrumentation()
+        if self.menu_source is not None:
+            self.after(MENU_RELOAD_MS, self._poll_menu_file)
+        self.refresh_history()
+
+        # Recuperar la orden que estaba en pantalla si el proceso se cayó
+        self.recover_in_flight_order()
+
+        # Tiempo de construcción (las categorías se construyen al mostrarse)
+        self.startup_seconds = time.perf_counter() - started
+
     # ==============================================================
     # --- INITIALIZATION & CONFIGURATION ---
     # ==============================================================
@@ -118,21 +313,25 @@ class RestaurantApp(Tk):
             self.category_data[category_key] = {
                 'check_vars': [],
                 'quantity_vars': [],
-                'entries': [],
+                'item_list': None,
+                'item_ids': self.catalog.category_items(category_key),
                 'items': category_info['items'],
                 'prices': category_info['prices'],
-                'display_name': category_info['display_name']
+                'display_name': category_info['display_name'],
+                'cost_var': StringVar(),  # Costo de la categoría en el resumen
+                'cost_label': None
             }
         
-        # Variables para costos
+        # Variables para costos (las de cada categoría viven en category_data)
         self.cost_vars = {
-            'food': StringVar(),
-            'drinks': StringVar(),
-            'desserts': StringVar(),
             'subtotal': StringVar(),
+            'discounts': StringVar(),
             'tax': StringVar(),
-            'total': StringVar()
+            'total': StringVar(),
+            'adjustments': StringVar()
         }
+        self.status_var = StringVar()
+        self.ticket_var = StringVar(value=self.tickets.active)
 
     # ==============================================================
     # --- CALCULATOR LOGIC & CORE BUSINESS LOGIC ---
@@ -156,125 +355,651 @@ class RestaurantApp(Tk):
         self.calculator_display.insert(0, result)
         self.operator_buffer = ''
 
-    def check_input_status(self):
-        """Habilita/Deshabilita campos de entrada basado en estado de checkbox"""
-        for category_key in self.category_data:
-            self._update_category_entries(category_key)
+    def check_input_status(self, item_id: Optional[int] = None):
+        """Habilita/Deshabilita la entrada del checkbox que cambió (None = todos)"""
+        if item_id is None:
+            for cat_data in self.category_data.values():
+                for item_id in cat_data['item_ids'][:len(cat_data['check_vars'])]:
+                    self._apply_check(item_id)
+        else:
+            self._apply_check(item_id)
+        self._schedule_widget_flush()
 
-    def _update_category_entries(self, category_key: str):
-        """Actualiza el estado de las entradas para una categoría específica"""
+    def _apply_check(self, item_id: int):
+        """Registra el estado del checkbox en la orden y ajusta su cantidad"""
+        category_key, index = self.catalog.locate(item_id)
         cat_data = self.category_data[category_key]
-        for i in range(len(cat_data['check_vars'])):
-            if cat_data['check_vars'][i].get() == 1:
-                cat_data['entries'][i].config(state=NORMAL)
-                if cat_data['quantity_vars'][i].get() == '0':
-                    cat_data['quantity_vars'][i].set('')
-                cat_data['entries'][i].focus()
-            else:
-                cat_data['entries'][i].config(state=DISABLED)
-                cat_data['quantity_vars'][i].set('0')
+        checked = cat_data['check_vars'][index].get() == 1
+        self.order.toggle(item_id, checked)
+        qty_var = cat_data['quantity_vars'][index]
+        quantity = quantity_after_toggle(checked, qty_var.get())
+        if quantity is not None:
+            qty_var.set(quantity)
 
-    def _validate_quantity(self, value: str) -> float:
-        """Valida y convierte cantidad a float, retorna 0 si es inválido"""
-        try:
-            amount = float(value) if value else 0
-            return max(0, amount)  # No permitir números negativos
-        except ValueError:
-            return 0
+    def _schedule_widget_flush(self):
+        """Agenda un único repintado de las filas cambiadas por ciclo idle"""
+        if self._widget_flush_id is None:
+            self._widget_flush_id = self.after_idle(self._flush_widgets)
+
+    def _flush_widgets(self):
+        """Repinta solo las filas dirty y enfoca el item recién marcado"""
+        self._widget_flush_id = None
+        for item_id in self.order.take_dirty():
+            category_key, index = self.catalog.locate(item_id)
+            item_list = self.category_data[category_key]['item_list']
+            if item_list is not None:
+                item_list.refresh_item(index)
+
+        focus_item = self.order.take_focus()
+        if focus_item is not None:
+            category_key, index = self.catalog.locate(focus_item)
+            item_list = self.category_data[category_key]['item_list']
+            entry = item_list.entry_for(index) if item_list is not None else None
+            if entry is not None:
+                entry.focus()
 
     def calculate_total(self):
         """Calcula todos los subtotales, impuestos y total general"""
-        totals = {}
-        grand_subtotal = 0
+        if self.live_totals:
+            # Los subtotales ya están al día gracias a los traces
+            priced = self.running_totals.snapshot()
+        else:
+            # El cálculo vive en PricingEngine (sin Tk); aquí solo se leen las cantidades
+            quantities = {
+                category_key: [qty_var.get() for qty_var in cat_data['quantity_vars']]
+                for category_key, cat_data in self.category_data.items()
+            }
+            priced = self.pricing.price_order(quantities)
+        self._show_totals(priced)
 
-        # Calcular subtotal para cada categoría
-        for category_key, cat_data in self.category_data.items():
-            subtotal = 0
-            for i in range(len(cat_data['items'])):
-                amount = self._validate_quantity(cat_data['quantity_vars'][i].get())
-                subtotal += amount * cat_data['prices'][i]
-            
-            totals[category_key] = subtotal
-            grand_subtotal += subtotal
+    def _show_totals(self, priced):
+        """Actualiza las variables de costo a partir de un PricedOrder"""
+        for category_key, cents in priced.category_cents.items():
+            if category_key in self.category_data:
+                self.category_data[category_key]['cost_var'].set(format_money(cents))
+        self.cost_vars['subtotal'].set(format_money(priced.subtotal_cents))
+        self.cost_vars['discounts'].set(format_money(-priced.discount_cents))
+        self.cost_vars['tax'].set(format_money(priced.tax_cents))
+        self.cost_vars['total'].set(format_money(priced.total_cents))
+        # Detalle de las reglas aplicadas (descuentos, combos y cada tasa de impuesto)
+        self.cost_vars['adjustments'].set('   '.join(
+            f'{adjustment.label}: {format_money(adjustment.cents)}'
+            for adjustment in priced.adjustments))
+
+    def _quantity_var(self, item_id: int) -> StringVar:
+        """Variable de cantidad de un item a partir de su item_id"""
+        category_key, index = self.catalog.locate(item_id)
+        return self.category_data[category_key]['quantity_vars'][index]
+
+    def _on_quantity_write(self, item_id: int):
+        """Trace de una cantidad: aplica el delta y agenda un refresco por ciclo idle"""
+        delta = self.running_totals.set_item(item_id, self._quantity_var(item_id).get())
+        if delta and self.live_totals and self._live_refresh_id is None:
+            self._live_refresh_id = self.after_idle(self._flush_live_totals)
 
-        # Calcular impuesto y total
-        tax = grand_subtotal * TAX_RATE
-        grand_total = grand_subtotal + tax
+    def _flush_live_totals(self):
+        """Vuelca los totales vivos a cost_vars (una vez por ráfaga de teclas)"""
+        self._live_refresh_id = None
+        self._show_totals(self.running_totals.snapshot())
 
-        # Actualizar variables de costo
-        self.cost_vars['food'].set(f'${totals.get("food", 0):.2f}')
-        self.cost_vars['drinks'].set(f'${totals.get("drinks", 0):.2f}')
-        self.cost_vars['desserts'].set(f'${totals.get("desserts", 0):.2f}')
-        self.cost_vars['subtotal'].set(f'${grand_subtotal:.2f}')
-        self.cost_vars['tax'].set(f'${tax:.2f}')
-        self.cost_vars['total'].set(f'${grand_total:.2f}')
+    def _cancel_live_refresh(self):
+        """Cancela un refresco pendiente de totales vivos"""
+        if self._live_refresh_id is not None:
+            self.after_cancel(self._live_refresh_id)
+            self._live_refresh_id = None
+
+    def _order_lines(self) -> List[Tuple[int, str]]:
+        """Pares (item_id, cantidad) de la orden actual, en orden de menú"""
+        return [
+            (item_id, qty_var.get())
+            for cat_data in self.category_data.values()
+            for item_id, qty_var in zip(cat_data['item_ids'], cat_data['quantity_vars'])
+        ]
 
     def generate_receipt(self):
         """Genera y muestra el recibo final con alineación profesional"""
+        # El número se asigna una sola vez por orden, no en cada render
+        previous = self.current_receipt
+        if previous is None:
+            number, issued_at = self.receipt_numbers.next(), None
+        else:
+            number, issued_at = previous.number, previous.issued_at
+
+        # Se construye en una pasada desde la orden y se inserta de una sola vez
+        self.current_receipt = build_receipt(self.pricing, self._order_lines(), number, issued_at)
         self.receipt_text_area.delete(1.0, END)
-        receipt_number = f'N# - {random.randint(1000, 9999)}'
-        receipt_date = datetime.datetime.now().strftime('%d/%m/%Y - %H:%M:%S')
-        
-        # Encabezado del recibo
-        self.receipt_text_area.insert(END, f'Data: {receipt_number:<20} {receipt_date}\n')
-        self.receipt_text_area.insert(END, f'=' * 54 + '\n')
-        self.receipt_text_area.insert(END, f'{"Item":<20} {"QTY":<10} {"Cost":>10}\n')
-        self.receipt_text_area.insert(END, f'-' * 54 + '\n')
+        self.receipt_text_area.insert(END, render_text(self.current_receipt))
 
-        # Insertar items
-        for category_key, cat_data in self.category_data.items():
-            for i in range(len(cat_data['items'])):
-                amount_str = cat_data['quantity_vars'][i].get()
-                if amount_str and amount_str != '0':
-                    try:
-                        amount = float(amount_str)
-                        item_cost = amount * cat_data['prices'][i]
-                        self.receipt_text_area.insert(END, 
-                            f'{cat_data["items"][i]:<20}{amount_str:<10}${item_cost:.2f}\n')
-                    except ValueError:
-                        pass
-
-        # Resumen de costos
-        self.receipt_text_area.insert(END, f'-' * 54 + '\n')
-        self.receipt_text_area.insert(END, f'Cost of Food: \t\t\t\t{self.cost_vars["food"].get()}\n')
-        self.receipt_text_area.insert(END, f'Cost of Drinks: \t\t\t\t{self.cost_vars["drinks"].get()}\n')
-        self.receipt_text_area.insert(END, f'Cost of Desserts: \t\t\t{self.cost_vars["desserts"].get()}\n')
-        self.receipt_text_area.insert(END, f'-' * 54 + '\n')
-        self.receipt_text_area.insert(END, f'Subtotal: \t\t\t\t{self.cost_vars["subtotal"].get()}\n')
-        self.receipt_text_area.insert(END, f'Tax ({TAX_RATE*100:.0f}%): \t\t\t\t{self.cost_vars["tax"].get()}\n')
-        self.receipt_text_area.insert(END, f'Total: \t\t\t\t{self.cost_vars["total"].get()}\n')
-        self.receipt_text_area.insert(END, f'-' * 54 + '\n')
-        self.receipt_text_area.insert(END, f'Please come again')
+        # Solo se vuelve a registrar si la orden cambió desde el último recibo
+        if previous is None or previous.lines != self.current_receipt.lines:
+            order = receipt_to_dict(self.current_receipt)
+            order['ticket'] = self.tickets.active
+            # El índice se pone al día cuando el registro ya está en el journal
+            self.run_in_background(LANE_JOURNAL, self.journal.append_order, order,
+                                   on_done=lambda sequence: self.refresh_history(),
+                                   on_error=self._io_error('Journal write'))
+            if self.hub is not None:
+                self.watch_in_background(self.hub.publish(order),
+                                         on_error=self._io_error('Hub publish'))
 
     def save_receipt(self):
-        """Abre diálogo para guardar el recibo"""
+        """Abre diálogo para guardar el recibo (la escritura va en segundo plano)"""
         receipt_content = self.receipt_text_area.get(1.0, END)
         if not receipt_content.strip():
             messagebox.showwarning('Warning', 'Receipt is empty!')
             return
 
-        file = filedialog.asksaveasfile(mode='w', defaultextension='.txt')
-        if file:
-            file.write(receipt_content)
-            file.close()
-            messagebox.showinfo('Information', 'File saved successfully')
+        filename = filedialog.asksaveasfilename(defaultextension='.txt')
+        if self.metrics is not None:
+            self.metrics.pause()  # El diálogo modal no es un stall
+        if filename:
+            # Se mide desde que se cierra el diálogo: el tiempo del usuario no es latencia
+            self.instrumented('save', self._start_save)(filename, receipt_content)
+
+    def _start_save(self, filename: str, receipt_content: str):
+        self.set_status('Saving receipt...')
+        self.run_in_background(LANE_RECEIPTS, write_file, filename, receipt_content,
+                               on_done=self._saved_receipt,
+                               on_error=self._io_error('Save'))
+
+    def _saved_receipt(self, path: str):
+        self.set_status('File saved successfully')
+        self.log(f'receipt saved to {path}')
+
+    def print_receipt(self):
+        """Envía el recibo actual a la impresora térmica (ESC/POS) en segundo plano"""
+        if self.current_receipt is None:
+            self.set_status('Generate a receipt first', error=True)
+            return
+        number = self.current_receipt.number
+        self.run_in_background(LANE_PRINT, send_to_printer, PRINTER_PATH,
+                               render_escpos(self.current_receipt),
+                               on_done=lambda device: self.set_status(f'Receipt N# {number} printed'),
+                               on_error=self._io_error('Print'))
+
+    def log(self, message: str):
+        """Añade una línea al log local sin bloquear la GUI"""
+        self.run_in_background(LANE_LOG, append_log, message,
+                               on_error=lambda exc: self.set_status(f'Log write failed: {exc}',
+                                                                    error=True))
+
+    # ==============================================================
+    # --- BACKGROUND I/O ---
+    # ==============================================================
+
+    def run_in_background(self, lane: str, func, *args, on_done=None, on_error=None):
+        """Encola un trabajo de I/O; sus callbacks vuelven al hilo de Tk vía after()"""
+        if self.io.closed:  # cerrando la ventana: lo que llegue tarde (p. ej. un log) se descarta
+            return
+        self.io.submit(lane, func, *args, on_done=on_done, on_error=on_error)
+        self._schedule_io_poll()
+
+    def watch_in_background(self, future, on_done=None, on_error=None):
+        """Igual que run_in_background() para un Future que ya está corriendo (p. ej. el hub)"""
+        if self.io.closed:
+            return
+        self.io.watch(future, on_done=on_done, on_error=on_error)
+        self._schedule_io_poll()
+
+    def _schedule_io_poll(self):
+        if self._io_poll_id is None:
+            self._io_poll_id = self.after(IO_POLL_MS, self._poll_io)
+
+    def _poll_io(self):
+        """Entrega los resultados terminados; sigue revisando mientras haya pendientes"""
+        self._io_poll_id = None
+        self.io.poll()
+        if self.io.pending:
+            self._io_poll_id = self.after(IO_POLL_MS, self._poll_io)
+
+    def _io_error(self, action: str):
+        """Callback de error: aviso en la barra de estado (sin diálogo modal) y al log"""
+        def report(exc: BaseException):
+            self.set_status(f'{action} failed: {exc}', error=True)
+            self.log(f'{action.lower()} failed: {exc!r}')
+        return report
+
+    def _report_startup_problems(self):
+        """Lo que falló antes de que existiera la GUI va a la barra de estado y al log"""
+        if self.startup_problems:
+            self.set_status('; '.join(self.startup_problems), error=True)
+            for message in self.startup_problems:
+                self.log(message)
+
+    def set_status(self, text: str, error: bool = False):
+        """Muestra un mensaje no bloqueante en la barra de estado"""
+        self.status_var.set(text)
+        if self.status_label is not None:
+            self.status_label.config(fg=ERROR_COLOR if error else DARK_GRAY)
 
     def reset_all(self):
         """Reinicia todos los campos, checkboxes y variables de costo"""
         self.receipt_text_area.delete(1.0, END)
+        if self.current_receipt is not None:
+            # La orden terminó: ya no hay que recuperarla tras un crash
+            self.run_in_background(LANE_JOURNAL, self.journal.close_order,
+                                   self.current_receipt.number,
+                                   on_error=self._io_error('Journal write'))
+        self.current_receipt = None
         
+        # Solo los items marcados pueden tener cantidad (las demás entradas están deshabilitadas)
+        for item_id in self.order.clear():
+            category_key, index = self.catalog.locate(item_id)
+            cat_data = self.category_data[category_key]
+            cat_data['quantity_vars'][index].set('0')
+            cat_data['check_vars'][index].set(0)
+        self._schedule_widget_flush()
+
+        # Los traces ya dejaron los totales vivos en cero; no repintar $0.00
+        self._cancel_live_refresh()
+        self._clear_costs()
+
+    def _clear_costs(self):
+        """Vacía el resumen de costos (categorías y totales)"""
+        for cost_var in self.cost_vars.values():
+            cost_var.set('')
+        for cat_data in self.category_data.values():
+            cat_data['cost_var'].set('')
+
+    def recover_in_flight_order(self):
+        """Restaura como tickets abiertos las órdenes del journal que nunca se cerraron"""
+        orders = sorted(self.journal.in_flight(), key=lambda order: order['issued_at'])
+        if not orders:
+            return
+
+        initial = self.tickets.current()
+        for order in orders:
+            receipt = receipt_from_dict(order)
+            label = order.get('ticket') or f'Receipt {receipt.number}'
+            if label in self.tickets and self.tickets.get(label).receipt is not None:
+                label = f'{label} ({receipt.number})'
+            ticket = self.tickets.get(label) if label in self.tickets else self.tickets.open(label)
+            ticket.receipt = receipt
+            for line in receipt.lines:
+                item_id = self.catalog.by_sku(line.sku)
+                if item_id is not None:  # El item puede ya no existir en el menú
+                    ticket.lines[item_id] = line.quantity
+
+        # El ticket vacío del arranque sobra si no se recuperó nada en él
+        if initial.receipt is None and len(self.tickets) > 1:
+            self.tickets.close(initial.label)
+        # La orden más reciente queda en pantalla (las variables aún están vacías)
+        self._show_ticket(self.tickets.activate(label), {})
+        self._refresh_ticket_menu()
+
+    def on_close(self):
+        """Cierra la ventana vaciando antes el I/O pendiente, el journal y el hub.
+
+        La ventana se destruye aunque algún paso falle (p. ej. un hub que no responde).
+        """
+        try:
+            try:
+                if self.metrics is not None:
+                    self.dump_metrics()
+                self.io.shutdown(wait=True)
+                self.journal.close()
+            finally:
+                if self.hub is not None:
+                    self.hub.close()
+        finally:
+            self.destroy()
+
+    # ==============================================================
+    # --- RECEIPT LOOKUP & REPRINT ---
+    # ==============================================================
+
+    def refresh_history(self):
+        """Indexa lo nuevo del journal en su propio carril: las escrituras nunca lo esperan"""
+        self.run_in_background(LANE_HISTORY, self.history.refresh,
+                               on_error=self._io_error('Receipt index'))
+
+    def open_receipt_lookup(self):
+        """Ventana para buscar recibos pasados y reimprimirlos"""
+        if self.lookup_window is not None and self.lookup_window.winfo_exists():
+            self.lookup_window.lift()
+            return
+        window = self.lookup_window = Toplevel(self, bg=WINDOW_BG, padx=10, pady=10)
+        window.title('Receipt Lookup')
+
+        fields: Dict[str, Entry] = {}
+        field_labels = [('Receipt N#', 'number'), ('Item', 'item'), ('From', 'start'),
+                        ('To', 'end'), ('Time (19:00-20:00)', 'time'), ('Min Total', 'min'),
+                        ('Max Total', 'max')]
+        for row, (text, key) in enumerate(field_labels):
+            Label(window, text=text, font=('Dosis', 12), fg=DARK_GRAY,
+                  bg=WINDOW_BG).grid(row=row, column=0, sticky=W, pady=2)
+            fields[key] = Entry(window, font=('Dosis', 12), bd=1, width=18)
+            fields[key].grid(row=row, column=1, padx=5, pady=2)
+
+        results = Listbox(window, font=('Courier', 10), width=42, height=16)
+        results.grid(row=0, column=2, rowspan=len(field_labels) + 1, padx=5, sticky='ns')
+        preview = Text(window, font=('Dosis', 12), bd=1, width=40, height=16,
+                       bg=WINDOW_BG, fg=DARK_GRAY)
+        preview.grid(row=0, column=3, rowspan=len(field_labels) + 1, padx=5, sticky='ns')
+        found: List[int] = []
+
+        def show_results(outcome):
+            summaries, matched = outcome
+            found[:] = [number for number, _, _ in summaries]
+            results.delete(0, END)
+            for number, issued_at, total_cents in summaries:
+                results.insert(END, f'N# {number:<8} {issued_at:%Y-%m-%d %H:%M} '
+                                    f'{format_money(total_cents):>10}')
+            if len(summaries) < matched:
+                self.set_status(f'{matched} receipts found, showing the newest {len(summaries)}')
+            else:
+                self.set_status(f'{matched} receipts found')
+            if len(summaries) == 1:
+                results.selection_set(0)
+                show_selected()
+
+        def search():
+            try:
+                query = self._lookup_query({key: entry.get().strip() for key, entry in fields.items()})
+            except ValueError as exc:
+                self.set_status(f'Invalid search: {exc}', error=True)
+                return
+            self.run_in_background(LANE_HISTORY, self._search_history, query,
+                                   on_done=show_results, on_error=self._io_error('Lookup'))
+
+        def show_preview(text):
+            preview.delete(1.0, END)
+            preview.insert(END, text or '')
+
+        def show_selected(event=None):
+            selection = results.curselection()
+            if selection:
+                self.run_in_background(LANE_HISTORY, self.history.reprint, found[selection[0]],
+                                       on_done=show_preview, on_error=self._io_error('Lookup'))
+
+        def reprint():
+            selection = results.curselection()
+            if not selection:
+                self.set_status('Select a receipt first', error=True)
+                return
+            number = found[selection[0]]
+            self.run_in_background(LANE_HISTORY, self.history.receipt, number,
+                                   on_done=self._reprint_receipt, on_error=self._io_error('Lookup'))
+
+        results.bind('<<ListboxSelect>>', show_selected)
+        for entry in fields.values():
+            entry.bind('<Return>', lambda event: search())
+
+        actions = Frame(window, bg=WINDOW_BG)
+        actions.grid(row=len(field_labels), column=0, columnspan=2, pady=10)
+        Button(actions, text='Search', font=('Dosis', 12), fg='white', bg=ACCENT_COLOR, bd=1,
+               width=9, command=self.instrumented('lookup.search', search)).pack(side='left', padx=5)
+        Button(actions, text='Reprint', font=('Dosis', 12), fg='white', bg=ACCENT_COLOR, bd=1,
+               width=9, command=reprint).pack(side='left', padx=5)
+        fields['number'].focus()
+
+    @staticmethod
+    def _lookup_query(values: Dict[str, str]) -> Dict:
+        """Convierte los campos de la búsqueda (ValueError si alguno es inválido)"""
+        return {
+            'number': int(values['number']) if values['number'] else None,
+            'item': values['item'] or None,
+            'start': parse_bound(values['start']) if values['start'] else None,
+            'end': parse_bound(values['end'], end=True) if values['end'] else None,
+            'time_of_day': parse_time_of_day(values['time']) if values['time'] else None,
+            'min_cents': to_cents(values['min']) if values['min'] else None,
+            'max_cents': to_cents(values['max']) if values['max'] else None,
+        }
+
+    def _search_history(self, query: Dict) -> Tuple[List[Tuple[int, object, int]], int]:
+        """Trabajo de fondo: (número, fecha, total) de los más recientes y cuántos coinciden"""
+        number = query.pop('number')
+        if number is not None:
+            numbers = [number] if self.history.receipt(number) is not None else []
+            matched = len(numbers)
+        else:
+            numbers, matched = self.history.search(**query, limit=LOOKUP_LIMIT)
+        return [self.history.summary(number) for number in numbers], matched
+
+    def _reprint_receipt(self, receipt):
+        """Reimprime un recibo pasado: a la impresora si hay, si no a un archivo"""
+        if receipt is None:
+            return
+        if PRINTER_PATH:
+            self.run_in_background(LANE_PRINT, send_to_printer, PRINTER_PATH, render_escpos(receipt),
+                                   on_done=lambda device: self.set_status(
+                                       f'Receipt N# {receipt.number} reprinted'),
+                                   on_error=self._io_error('Print'))
+            return
+        filename = filedialog.asksaveasfilename(defaultextension='.txt',
+                                                initialfile=f'receipt_{receipt.number}.txt')
+        if self.metrics is not None:
+            self.metrics.pause()  # El diálogo modal no es un stall
+        if filename:
+            self.run_in_background(LANE_RECEIPTS, write_file, filename, render_text(receipt),
+                                   on_done=self._saved_receipt, on_error=self._io_error('Save'))
+
+    # ==============================================================
+    # --- OPEN TICKETS ---
+    # ==============================================================
+
+    def _capture_lines(self) -> Dict[int, str]:
+        """Estado disperso del ticket en pantalla: item_id -> cantidad de los marcados"""
+        return {item_id: self._quantity_var(item_id).get() for item_id in self.order.checked}
+
+    def switch_ticket(self, label: str):
+        """Cambia de ticket repintando solo las filas que difieren"""
+        if label == self.tickets.active or label not in self.tickets:
+            self.ticket_var.set(self.tickets.active)
+            return
+        leaving = self.tickets.current()
+        leaving.lines = self._capture_lines()
+        leaving.receipt = self.current_receipt
+        self._show_ticket(self.tickets.activate(label), leaving.lines)
+
+    def _show_ticket(self, ticket, previous: Dict[int, str]):
+        """Pone un ticket en pantalla partiendo de las filas de `previous`"""
+        for item_id in diff_lines(previous, ticket.lines):
+            category_key, index = self.catalog.locate(item_id)
+            self.ensure_items_section(category_key)
+            cat_data = self.category_data[category_key]
+            quantity = ticket.lines.get(item_id)
+            if quantity is None:
+                cat_data['quantity_vars'][index].set('0')
+                cat_data['check_vars'][index].set(0)
+            else:
+                cat_data['check_vars'][index].set(1)
+                cat_data['quantity_vars'][index].set(quantity)
+            self.order.toggle(item_id, quantity is not None)
+        self.order.take_focus()  # Cambiar de mesa no debe mover el foco
+        self._schedule_widget_flush()
+
+        self.current_receipt = ticket.receipt
+        self.receipt_text_area.delete(1.0, END)
+        if ticket.receipt is not None:
+            self.receipt_text_area.insert(END, render_text(ticket.receipt))
+
+        # Los traces ya dejaron los totales vivos al día para este ticket
+        self._cancel_live_refresh()
+        if ticket.lines:
+            self._show_totals(self.running_totals.snapshot())
+        else:
+            self._clear_costs()
+        self.ticket_var.set(ticket.label)
+
+    def new_ticket(self):
+        """Abre un ticket vacío para otra mesa y lo pone en pantalla"""
+        ticket = self.tickets.open()
+        self._refresh_ticket_menu()
+        self.switch_ticket(ticket.label)
+
+    def close_ticket(self):
+        """Termina el ticket en pantalla (igual que Reset) y pasa al siguiente"""
+        self.reset_all()
+        if len(self.tickets) > 1:
+            closing = self.tickets.active
+            self.switch_ticket(self.tickets.neighbor(closing))
+            self.tickets.close(closing)
+            self._refresh_ticket_menu()
+
+    def _refresh_ticket_menu(self):
+        """Reconstruye las opciones del selector de tickets"""
+        if self.ticket_menu is None:
+            return
+        menu = self.ticket_menu['menu']
+        menu.delete(0, END)
+        switch = self.instrumented('ticket.switch', self.switch_ticket)
+        for label in self.tickets:
+            menu.add_command(label=label, command=lambda label=label: switch(label))
+
+    # ==============================================================
+    # --- MENU HOT-RELOAD ---
+    # ==============================================================
+
+    def _poll_menu_file(self):
+        """Revisa el archivo de menú en segundo plano; la siguiente revisión se agenda al terminar"""
+        def report(exc: BaseException):
+            self._io_error('Menu reload')(exc)
+            self.after(MENU_RELOAD_MS, self._poll_menu_file)
+
+        self.run_in_background(LANE_MENU, self.menu_source.check,
+                               on_done=self._menu_checked, on_error=report)
+
+    def _menu_checked(self, loaded: Optional[LoadedMenu]):
+        if loaded is not None:
+            self.apply_menu(loaded)
+        self.after(MENU_RELOAD_MS, self._poll_menu_file)
+
+    def apply_menu(self, loaded: LoadedMenu):
+        """Cambia al nuevo menú repintando solo las filas que cambiaron.
+
+        Las categorías con los mismos items (por SKU) solo reetiquetan las filas
+        con nombre o precio nuevo; las que ganaron, perdieron o reordenaron
+        items reconstruyen su lista. La orden abierta se conserva por SKU.
+        """
+        diff = diff_menus(self.catalog, loaded.catalog)
+        if diff.categories_changed:
+            self.set_status('Menu reload skipped: the categories changed, restart to apply',
+                            error=True)
+            return
+        if diff.empty:
+            return
+
+        # La orden abierta por SKU (solo los items marcados pueden tener cantidad)
+        carried = {self.catalog.skus[item_id]: self._quantity_var(item_id).get()
+                   for item_id in self.order.checked}
+
+        old_catalog = self.catalog
+        try:
+            self.pricing = PricingEngine(loaded.menu, TAX_RATE, loaded.catalog, self.pricing_rules)
+        except ValueError as exc:
+            self.set_status(f'Menu reload skipped: pricing rules rejected: {exc}', error=True)
+            return
+        self.menu_data = loaded.menu
+        self.catalog = self.pricing.catalog
+        self.running_totals = RunningTotals(self.pricing)
+        self.tickets.remap(lambda item_id: self.catalog.by_sku(old_catalog.skus[item_id]))
+
         for category_key, cat_data in self.category_data.items():
-            for i in range(len(cat_data['items'])):
-                cat_data['quantity_vars'][i].set('0')
-                cat_data['entries'][i].config(state=DISABLED)
-                cat_data['check_vars'][i].set(0)
-
-        for key in self.cost_vars:
-            self.cost_vars[key].set('')
-    
+            info = loaded.menu[category_key]
+            cat_data.update(item_ids=self.catalog.category_items(category_key),
+                            items=info['items'], prices=info['prices'],
+                            display_name=info['display_name'])
+            if category_key in diff.renamed:
+                self.menu_panels[category_key].config(text=info['display_name'])
+                cat_data['cost_label'].config(text=f"{info['display_name']} Cost")
+            item_list = cat_data['item_list']
+            if item_list is None:
+                continue  # Se construirá con el menú nuevo al mostrarse
+            if category_key in diff.renamed:
+                cat_data['header'].config(text=info['display_name'])
+            too_wide = any(len(name) > item_list.name_width for name in info['items'])
+            if category_key in diff.relaid or too_wide:
+                self._rebuild_item_list(category_key, carried)
+            elif category_key in diff.changed:
+                item_list.invalidate(diff.changed[category_key])
+
+        # Selección y totales vivos a partir de lo que sigue en el menú
+        self.order = OrderModel()
+        for sku, quantity in carried.items():
+            item_id = self.catalog.by_sku(sku)
+            if item_id is not None:
+                self.order.checked.add(item_id)
+                self.running_totals.set_item(item_id, quantity)
+        if self.cost_vars['total'].get():
+            self.calculate_total()
+
+        changed = sum(len(indices) for indices in diff.changed.values())
+        dropped = sum(1 for sku in carried if self.catalog.by_sku(sku) is None)
+        message = f'Menu reloaded: {changed} items changed, {len(diff.removed)} removed'
+        if dropped:
+            message += f'; {dropped} removed items dropped from the open order'
+        self.set_status(message, error=bool(dropped))
+        self.log(message)
+
+    def _rebuild_item_list(self, category_key: str, carried: Dict[str, str]):
+        """Reconstruye la lista de una categoría cuyos items cambiaron de posición"""
+        cat_data = self.category_data[category_key]
+        cat_data['item_list'].destroy()
+        cat_data['check_vars'], cat_data['quantity_vars'] = [], []
+        self._create_item_vars(category_key)
+        for index, item_id in enumerate(cat_data['item_ids']):
+            quantity = carried.get(self.catalog.skus[item_id])
+            if quantity is not None:
+                cat_data['check_vars'][index].set(1)
+                cat_data['quantity_vars'][index].set(quantity)
+        self._create_item_list(category_key, self.menu_panels[category_key])
+
+    # ==============================================================
+    # --- INSTRUMENTATION (OPT-IN) ---
+    # ==============================================================
+
+    def instrumented(self, action: str, callback):
+        """Envuelve un callback para medir su latencia; apagado lo devuelve tal cual"""
+        if self.metrics is None:
+            return callback
+        return self.metrics.wrap(action, callback)
+
+    def start_instrumentation(self):
+        """Arranca el sondeo de stalls, el overlay (F12) y el volcado periódico"""
+        self.debug_overlay = Label(self, font=('Courier', 9), justify=LEFT, anchor=NW,
+                                   bg='#FFFFE0', fg=DARK_GRAY, bd=1, relief='solid')
+        self.bind('<F12>', lambda event: self.toggle_debug_overlay())
+        self.toggle_debug_overlay()
+        self.after(int(self.metrics.probe_seconds * 1000), self._probe_event_loop)
+        self.after(METRICS_DUMP_SECONDS * 1000, self._periodic_metrics_dump)
+
+    def _probe_event_loop(self):
+        """Latido: si llega tarde, el event loop estuvo bloqueado"""
+        self.metrics.tick()
+        self.after(int(self.metrics.probe_seconds * 1000), self._probe_event_loop)
+
+    def toggle_debug_overlay(self):
+        """Muestra u oculta el overlay de latencias"""
+        if self._overlay_refresh_id is not None:
+            self.after_cancel(self._overlay_refresh_id)
+            self._overlay_refresh_id = None
+            self.debug_overlay.place_forget()
+        else:
+            self.debug_overlay.place(relx=1.0, rely=0.0, anchor=NE, x=-10, y=10)
+            self.debug_overlay.lift()
+            self._refresh_debug_overlay()
+
+    def _refresh_debug_overlay(self):
+        """Repinta el overlay una vez por intervalo mientras esté visible"""
+        self.debug_overlay.config(text=format_snapshot(self.metrics.snapshot()))
+        self._overlay_refresh_id = self.after(OVERLAY_REFRESH_MS, self._refresh_debug_overlay)
+
+    def _periodic_metrics_dump(self):
+        self.dump_metrics()
+        self.after(METRICS_DUMP_SECONDS * 1000, self._periodic_metrics_dump)
+
+    def dump_metrics(self):
+        """Vuelca las mediciones a metrics.json (la copia se toma en el hilo de Tk)"""
+        self.run_in_background(LANE_LOG, write_snapshot, self.metrics_path, self.metrics.snapshot(),
+                               on_error=self._io_error('Metrics dump'))
+
     def configure_window(self):
         """Sets up window geometry, title, and background color (PROFESSIONAL STYLE)."""
-        self.state('zoomed') # Inicia maximizada
+        try:
+            self.state('zoomed') # Inicia maximizada
+        except TclError:
+            self.attributes('-zoomed', True)  # X11 no soporta el estado 'zoomed'
         self.title("Resutoranto - POS System")
         self.config(bg='#FFFFFF') 
 
@@ -292,18 +1017,32 @@ class RestaurantApp(Tk):
               bg="#FFFFFF",
               width=30).grid(row=0, column=0, pady=10)
 
+        # Selector de tickets abiertos (mesas)
+        ticket_bar = Frame(self.top_panel, bg=WINDOW_BG)
+        ticket_bar.grid(row=0, column=1, padx=10, sticky=E)
+        Label(ticket_bar, text='Ticket:', font=('Dosis Bold', 12),
+              fg=DARK_GRAY, bg=WINDOW_BG).pack(side='left')
+        self.ticket_menu = OptionMenu(ticket_bar, self.ticket_var, self.tickets.active)
+        self.ticket_menu.config(font=('Dosis', 12), width=12, bg=WINDOW_BG)
+        self.ticket_menu.pack(side='left', padx=5)
+        for text, command in (('New Ticket', self.new_ticket), ('Close Ticket', self.close_ticket)):
+            Button(ticket_bar, text=text, font=('Dosis', 12), fg='white', bg=ACCENT_COLOR, bd=1,
+                   command=self.instrumented(text.lower().replace(' ', '_'), command)).pack(
+                       side='left', padx=5)
+        self.bind('<Control-Tab>', lambda event: self.switch_ticket(
+            self.tickets.neighbor(self.tickets.active)) or 'break')
+        self._refresh_ticket_menu()
+
         # --- MAIN BODY FRAME (Usando GRID para la distribución ESTABLE) ---
         self.main_body_frame = Frame(self, bg='#FFFFFF')
         self.main_body_frame.pack(fill=BOTH, expand=True) 
         
-        # Asignar pesos para expansión (3 columnas de menú, 1 columna para recibo/calc)
-        self.main_body_frame.grid_columnconfigure(0, weight=1)
-        self.main_body_frame.grid_columnconfigure(1, weight=1)
-        self.main_body_frame.grid_columnconfigure(2, weight=1)
-        self.main_body_frame.grid_columnconfigure(3, weight=1)
+        # Asignar pesos para expansión (una columna por categoría, 1 columna para recibo/calc)
+        for column in range(len(self.menu_data) + 1):
+            self.main_body_frame.grid_columnconfigure(column, weight=1)
 
     def create_menu_frames(self):
-        """Configura las secciones de menú (Food, Drinks, Desserts) en Fila 0"""
+        """Configura una sección por categoría del menú en Fila 0"""
         frame_options = {
             'font': ("Dosis Bold", 14), 
             'bd': 1, 
@@ -322,90 +1061,91 @@ class RestaurantApp(Tk):
             self.menu_panels[category_key] = panel
             col_index += 1
 
-        # Marco de Resumen de Costos (debajo de menús, abarcando 3 columnas)
+        # Marco de Resumen de Costos (debajo de menús, abarcando sus columnas)
         self.cost_frame = LabelFrame(self.main_body_frame, text="Cost Summary", 
                                     font=("Dosis Bold", 14), bd=1, relief='groove', 
                                     fg=DARK_GRAY, bg=WINDOW_BG)
-        self.cost_frame.grid(row=1, column=0, columnspan=3, sticky='ew', padx=10, pady=10)
+        self.cost_frame.grid(row=1, column=0, columnspan=col_index, sticky='ew', padx=10, pady=10)
 
-        # Marco Derecho (Columna 3 para Recibo y Calculadora)
+        # Marco Derecho (columna después de los menús para Recibo y Calculadora)
         self.right_frame = Frame(self.main_body_frame, bg=WINDOW_BG)
-        self.right_frame.grid(row=0, column=3, rowspan=2, sticky='nsew', padx=10, pady=10)
+        self.right_frame.grid(row=0, column=col_index, rowspan=2, sticky='nsew', padx=10, pady=10)
 
     def create_menu_items(self):
-        """Genera todos los Checkbuttons, Etiquetas de Precio y Campos de Entrada"""
+        """Prepara las secciones de items: cada categoría se construye al mostrarse"""
         for category_key, panel in self.menu_panels.items():
-            self._create_items_section(category_key, panel)
+            panel.bind('<Map>', lambda event, k=category_key: self.ensure_items_section(k), add='+')
+
+    def ensure_items_section(self, category_key: str):
+        """Construye la sección de una categoría la primera vez que se necesita"""
+        if self.category_data[category_key]['item_list'] is None:
+            self._create_items_section(category_key, self.menu_panels[category_key])
 
     def _create_items_section(self, category_key: str, parent_panel: Frame):
         """Crea una sección de items para una categoría específica"""
         cat_data = self.category_data[category_key]
-        menu_list = cat_data['items']
-        prices_list = cat_data['prices']
         display_name = cat_data['display_name']
+        self._create_item_vars(category_key)
 
         # Encabezado de sección
-        Label(parent_panel, text=display_name, font=('Dosis Bold', 16), 
-              fg=ACCENT_COLOR, bg=LIGHT_GRAY).grid(row=0, columnspan=3, pady=(0, 10))
-
-        # Encabezados de columna
-        Label(parent_panel, text="Item", font=('Dosis Bold', 12), 
-              fg=DARK_GRAY, bg=LIGHT_GRAY).grid(row=1, column=0, sticky=W)
-        Label(parent_panel, text="Price", font=('Dosis Bold', 12), 
-              fg=ACCENT_COLOR, bg=LIGHT_GRAY).grid(row=1, column=1, padx=10)
-        Label(parent_panel, text="Qty", font=('Dosis Bold', 12), 
-              fg=DARK_GRAY, bg=LIGHT_GRAY).grid(row=1, column=2, padx=5)
-
-        # Crear items
-        for i, item in enumerate(menu_list):
-            row_index = i + 2
-            
-            # Variables
+        cat_data['header'] = Label(parent_panel, text=display_name, font=('Dosis Bold', 16), 
+                                   fg=ACCENT_COLOR, bg=LIGHT_GRAY)
+        cat_data['header'].grid(row=0, columnspan=3, pady=(0, 10))
+
+        self._create_item_list(category_key, parent_panel)
+
+    def _create_item_vars(self, category_key: str):
+        """Variables de cada item (los widgets solo existen para las filas visibles)"""
+        cat_data = self.category_data[category_key]
+        for index in range(len(cat_data['item_ids'])):
             check_var = IntVar()
             qty_var = StringVar(value='0')
             
             cat_data['check_vars'].append(check_var)
             cat_data['quantity_vars'].append(qty_var)
-            
-            # Checkbutton
-            Checkbutton(parent_panel, text=item.title(), font=('Dosis', 12), 
-                       variable=check_var, command=self.check_input_status,
-                       bg=WINDOW_BG, fg=DARK_GRAY, 
-                       selectcolor=ACCENT_COLOR).grid(row=row_index, column=0, sticky=W, padx=5, pady=2)
-
-            # Etiqueta de Precio
-            Label(parent_panel, text=f'${prices_list[i]:.2f}', font=('Dosis', 12), 
-                 fg=ACCENT_COLOR, bg=WINDOW_BG).grid(row=row_index, column=1, sticky=W, padx=10, pady=2)
-
-            # Campo de Entrada (Cantidad)
-            entry_widget = Entry(parent_panel, font=('Dosis bold', 12), bd=1, width=4, 
-                                state="disabled", textvariable=qty_var, bg='white', fg='black')
-            entry_widget.grid(row=row_index, column=2, padx=5, pady=2)
-            cat_data['entries'].append(entry_widget)
+            # Por (categoría, índice): el item_id puede cambiar al recargar el menú
+            qty_var.trace_add('write', lambda *args, k=category_key, i=index:
+                              self._on_quantity_write(self.catalog.item_id(k, i)))
+
+    def _create_item_list(self, category_key: str, parent_panel: Frame):
+        """Lista virtualizada de items"""
+        cat_data = self.category_data[category_key]
+        item_list = VirtualItemList(parent_panel, cat_data,
+                                    self.instrumented('check_input_status', self.check_input_status))
+        item_list.grid(row=1, column=0, columnspan=3, sticky='nsew')
+        cat_data['item_list'] = item_list
 
     def create_cost_section(self):
         """Crea la sección de resumen de costos usando GRID"""
-        cost_labels = [
-            ('Food Cost', 'food'), 
-            ('Drink Cost', 'drinks'), 
-            ('Dessert Cost', 'desserts'), 
-            ('Subtotal', 'subtotal'), 
-            (f'Tax ({TAX_RATE*100:.0f}%)', 'tax'), 
-            ('Total', 'total')
+        # Con impuesto por categoría el total de impuesto mezcla tasas (el desglose va abajo)
+        rules = self.pricing.rules
+        tax_label = 'Tax' if rules is not None and len(rules.rates) > 1 else f'Tax ({TAX_RATE*100:.0f}%)'
+        # Un costo por categoría del menú cargado, luego los totales
+        cost_labels = [(f"{cat_data['display_name']} Cost", cat_data['cost_var'], category_key)
+                       for category_key, cat_data in self.category_data.items()]
+        cost_labels += [
+            ('Subtotal', self.cost_vars['subtotal'], None), 
+            (tax_label, self.cost_vars['tax'], None), 
+            ('Total', self.cost_vars['total'], None)
         ]
+        if rules is not None:  # Sin reglas el resumen queda como siempre
+            cost_labels.insert(len(self.category_data) + 1,
+                               ('Discounts', self.cost_vars['discounts'], None))
 
         row_index = 1
         col_index = 0
         
-        for label_text, var_key in cost_labels:
+        for label_text, cost_var, category_key in cost_labels:
             # Etiqueta
-            Label(self.cost_frame, text=label_text, font=('Dosis', 12), 
-                 bg=WINDOW_BG, fg=DARK_GRAY, anchor=W).grid(row=row_index, column=col_index, 
-                 sticky=W, padx=10, pady=2)
+            label = Label(self.cost_frame, text=label_text, font=('Dosis', 12), 
+                          bg=WINDOW_BG, fg=DARK_GRAY, anchor=W)
+            label.grid(row=row_index, column=col_index, sticky=W, padx=10, pady=2)
+            if category_key is not None:
+                self.category_data[category_key]['cost_label'] = label
             
             # Campo de entrada (solo lectura)
             Entry(self.cost_frame, font=('Dosis', 12), bd=1, width=15, state="readonly", 
-                 textvariable=self.cost_vars[var_key], bg=LIGHT_GRAY, 
+                 textvariable=cost_var, bg=LIGHT_GRAY, 
                  fg=DARK_GRAY).grid(row=row_index, column=col_index + 1, padx=10, pady=2, sticky=W)
             
             if col_index == 0:
@@ -414,6 +1154,14 @@ class RestaurantApp(Tk):
                 col_index = 0
                 row_index += 1
 
+        if rules is None:
+            return
+        # Ajustes aplicados por las reglas de precio
+        Label(self.cost_frame, textvariable=self.cost_vars['adjustments'], font=('Dosis', 10),
+              bg=WINDOW_BG, fg=ACCENT_COLOR, anchor=W, justify=LEFT,
+              wraplength=520).grid(row=row_index + 1, column=0, columnspan=4, sticky=W,
+                                   padx=10, pady=(0, 4))
+
     def create_receipt_and_calculator(self):
         """Crea el recibo, calculadora y botones de control (Columna 3)"""
         self.calc_receipt_frame = Frame(self.right_frame, bg=WINDOW_BG)
@@ -430,17 +1178,17 @@ class RestaurantApp(Tk):
 
         # Botones de calculadora
         calculator_buttons = ['7', '8', '9', '+', '4', '5', '6', '-', '1', '2', '3', 'x', 
-                            'C', '/', '0', '=']
+                            'C', '/', '0', '=', '(', ')', '.', '%']
         row = 1
         col = 0
         
         for button_text in calculator_buttons:
             if button_text == 'C':
-                cmd = self.clear_calculator
+                cmd = self.instrumented('calc.clear', self.clear_calculator)
             elif button_text == '=':
-                cmd = self.get_result
+                cmd = self.instrumented('calc.result', self.get_result)
             else:
-                cmd = lambda t=button_text: self.click_button(t)
+                cmd = self.instrumented('calc.input', lambda t=button_text: self.click_button(t))
 
             Button(self.calculator_panel, text=button_text.title(), font=('Dosis', 12),
                   fg='white', bg=ACCENT_COLOR, bd=1, width=5, 
@@ -467,19 +1215,58 @@ class RestaurantApp(Tk):
             ('Total', self.calculate_total), 
             ('Receipt', self.generate_receipt), 
             ('Save', self.save_receipt), 
+            ('Lookup', self.open_receipt_lookup),
             ('Reset', self.reset_all)
         ]
+        if PRINTER_PATH:
+            buttons_config.insert(3, ('Print', self.print_receipt))
 
         for col, (name, command) in enumerate(buttons_config):
+            if name != 'Save':  # save_receipt mide por su cuenta, sin el diálogo modal
+                command = self.instrumented(name.lower(), command)
             Button(self.buttons_panel, text=name.title(), font=('Dosis', 12),
                   fg='white', bg=ACCENT_COLOR, bd=1, width=9,
                   command=command).grid(row=0, column=col, padx=5, pady=5)
 
+        # Barra de estado: resultados de I/O sin diálogos modales
+        self.status_label = Label(self.buttons_panel, textvariable=self.status_var,
+                                  font=('Dosis', 10), bg=WINDOW_BG, fg=DARK_GRAY, anchor=W)
+        self.status_label.grid(row=1, column=0, columnspan=len(buttons_config), sticky='ew', padx=5)
+
 
 # ==============================================================
 # -------------------- FINAL EXECUTION BLOCK -------------------
 # ==============================================================
 
+def measure_startup(menu: Dict[str, Dict] = MENU_CATEGORIES) -> Dict[str, float]:
+    """Mide el arranque: construcción de la ventana y primer pintado completo.
+
+    Usa un journal y un contador de recibos temporales: medir nunca abre ni
+    recupera las órdenes de los datos reales.
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory(prefix='pos-startup-') as data_dir:
+        started = time.perf_counter()
+        app = RestaurantApp(menu=menu, journal_path=os.path.join(data_dir, JOURNAL_FILE),
+                            receipt_ids_path=os.path.join(data_dir, RECEIPT_ID_FILE))
+        constructed = time.perf_counter()
+        app.update()
+        painted = time.perf_counter()
+        app.io.shutdown(wait=True)
+        app.journal.close()
+        result = {
+            'items': len(app.catalog),
+            'construct_s': constructed - started,
+            'first_paint_s': painted - started,
+        }
+        app.destroy()
+    return result
+
+
 if __name__ == "__main__":
-    app = RestaurantApp()
-    app.mainloop()
\ No newline at end of file
+    if '--startup-time' in sys.argv:
+        print(json.dumps(measure_startup()))
+    else:
+        app = RestaurantApp(instrument=INSTRUMENT or '--instrument' in sys.argv)
+        app.mainloop()
\ No newline at end of file
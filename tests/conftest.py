@@ -0,0 +1,12 @@
+"""Configuración de pytest: importa el paquete desde la raíz y aísla los datos locales"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pos.config lee el entorno al importarse: los tests nunca tocan pos_data ni el hub
+os.environ['POS_DATA_DIR'] = tempfile.mkdtemp(prefix='pos-tests-')
+for name in ('POS_HUB', 'POS_PRINTER', 'POS_MENU', 'POS_RULES', 'POS_INSTRUMENT'):
+    os.environ.pop(name, None)
@@ -0,0 +1,33 @@
+from concurrent.futures import Future
+
+import pytest
+
+from pos.background import IOWorker
+
+
+def test_callbacks_run_on_poll():
+    worker = IOWorker()
+    results = []
+    worker.submit('test', lambda value: value * 2, 21, on_done=results.append)
+    worker.shutdown(wait=True)
+    assert results == [42]
+    assert worker.pending == 0
+
+
+def test_shutdown_rejects_work_submitted_by_callbacks():
+    worker = IOWorker()
+    errors = []
+
+    def resubmit(_):
+        try:
+            worker.submit('test', lambda: None)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    worker.submit('test', lambda: 'done', on_done=resubmit)
+    worker.shutdown(wait=True)
+    assert len(errors) == 1
+    # Nada quedó encolado después del cierre
+    assert worker.pending == 0
+    with pytest.raises(RuntimeError):
+        worker.watch(Future())
@@ -0,0 +1,100 @@
+import datetime
+import io
+
+import pytest
+
+from pos.batch import _numbered, init_worker, iter_csv, iter_jsonl, main, process_orders
+from pos.config import MENU_CATEGORIES
+
+ISSUED_AT = datetime.datetime(2026, 1, 7, 12, 0)
+
+
+def _numbers(records, first_number=1):
+    return [(record.get('error'), number) for record, number in _numbered(records, first_number)]
+
+
+def test_sequential_numbers_skip_explicit_ones():
+    records = [{'number': 2}, {}, {}, {'number': '4'}, {}]
+    assert _numbers(records) == [(None, 2), (None, 1), (None, 3), (None, 4), (None, 5)]
+
+
+def test_duplicate_and_fractional_numbers_are_errors():
+    records = [{}, {'number': 1}, {'number': 1.5}, {'number': 5.0}, {'number': 5}]
+    assert _numbers(records) == [
+        (None, 1),
+        ('duplicate order number 1', 2),
+        ('order number 1.5 is not an integer', 3),
+        (None, 5),
+        ('duplicate order number 5', 4),
+    ]
+
+
+def test_external_ids_keep_a_sequential_number():
+    assert _numbers([{'number': 'A-12'}, {'number': 'A-13'}], first_number=100) == [
+        (None, 100), (None, 101)]
+
+
+def test_process_orders_prices_in_input_order():
+    init_worker(MENU_CATEGORIES, 0.07)
+    stream = io.StringIO(
+        '{"number": 7, "lines": [{"name": "Ramen", "quantity": 2}, {"name": "Water", "quantity": 1}]}\n'
+        '{"items": {"Soda": 1, "Nope": 1}}\n'
+        'not json\n'
+        '{"number": 7, "items": {"Fruit": 1}}\n')
+    results = list(process_orders(iter_jsonl(stream), chunk_size=2, issued_at=ISSUED_AT))
+
+    assert [result['number'] for result in results] == [7, 1, 2, 3]
+    first, second, broken, duplicate = results
+    assert (first['subtotal_cents'], first['tax_cents'], first['total_cents']) == (289, 20, 309)
+    assert second['total_cents'] == 106 and second['unknown'] == ['Nope']
+    assert broken['error'].startswith('line 3:')
+    assert duplicate['error'] == 'duplicate order number 7'
+
+
+def test_csv_groups_contiguous_rows_by_order_number():
+    stream = io.StringIO('order,name,quantity\n'
+                         '7,Ramen,2\n'
+                         '7,Water,1\n'
+                         ',Soda,1\n'
+                         ',Fruit,1\n'
+                         '8,Soda,1\n')
+    records = list(iter_csv(stream))
+
+    assert [record.get('number') for record in records] == ['7', None, None, '8']
+    assert [len(record['lines']) for record in records] == [2, 1, 1, 1]
+
+
+def test_csv_rejects_orders_split_by_other_orders():
+    stream = io.StringIO('order,name,quantity\n'
+                         '7,Ramen,2\n'
+                         '8,Soda,1\n'
+                         '7,Water,1\n'
+                         '7,Fruit,1\n')
+    first, second, split = iter_csv(stream)
+
+    assert first['number'] == '7' and len(first['lines']) == 1
+    assert second['number'] == '8'
+    assert split['error'].startswith('line 4: order 7 is split')
+
+
+@pytest.mark.parametrize('option, content', [
+    ('--menu', '{"food": {"items": ["Ramen"], "prices": [-1]}}'),
+    ('--menu', 'not json'),
+    ('--rules', '{"tax": "high"}'),
+])
+def test_bad_menu_or_rules_exit_with_a_cli_error(tmp_path, capsys, option, content):
+    path = tmp_path / 'config.json'
+    path.write_text(content, encoding='utf-8')
+    with pytest.raises(SystemExit) as exit_info:
+        main([option, str(path), '--workers', '0', str(tmp_path / 'missing.jsonl')])
+
+    assert exit_info.value.code == 2
+    assert 'cannot load' in capsys.readouterr().err
+
+
+def test_missing_menu_file_is_a_cli_error(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(['--menu', str(tmp_path / 'nope.json'), '--workers', '0'])
+
+    assert exit_info.value.code == 2
+    assert 'cannot load menu' in capsys.readouterr().err
@@ -0,0 +1,30 @@
+from pos.calculator import Calculator
+
+
+def test_precedence_and_parentheses():
+    assert Calculator.calculate('1.5x3+2') == '6.50'
+    assert Calculator.calculate('-4+2x(3-1)') == '0.00'
+    assert Calculator.calculate('(1+2)x(3+4)/5-6') == '-1.80'
+    assert Calculator.calculate('12/4x-3') == '-9.00'
+
+
+def test_percent_applies_to_left_operand():
+    assert Calculator.calculate('200+10%') == '220.00'
+    assert Calculator.calculate('200-10%') == '180.00'
+    assert Calculator.calculate('50x10%') == '5.00'
+
+
+def test_exponent_numbers_are_accepted():
+    assert Calculator.calculate('1e5') == '100000.00'
+    assert Calculator.calculate('2.5E-1+1') == '1.25'
+
+
+def test_long_chains_do_not_recurse():
+    assert Calculator.calculate('+'.join(['1'] * 2001)) == '2001.00'
+    assert Calculator.calculate('x'.join(['1'] * 2001)) == '1.00'
+
+
+def test_errors():
+    assert Calculator.calculate('1/0') == 'Zero Division Error'
+    assert Calculator.calculate('1+') == 'Syntax Error'
+    assert Calculator.calculate('') == 'Syntax Error'
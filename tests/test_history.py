@@ -0,0 +1,75 @@
+import datetime
+
+from pos.history import BULK_SORT_THRESHOLD, ReceiptIndex
+from pos.journal import OrderJournal
+
+START = datetime.datetime(2026, 3, 2, 12, 0)
+
+
+def _order(number, minutes, total_cents, sku='food-ramen', name='Ramen'):
+    return {'number': number, 'issued_at': (START + datetime.timedelta(minutes=minutes)).isoformat(),
+            'lines': [{'item_id': 0, 'sku': sku, 'name': name, 'category_key': 'food',
+                       'quantity': '1', 'cents': total_cents}],
+            'category_cents': {'food': total_cents}, 'subtotal_cents': total_cents,
+            'tax_cents': 0, 'total_cents': total_cents, 'tax_rate': 0.0,
+            'category_names': {'food': 'Food'}}
+
+
+def test_refresh_only_reads_new_records(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    with OrderJournal(path, group_window=0, fsync=False) as journal:
+        index = ReceiptIndex(path)
+        journal.append_order(_order(1, 0, 500))
+        journal.append_order(_order(2, 5, 700, sku='drinks-soda', name='Soda'))
+        assert index.refresh() == 2
+        scanned = index.scanned_bytes
+
+        assert index.refresh() == 0
+        assert index.scanned_bytes == scanned
+
+        journal.close_order(1)
+        journal.append_order(_order(3, 10, 900))
+        journal.append_order(_order(2, 15, 750, sku='drinks-soda', name='Soda'))  # Recibo rehecho
+        assert index.refresh() == 2
+
+    assert len(index) == 3
+    assert index.search(item='ramen').numbers == [3, 1]
+    assert index.search(min_cents=700).numbers == [2, 3]
+    assert index.summary(2)[2] == 750
+    assert index.receipt(2).totals.total_cents == 750
+
+
+def test_search_limit_keeps_the_newest(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    count = BULK_SORT_THRESHOLD + 10
+    with OrderJournal(path, group_window=0, fsync=False) as journal:
+        # Las fechas no siguen el orden del journal: el índice debe ordenarlas
+        for number in range(1, count + 1):
+            journal.append_order(_order(number, (number * 5) % count, 100 * number))
+    index = ReceiptIndex(path)
+    index.refresh()
+
+    everything = index.search()
+    assert everything.matched == count and not everything.truncated
+    issued = [index.summary(number)[1] for number in everything.numbers]
+    assert issued == sorted(issued, reverse=True)
+
+    limited = index.search(limit=5)
+    assert limited.numbers == everything.numbers[:5]
+    assert limited.matched == count and limited.truncated
+
+    window = index.search(start=START + datetime.timedelta(minutes=10),
+                          end=START + datetime.timedelta(minutes=19), limit=3)
+    assert window.matched == 10
+    assert [index.summary(number)[1].minute for number in window.numbers] == [19, 18, 17]
+
+
+def test_time_of_day_window_can_cross_midnight(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    with OrderJournal(path, group_window=0, fsync=False) as journal:
+        for number, minutes in ((1, 10 * 60), (2, 11 * 60 + 30), (3, 14 * 60)):
+            journal.append_order(_order(number, minutes, 100))
+    index = ReceiptIndex(path)
+    index.refresh()
+    late = (datetime.time(22, 0), datetime.time(1, 0))  # 22:00, 23:30 y no 02:00
+    assert index.search(time_of_day=late).numbers == [2, 1]
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+
+import pytest
+
+from pos.hub import HubClient, HubError, HubPublisher, OrderHub, parse_address
+
+
+class _HubThread:
+    """Un OrderHub con su propio event loop, como el proceso `python -m pos.hub serve`"""
+
+    def __init__(self, address='127.0.0.1:0'):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.hub = OrderHub()
+        self.address = self.run(self.hub.start(address))
+
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(5)
+
+    def stop(self):
+        self.run(self.hub.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+
+def _order(number):
+    return {'number': number, 'total_cents': 100}
+
+
+def test_publish_resolves_when_the_hub_acks():
+    server = _HubThread()
+    publisher = HubPublisher(server.address)
+    try:
+        publisher.publish(_order(1)).result(5)
+        assert server.hub.orders_in == 1
+    finally:
+        publisher.close()
+        server.stop()
+
+
+def test_publisher_reconnects_and_resends_after_a_hub_restart():
+    server = _HubThread()
+    publisher = HubPublisher(server.address, retry_delay=0.05, max_retry_delay=0.2)
+    try:
+        publisher.publish(_order(1)).result(5)
+        server.stop()
+        # Publicadas con el hub caído: quedan en cola hasta que vuelve
+        pending = [publisher.publish(_order(number)) for number in range(2, 12)]
+
+        server = _HubThread(server.address)
+        for future in pending:
+            future.result(5)
+        assert server.hub.orders_in == 10
+        assert publisher.reconnects >= 1
+    finally:
+        publisher.close()
+        server.stop()
+
+
+def test_client_fails_waiters_when_the_hub_goes_away():
+    async def scenario():
+        hub = OrderHub()
+        address = await hub.start()
+        client = await HubClient(window=1).connect(address)
+        await client.submit(_order(1))
+        await client.wait_acked()
+
+        # El hub deja de leer: el segundo lote ocupa la única ventana y el tercero espera crédito
+        hub_loop_blocker = asyncio.Event()
+        hub._publish = lambda orders: hub_loop_blocker.wait()
+        await client.submit(_order(2))
+        await client.flush()
+        waiting = asyncio.ensure_future(client.submit(_order(3)))
+        flushing = asyncio.ensure_future(client.flush())
+        await asyncio.sleep(0.05)
+        assert not flushing.done()
+
+        await hub.close()
+        await asyncio.wait_for(client.lost, 5)
+        await waiting
+        with pytest.raises(HubError):
+            await asyncio.wait_for(flushing, 5)
+        with pytest.raises(HubError):
+            await client.wait_acked()
+        assert [order['number'] for order in client.unsent()] == [2, 3]
+        await client.close()
+
+    asyncio.run(scenario())
+
+
+def test_connect_times_out(monkeypatch):
+    async def never_connects(address):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr('pos.hub.open_connection', never_connects)
+    with pytest.raises(TimeoutError):
+        HubPublisher('127.0.0.1:9', connect_timeout=0.1)
+
+
+@pytest.mark.parametrize('address, expected', [
+    ('127.0.0.1:8765', ('127.0.0.1', 8765, None)),
+    (':8765', ('127.0.0.1', 8765, None)),
+    ('unix:/tmp/hub.sock', (None, None, '/tmp/hub.sock')),
+])
+def test_parse_address(address, expected):
+    assert parse_address(address) == expected
+
+
+@pytest.mark.parametrize('address', ['localhost', 'localhost:', 'localhost:http', 'host:70000',
+                                     'unix:'])
+def test_invalid_addresses_raise_value_error(address):
+    with pytest.raises(ValueError, match='Invalid hub address'):
+        parse_address(address)
+    with pytest.raises(ValueError, match='Invalid hub address'):
+        HubPublisher(address)
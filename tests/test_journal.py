@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from pos.journal import (RECORD_HEADER, JournalError, OrderJournal, encode_record,
+                         iter_records, scan_records)
+
+
+def _order(number):
+    return {'number': number, 'issued_at': '2026-01-01T12:00:00', 'lines': [],
+            'subtotal_cents': 100, 'tax_cents': 7, 'total_cents': 107}
+
+
+def test_replay_restores_open_orders(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    with OrderJournal(path, group_window=0, fsync=False) as journal:
+        journal.append_order(_order(1))
+        journal.append_order(_order(2))
+        journal.close_order(1)
+
+    reopened = OrderJournal(path, group_window=0, fsync=False)
+    try:
+        assert reopened.recovered_records == 3
+        assert [order['number'] for order in reopened.in_flight()] == [2]
+        # La secuencia continúa después del último registro
+        assert reopened.append_order(_order(3)) == 4
+    finally:
+        reopened.close()
+
+
+def test_torn_tail_is_truncated_on_open(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    with OrderJournal(path, group_window=0, fsync=False) as journal:
+        journal.append_order(_order(1))
+    valid_size = os.path.getsize(path)
+
+    # Un crash a mitad de escritura deja un registro incompleto al final
+    torn = encode_record({'type': 'order', 'order': _order(2)})
+    with open(path, 'ab') as file:
+        file.write(torn[:len(torn) // 2])
+
+    with OrderJournal(path, group_window=0, fsync=False) as journal:
+        assert journal.recovered_records == 1
+        assert os.path.getsize(path) == valid_size
+        journal.append_order(_order(3))
+
+    numbers = [record['order']['number'] for record in iter_records(path)]
+    assert numbers == [1, 3]
+
+
+def test_corrupt_crc_stops_the_scan(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    first = encode_record({'type': 'order', 'order': _order(1)})
+    second = bytearray(encode_record({'type': 'order', 'order': _order(2)}))
+    second[RECORD_HEADER.size] ^= 0xFF  # Un byte del payload cambiado
+    with open(path, 'wb') as file:
+        file.write(first + bytes(second))
+
+    records = list(scan_records(path))
+    assert len(records) == 1
+    assert records[0][1] == len(first)
+
+
+class _FailingFile:
+    """Escribe la mitad de los datos y falla, como un disco lleno a mitad de un commit"""
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, data):
+        self.file.write(bytes(data[:len(data) // 2]))
+        raise OSError(28, 'No space left on device')
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def test_failed_write_is_rolled_back(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    journal = OrderJournal(path, group_window=0, fsync=False)
+    try:
+        journal.append_order(_order(1))
+        good_size = os.path.getsize(path)
+
+        real_file = journal._file
+        journal._file = _FailingFile(real_file)
+        with pytest.raises(JournalError):
+            journal.append_order(_order(2))
+        journal._file = real_file
+
+        # Ni el estado en memoria ni el archivo conservan la orden fallida
+        assert [order['number'] for order in journal.in_flight()] == [1]
+        assert os.path.getsize(path) == good_size
+        journal.append_order(_order(3))
+    finally:
+        journal.close()
+
+    with OrderJournal(path, group_window=0, fsync=False) as reopened:
+        assert reopened.recovered_records == 2
+        assert [order['number'] for order in reopened.in_flight()] == [1, 3]
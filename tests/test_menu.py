@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from pos.catalog import MenuCatalog
+from pos.config import MENU_CATEGORIES
+from pos.menu import diff_menus, export_menu, parse_menu
+
+
+def _menu(**food):
+    menu = {'food': {'items': ['Ramen', 'Sushi', 'Curry'], 'prices': [1.32, 2.86, 1.20],
+                     'skus': ['F-1', 'F-2', 'F-3'], 'display_name': 'Food'},
+            'drinks': {'items': ['Water', 'Soda'], 'prices': [0.25, 0.99],
+                       'display_name': 'Drinks'}}
+    menu['food'].update(food)
+    return MenuCatalog.from_menu(menu)
+
+
+@pytest.mark.parametrize('menu, message', [
+    ([], 'non-empty JSON object'),
+    ({'food': ['Ramen']}, 'category must be a JSON object'),
+    ({'food': {'items': 'Ramen', 'prices': [1]}}, 'same length'),
+    ({'food': {'items': ['Ramen'], 'prices': [-1]}}, 'non-negative'),
+    ({'food': {'items': ['Ramen'], 'prices': [float('inf')]}}, 'non-negative'),
+    ({'food': {'items': ['Ramen'], 'prices': [float('nan')]}}, 'non-negative'),
+    ({'food': {'items': ['Ramen'], 'prices': [1e300]}}, 'up to'),
+    ({'food': {'items': ['Ramen'], 'prices': [1], 'skus': 'F-1'}}, 'skus must be a list'),
+    ({'food': {'items': ['Ramen'], 'prices': [1], 'skus': [7]}}, 'skus must be a list'),
+    ({'food': {'items': ['Ramen'], 'prices': [1], 'display_name': 3}}, 'display_name'),
+])
+def test_parse_menu_rejects_malformed_menus(menu, message):
+    with pytest.raises(ValueError, match=message):
+        parse_menu(json.dumps(menu).encode())
+
+
+def test_exported_menu_parses_with_explicit_skus():
+    menu = parse_menu(json.dumps(export_menu(MENU_CATEGORIES)).encode())
+    assert MenuCatalog.from_menu(menu).skus == MenuCatalog.from_menu(MENU_CATEGORIES).skus
+    assert all(len(info['skus']) == len(info['items']) for info in menu.values())
+
+
+def test_rename_with_stable_skus_only_changes_the_row():
+    diff = diff_menus(_menu(), _menu(items=['Ramen', 'Nigiri', 'Curry'], prices=[1.32, 2.86, 1.50]))
+    assert diff.changed == {'food': [1, 2]}
+    assert diff.relaid == () and diff.removed == ()
+    assert not diff.categories_changed
+
+
+def test_rename_without_skus_relays_the_category():
+    old = _menu(skus=None)
+    diff = diff_menus(old, _menu(skus=None, items=['Ramen', 'Nigiri', 'Curry']))
+    assert diff.relaid == ('food',)
+    assert diff.removed == (old.skus[1],)
+
+
+def test_identical_and_recategorised_menus():
+    assert diff_menus(_menu(), _menu()).empty
+    renamed = MenuCatalog.from_menu({'food': {'items': ['Ramen'], 'prices': [1]}})
+    assert diff_menus(_menu(), renamed).categories_changed
@@ -0,0 +1,81 @@
+import datetime
+import random
+from decimal import Decimal
+
+import pytest
+
+from pos import pricing
+from pos.config import MENU_CATEGORIES
+from pos.pricing import PricingEngine, RunningTotals, normalize_quantity
+from pos.rules import EXAMPLE_RULES, parse_rules
+
+WEDNESDAY_6PM = datetime.datetime(2026, 1, 7, 18, 0)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2', 2), (' 3 ', 3), ('2.0', 2), ('1.50', Decimal('1.5')), (1.25, Decimal('1.25')),
+    ('', 0), ('-1', 0), ('abc', 0), ('nan', 0), ('Infinity', 0), (-4, 0), (None, 0),
+])
+def test_normalize_quantity(value, expected):
+    assert normalize_quantity(value) == expected
+
+
+def test_lines_and_tax_round_half_up():
+    engine = PricingEngine(MENU_CATEGORIES, 0.07)
+    assert engine.line_cents(Decimal('1.5'), 25) == 38  # 37.5
+    assert engine.line_cents(Decimal('0.5'), 1) == 1
+    assert engine.tax_cents(50) == 4  # 3.5
+    assert engine.tax_cents(289) == 20  # 20.23
+
+
+def test_price_order_hand_computed():
+    engine = PricingEngine(MENU_CATEGORIES, 0.07)
+    # 2 x 1.32 + 1.5 x 0.25 (0.375 -> 0.38) + 1.97 = 4.99; 7% = 0.3493
+    priced = engine.price_order({'food': ['2'], 'drinks': ['1.5'],
+                                 'desserts': ['0', '', '', '1']})
+    assert priced.category_cents == {'food': 264, 'drinks': 38, 'desserts': 197}
+    assert (priced.subtotal_cents, priced.tax_cents, priced.total_cents) == (499, 35, 534)
+    assert priced.adjustments == ()
+
+
+def _random_rows(engine, count, fractional):
+    generator = random.Random(7)
+    choices = ['0', '1', '2', '3'] + (['0.5', '1.25'] if fractional else [])
+    return [[generator.choice(choices) if generator.random() < 0.3 else '0'
+             for _ in range(engine.width)] for _ in range(count)]
+
+
+@pytest.mark.parametrize('fractional', [False, True])
+def test_batch_matches_single_orders_and_running_totals(fractional):
+    engine = PricingEngine(MENU_CATEGORIES, 0.07)
+    rows = _random_rows(engine, 50, fractional)
+    batch = engine.price_batch(rows)
+    assert len(batch) == len(rows)
+    for index, row in enumerate(rows):
+        expected = engine.price_row(row)
+        assert batch.order(index) == expected
+        running = RunningTotals(engine)
+        for item_id, quantity in enumerate(row):
+            running.set_item(item_id, quantity)
+        assert running.snapshot() == expected
+
+
+def test_numpy_and_pure_python_batches_agree(monkeypatch):
+    numpy = pytest.importorskip('numpy')
+    engine = PricingEngine(MENU_CATEGORIES, 0.07)
+    rows = numpy.array([[int(quantity) for quantity in row]
+                        for row in _random_rows(engine, 200, fractional=False)])
+    vectorized = engine.price_batch(rows)
+    monkeypatch.setattr(pricing, 'np', None)
+    pure = engine.price_batch(rows.tolist())
+    assert [vectorized.order(i) for i in range(len(rows))] == \
+           [pure.order(i) for i in range(len(rows))]
+
+
+def test_batch_with_rules_reports_the_adjustments():
+    engine = PricingEngine(MENU_CATEGORIES, 0.07, rules=parse_rules(EXAMPLE_RULES))
+    rows = _random_rows(engine, 30, fractional=True)
+    batch = engine.price_batch(rows, WEDNESDAY_6PM)
+    for index, row in enumerate(rows):
+        assert batch.order(index) == engine.price_row(row, WEDNESDAY_6PM)
+    assert any(batch.order(index).adjustments for index in range(len(rows)))
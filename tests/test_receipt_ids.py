@@ -0,0 +1,56 @@
+import multiprocessing
+import threading
+
+from pos.receipt_ids import ReceiptNumberAllocator
+
+
+def _take(path, count, block_size=7):
+    allocator = ReceiptNumberAllocator(path, block_size=block_size, first_number=1000)
+    return [allocator.next() for _ in range(count)]
+
+
+def test_two_terminals_sharing_a_data_dir_never_collide(tmp_path):
+    path = str(tmp_path / 'receipt_ids.dat')
+    first = ReceiptNumberAllocator(path, block_size=5, first_number=1000)
+    second = ReceiptNumberAllocator(path, block_size=5, first_number=1000)
+    numbers = [allocator.next() for _ in range(12) for allocator in (first, second)]
+
+    assert len(set(numbers)) == len(numbers)
+    assert min(numbers) == 1000
+    assert first.leases == second.leases == 3  # Un viaje al disco cada 5 números
+
+
+def test_concurrent_processes_get_disjoint_numbers(tmp_path):
+    path = str(tmp_path / 'receipt_ids.dat')
+    with multiprocessing.get_context('fork').Pool(4) as pool:
+        batches = pool.starmap(_take, [(path, 200)] * 4)
+    numbers = [number for batch in batches for number in batch]
+    assert len(set(numbers)) == len(numbers) == 800
+    assert all(batch == sorted(batch) for batch in batches)  # Monótonos por terminal
+
+
+def test_threads_of_one_terminal_share_its_block(tmp_path):
+    allocator = ReceiptNumberAllocator(str(tmp_path / 'receipt_ids.dat'), block_size=3)
+    numbers = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(50):
+            number = allocator.next()
+            with lock:
+                numbers.append(number)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(numbers)) == 200
+
+
+def test_numbers_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'receipt_ids.dat')
+    before = _take(path, 10, block_size=4)  # Tres bloques: 1000-1011, se usan 10
+    after = _take(path, 3, block_size=4)
+    assert after == [1012, 1013, 1014]  # Los dos sobrantes del bloque quedan como hueco
+    assert max(before) < min(after)
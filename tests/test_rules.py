@@ -0,0 +1,119 @@
+import datetime
+
+import pytest
+
+from pos.config import MENU_CATEGORIES
+from pos.pricing import PricingEngine
+from pos.rules import (ADJUST_COMBO, ADJUST_DISCOUNT, ADJUST_TAX, EXAMPLE_RULES, Adjustment,
+                       compile_rules, parse_rules)
+
+WEDNESDAY_6PM = datetime.datetime(2026, 1, 7, 18, 0)  # Dentro del Happy Hour
+SATURDAY_NOON = datetime.datetime(2026, 1, 10, 12, 0)
+SUNDAY_NOON = datetime.datetime(2026, 1, 11, 12, 0)
+
+
+def _engine(rules=EXAMPLE_RULES):
+    return PricingEngine(MENU_CATEGORIES, 0.07, rules=parse_rules(rules))
+
+
+def _price(engine, when, **quantities):
+    lines = [(engine.catalog.by_sku(sku.replace('__', '.')), quantity)
+             for sku, quantity in quantities.items()]
+    return engine.price_items(lines, when)
+
+
+def test_discount_combo_and_tax_split():
+    # 2 x 1.32 + 1.54 + 1.97 + 1.5 x 0.25 (0.375 -> 0.38) = 6.53
+    # Happy Hour 20% de las bebidas: 0.31 + 0.08; el combo rebaja 0.34 / 0.33 / 0.33
+    # Tax 7%: (2.64 + 1.97 - 0.34 - 0.33) x 7% = 0.2758; Tax 10%: (1.23 + 0.30 - 0.33) x 10%
+    priced = _price(_engine(), WEDNESDAY_6PM, food__ramen='2', drinks__beer='1',
+                    desserts__flan='1', drinks__water='1.5')
+    assert priced.subtotal_cents == 653
+    assert priced.adjustments == (
+        Adjustment(ADJUST_DISCOUNT, 'Happy Hour', -39),
+        Adjustment(ADJUST_COMBO, 'Lunch Combo', -100),
+        Adjustment(ADJUST_TAX, 'Tax (7%)', 28),
+        Adjustment(ADJUST_TAX, 'Tax (10%)', 12),
+    )
+    assert priced.discount_cents == 139
+    assert (priced.tax_cents, priced.total_cents) == (40, 554)
+
+
+def test_combo_applies_once_per_complete_set():
+    # 2.64 + 1.98 + 3.96 = 8.58; dos combos (2.00) rebajan 0.68 / 0.66 / 0.66
+    # Tax 7%: (6.60 - 0.68 - 0.66) x 7% = 0.3682; Tax 10%: (1.98 - 0.66) x 10% = 0.132
+    priced = _price(_engine(), SATURDAY_NOON, food__ramen='2', drinks__soda='2',
+                    desserts__brownies='3')
+    assert priced.subtotal_cents == 858
+    assert [adjustment.cents for adjustment in priced.adjustments] == [-200, 37, 13]
+    assert priced.adjustments[0].label == 'Lunch Combo x2'
+    assert priced.total_cents == 858 - 200 + 50
+
+
+def test_discount_rounds_each_line_half_up():
+    # 10% de 1.97 = 0.197 -> 0.20; de 2.55 = 0.255 -> 0.26; tax (4.52 - 0.46) x 7% = 0.2842
+    priced = _price(_engine(), SUNDAY_NOON, desserts__flan='1', desserts__mousse='1')
+    assert priced.adjustments == (Adjustment(ADJUST_DISCOUNT, 'Sunday Desserts', -46),
+                                  Adjustment(ADJUST_TAX, 'Tax (7%)', 28))
+    assert priced.total_cents == 434
+
+
+def test_discount_window_ends_before_its_end_time():
+    priced = _price(_engine(), WEDNESDAY_6PM.replace(hour=19), drinks__beer='1')
+    assert priced.discount_cents == 0
+    assert priced.tax_cents == 15  # 1.54 x 10%
+
+
+def test_discount_window_across_midnight():
+    engine = _engine({'discounts': [{'name': 'Late', 'percent': 50, 'skus': ['drinks.beer'],
+                                     'start': '22:00', 'end': '02:00'}]})
+    late = datetime.datetime(2026, 1, 13, 1, 0)
+    assert _price(engine, late, drinks__beer='1').total_cents == 77 + 5  # 0.77 x 7% = 0.0539
+    assert _price(engine, late.replace(hour=2), drinks__beer='1').total_cents == 154 + 11
+
+
+def test_rules_that_change_nothing_are_not_compiled():
+    engine = PricingEngine(MENU_CATEGORIES, 0.07)
+    assert compile_rules(parse_rules({}), engine.catalog, 0.07) is None
+    assert compile_rules(parse_rules({'tax': {'food': 0.07}}), engine.catalog, 0.07) is None
+
+
+@pytest.mark.parametrize('rules, message', [
+    ([], 'JSON object'),
+    ({'promos': []}, 'Unknown rule sections'),
+    ({'tax': [1]}, 'tax must be'),
+    ({'tax': {'food': 'x'}}, 'not a number'),
+    ({'tax': {'food': 1e30}}, 'at most 1'),
+    ({'tax': {'food': float('inf')}}, 'non-negative'),
+    ({'discounts': ['x']}, 'discounts must be a list of JSON objects'),
+    ({'discounts': {'name': 'x'}}, 'discounts must be a list of JSON objects'),
+    ({'discounts': [{'percent': 10, 'categories': 'drinks'}]}, 'categories must be a list'),
+    ({'discounts': [{'percent': 10, 'skus': [5]}]}, 'skus must be a list'),
+    ({'discounts': [{'percent': 10}]}, 'needs categories or skus'),
+    ({'discounts': [{'percent': 120, 'categories': ['food']}]}, 'at most 100'),
+    ({'discounts': [{'percent': 10, 'categories': ['food'], 'days': 'mon'}]}, 'days must be'),
+    ({'discounts': [{'percent': 10, 'categories': ['food'], 'start': 17}]}, 'start must be'),
+    ({'combos': [{'components': ['food', 5]}]}, 'a component is'),
+    ({'combos': [{'components': ['food', {'skus': ['drinks.beer'], 'count': 1.5}]}]},
+     'positive integer count'),
+    ({'combos': [{'components': 'food'}]}, 'components must be a list'),
+    ({'combos': [{'components': ['food']}]}, 'at least two components'),
+    ({'combos': [{'components': ['food', 'drinks'], 'discount': 1e30}]}, 'at most 1000000'),
+    ({'combos': [{'components': ['food', 'drinks'], 'discount': -1}]}, 'non-negative'),
+])
+def test_parse_rules_rejects_malformed_rules(rules, message):
+    with pytest.raises(ValueError, match=message):
+        parse_rules(rules)
+
+
+@pytest.mark.parametrize('rules, message', [
+    ({'tax': {'snacks': 0.1}}, 'Unknown tax categories'),
+    ({'discounts': [{'name': 'Promo', 'percent': 10, 'skus': ['drinks.sake']}]},
+     "Promo: unknown category or SKU 'drinks.sake'"),
+    ({'combos': [{'name': 'Duo', 'components': ['food', 'snacks']}]},
+     "Duo: unknown category or SKU 'snacks'"),
+    ({'combos': [{'name': 'Duo', 'components': ['drinks', 'drinks.beer']}]}, 'overlap'),
+])
+def test_rules_must_match_the_menu(rules, message):
+    with pytest.raises(ValueError, match=message):
+        _engine(rules)
@@ -0,0 +1,67 @@
+import pytest
+
+from pos.catalog import MenuCatalog
+from pos.tickets import TicketBook, diff_lines
+
+
+def _catalog(items, skus=None):
+    menu = {'food': {'items': items, 'prices': [1.0] * len(items)}}
+    if skus is not None:
+        menu['food']['skus'] = skus
+    return MenuCatalog.from_menu(menu)
+
+
+def _sku_mapping(old, new):
+    """Como RestaurantApp.apply_menu: el item_id viejo se traduce por su SKU"""
+    return lambda item_id: new.by_sku(old.skus[item_id])
+
+
+def test_remap_follows_skus_across_renames_and_reorders():
+    old = _catalog(['Ramen', 'Sushi', 'Curry'], skus=['F-1', 'F-2', 'F-3'])
+    new = _catalog(['Curry', 'Ramen', 'Nigiri'], skus=['F-3', 'F-1', 'F-2'])
+    book = TicketBook()
+    book.open('Bar')
+    table = book.open('Table 1')
+    table.lines = {0: '2', 1: '1', 2: ''}
+
+    book.remap(_sku_mapping(old, new))
+
+    assert table.lines == {1: '2', 2: '1', 0: ''}
+    assert new.names[2] == 'Nigiri'
+
+
+def test_remap_drops_items_that_left_the_menu():
+    old = _catalog(['Ramen', 'Sushi'])
+    new = _catalog(['Ramen', 'Nigiri'])  # Sin SKUs explícitos: el renombre cambia el SKU
+    book = TicketBook()
+    book.open('Bar')
+    table = book.open()
+    table.lines = {0: '1', 1: '3'}
+
+    book.remap(_sku_mapping(old, new))
+
+    assert table.lines == {0: '1'}
+
+
+def test_remap_leaves_the_active_ticket_alone():
+    book = TicketBook()
+    active = book.open()
+    active.lines = {0: '1'}
+    book.remap(lambda item_id: None)
+    assert active.lines == {0: '1'}
+
+
+def test_ticket_book_labels_and_neighbors():
+    book = TicketBook()
+    first, second = book.open(), book.open()
+    assert (first.label, second.label) == ('Table 1', 'Table 2')
+    assert book.active == 'Table 1'
+    assert book.neighbor('Table 2') == 'Table 1'
+    with pytest.raises(ValueError):
+        book.open('Table 1')
+    book.close('Table 1')
+    assert book.active is None and list(book) == ['Table 2']
+
+
+def test_diff_lines_lists_rows_that_look_different():
+    assert diff_lines({0: '1', 3: '2', 5: ''}, {3: '2', 5: '1', 7: ''}) == [0, 5, 7]